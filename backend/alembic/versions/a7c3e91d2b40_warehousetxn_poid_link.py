@@ -0,0 +1,73 @@
+"""WarehouseTxn.POID link + filtered unique index (double receive guard)
+
+Revision ID: a7c3e91d2b40
+Revises: 961e99eab619
+Create Date: 2026-10-18 09:12:40.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e91d2b40'
+down_revision: Union[str, Sequence[str], None] = '961e99eab619'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """POID kolonu + FK, Reason metninden backfill, filtered unique index."""
+    op.add_column('WarehouseTxn', sa.Column('POID', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'FK_WarehouseTxn_POID', 'WarehouseTxn', 'PurchaseOrder', ['POID'], ['POID']
+    )
+
+    # Backfill: 'PO Receive #<POID>' (REASON_PO_RECEIVE) -> POID
+    # Geçmişte çift receive olduysa yalnızca ilk hareket bağlanır (unique index için)
+    op.execute("""
+    ;WITH src AS (
+        SELECT t.TxnID,
+               TRY_CAST(SUBSTRING(t.Reason, LEN('PO Receive #') + 1, 20) AS INT) AS POID
+        FROM dbo.WarehouseTxn t
+        WHERE t.TxnType = 'IN'
+          AND t.Reason LIKE 'PO Receive #%'
+    ), firsts AS (
+        SELECT s.TxnID, s.POID,
+               ROW_NUMBER() OVER (PARTITION BY s.POID ORDER BY s.TxnID) AS rn
+        FROM src s
+        JOIN dbo.PurchaseOrder po ON po.POID = s.POID
+    )
+    UPDATE t
+       SET t.POID = f.POID
+    FROM dbo.WarehouseTxn t
+    JOIN firsts f ON f.TxnID = t.TxnID
+    WHERE f.rn = 1;
+    """)
+
+    op.execute("""
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'UX_WarehouseTxn_POID_NotNull'
+          AND object_id = OBJECT_ID('dbo.WarehouseTxn')
+    )
+        CREATE UNIQUE INDEX UX_WarehouseTxn_POID_NotNull
+        ON dbo.WarehouseTxn(POID)
+        WHERE POID IS NOT NULL;
+    """)
+
+
+def downgrade() -> None:
+    """Index, FK ve kolonu kaldır (Reason metni yerinde kalır)."""
+    op.execute("""
+    IF EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'UX_WarehouseTxn_POID_NotNull'
+          AND object_id = OBJECT_ID('dbo.WarehouseTxn')
+    )
+        DROP INDEX UX_WarehouseTxn_POID_NotNull ON dbo.WarehouseTxn;
+    """)
+    op.drop_constraint('FK_WarehouseTxn_POID', 'WarehouseTxn', type_='foreignkey')
+    op.drop_column('WarehouseTxn', 'POID')
@@ -0,0 +1,45 @@
+"""IdempotencyKey table
+
+Revision ID: a9d4e2f7c816
+Revises: f2b6c8d3e147
+Create Date: 2026-10-18 15:48:20.117364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e2f7c816'
+down_revision: Union[str, Sequence[str], None] = 'f2b6c8d3e147'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Idempotency-Key yanıt tablosu (temizlik: python -m app.scripts.purge_idempotency_keys)."""
+    op.create_table(
+        'IdempotencyKey',
+        sa.Column('Scope', sa.String(length=50), nullable=False),
+        sa.Column('Key', sa.String(length=100), nullable=False),
+        sa.Column('RequestHash', sa.String(length=64), nullable=False),
+        sa.Column('StatusCode', sa.Integer(), nullable=True),
+        sa.Column('Response', sa.UnicodeText(), nullable=True),
+        sa.Column('CreatedAt', sa.DateTime(), nullable=False, server_default=sa.text('SYSUTCDATETIME()')),
+        sa.Column('ExpiresAt', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('Scope', 'Key', name='PK_IdempotencyKey'),
+    )
+    op.execute("""
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'IX_IdempotencyKey_ExpiresAt'
+          AND object_id = OBJECT_ID('dbo.IdempotencyKey')
+    )
+        CREATE INDEX IX_IdempotencyKey_ExpiresAt ON dbo.IdempotencyKey (ExpiresAt);
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('IdempotencyKey')
@@ -0,0 +1,44 @@
+"""IdempotencyKey claim lease (ClaimedAt, ClaimToken)
+
+Revision ID: b3c7e1a9f402
+Revises: d8a1f5c3e927
+Create Date: 2026-10-18 21:04:51.226093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c7e1a9f402'
+down_revision: Union[str, Sequence[str], None] = 'd8a1f5c3e927'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    İşleniyor (StatusCode NULL) satırlarına süre sınırı: IDEMPOTENCY_LEASE_SECONDS'i aşan claim
+    başka bir istek tarafından devralınabilir. Eski satırlarda ClaimedAt NULL (CreatedAt kullanılır).
+    """
+    op.execute("""
+    IF COL_LENGTH('dbo.IdempotencyKey', 'ClaimedAt') IS NULL
+        ALTER TABLE dbo.IdempotencyKey ADD ClaimedAt DATETIME NULL;
+    """)
+    op.execute("""
+    IF COL_LENGTH('dbo.IdempotencyKey', 'ClaimToken') IS NULL
+        ALTER TABLE dbo.IdempotencyKey ADD ClaimToken VARCHAR(32) NULL;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+    IF COL_LENGTH('dbo.IdempotencyKey', 'ClaimToken') IS NOT NULL
+        ALTER TABLE dbo.IdempotencyKey DROP COLUMN ClaimToken;
+    """)
+    op.execute("""
+    IF COL_LENGTH('dbo.IdempotencyKey', 'ClaimedAt') IS NOT NULL
+        ALTER TABLE dbo.IdempotencyKey DROP COLUMN ClaimedAt;
+    """)
@@ -0,0 +1,63 @@
+"""Part reservations: Part.ReservedQty + PartReservation
+
+Revision ID: b3f7a1c9e254
+Revises: a9d4e2f7c816
+Create Date: 2026-10-18 16:32:07.480915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f7a1c9e254'
+down_revision: Union[str, Sequence[str], None] = 'a9d4e2f7c816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Part.ReservedQty (aktif rezervasyon toplamı) + PartReservation tablosu."""
+    # güvenli ekleme: nullable + default -> veri doldur -> not null
+    op.add_column('Part', sa.Column('ReservedQty', sa.Integer(), nullable=True, server_default=sa.text('0')))
+    op.execute("UPDATE Part SET ReservedQty = 0 WHERE ReservedQty IS NULL")
+    op.alter_column('Part', 'ReservedQty', existing_type=sa.Integer(), nullable=False)
+
+    op.create_table(
+        'PartReservation',
+        sa.Column('ReservationID', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('WorkOrderID', sa.Integer(), sa.ForeignKey('WorkOrder.WorkOrderID'), nullable=False),
+        sa.Column('PartID', sa.Integer(), sa.ForeignKey('Part.PartID'), nullable=False),
+        sa.Column('Qty', sa.Integer(), nullable=False),
+        sa.Column('Status_s', sa.String(length=20), nullable=False, server_default=sa.text("'Active'")),
+        sa.Column('CreatedAt', sa.DateTime(), nullable=False, server_default=sa.text('SYSUTCDATETIME()')),
+        sa.Column('ClosedAt', sa.DateTime(), nullable=True),
+        sa.Column('TxnID', sa.Integer(), nullable=True),
+        sa.CheckConstraint("Status_s in ('Active','Consumed','Released')", name='CK_PartReservation_Status'),
+        sa.CheckConstraint('Qty >= 0', name='CK_PartReservation_Qty'),
+        sa.PrimaryKeyConstraint('ReservationID', name='PK_PartReservation'),
+    )
+    op.execute("""
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'UX_PartReservation_Active'
+          AND object_id = OBJECT_ID('dbo.PartReservation')
+    )
+        CREATE UNIQUE INDEX UX_PartReservation_Active ON dbo.PartReservation (WorkOrderID, PartID)
+        WHERE Status_s = 'Active';
+    """)
+    op.execute("""
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'IX_PartReservation_PartID'
+          AND object_id = OBJECT_ID('dbo.PartReservation')
+    )
+        CREATE INDEX IX_PartReservation_PartID ON dbo.PartReservation (PartID);
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('PartReservation')
+    op.drop_column('Part', 'ReservedQty', mssql_drop_default=True)
@@ -0,0 +1,57 @@
+"""daily report rollups (MachineFailureDaily, PartConsumptionDaily)
+
+Revision ID: b5d2f8a41c67
+Revises: a7c3e91d2b40
+Create Date: 2026-10-18 10:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2f8a41c67'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e91d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Rollup tabloları + mevcut verilerden backfill."""
+    op.create_table(
+        'MachineFailureDaily',
+        sa.Column('Day', sa.Date(), nullable=False),
+        sa.Column('MachineID', sa.Integer(), sa.ForeignKey('Machine.MachineID'), nullable=False),
+        sa.Column('FailureCount', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.PrimaryKeyConstraint('Day', 'MachineID', name='PK_MachineFailureDaily'),
+    )
+    op.create_table(
+        'PartConsumptionDaily',
+        sa.Column('Day', sa.Date(), nullable=False),
+        sa.Column('PartID', sa.Integer(), sa.ForeignKey('Part.PartID'), nullable=False),
+        sa.Column('QtyOut', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.PrimaryKeyConstraint('Day', 'PartID', name='PK_PartConsumptionDaily'),
+    )
+
+    # Backfill (sonradan: python -m app.scripts.rebuild_rollups)
+    op.execute("""
+    INSERT INTO dbo.MachineFailureDaily (Day, MachineID, FailureCount)
+    SELECT CAST(OpenedAt AS DATE), MachineID, COUNT(*)
+    FROM dbo.MaintenanceRequest
+    GROUP BY CAST(OpenedAt AS DATE), MachineID;
+    """)
+    op.execute("""
+    INSERT INTO dbo.PartConsumptionDaily (Day, PartID, QtyOut)
+    SELECT CAST(TxnDate AS DATE), PartID, SUM(Quantity)
+    FROM dbo.WarehouseTxn
+    WHERE TxnType = 'OUT'
+    GROUP BY CAST(TxnDate AS DATE), PartID;
+    """)
+
+
+def downgrade() -> None:
+    """Rollup tablolarını kaldır (ham veriler etkilenmez)."""
+    op.drop_table('PartConsumptionDaily')
+    op.drop_table('MachineFailureDaily')
@@ -0,0 +1,64 @@
+"""report covering / filtered indexes
+
+Revision ID: c3e8a1f5d920
+Revises: b5d2f8a41c67
+Create Date: 2026-10-18 12:41:07.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a1f5d920'
+down_revision: Union[str, Sequence[str], None] = 'b5d2f8a41c67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (ad, tablo, CREATE ifadesi) — planlar: python -m scripts.explain_report_plans
+INDEXES = [
+    # Tüketim raporu (source=raw) + rollup rebuild: TxnType='OUT' AND TxnDate aralığı
+    ("IX_WarehouseTxn_TxnType_TxnDate", "WarehouseTxn",
+     "CREATE INDEX IX_WarehouseTxn_TxnType_TxnDate ON dbo.WarehouseTxn (TxnType, TxnDate) "
+     "INCLUDE (PartID, Quantity)"),
+    # Arıza raporu (source=raw) + rollup rebuild: OpenedAt aralığı, MachineID ile gruplama
+    ("IX_MaintenanceRequest_OpenedAt", "MaintenanceRequest",
+     "CREATE INDEX IX_MaintenanceRequest_OpenedAt ON dbo.MaintenanceRequest (OpenedAt) "
+     "INCLUDE (MachineID)"),
+    # Açık WO yaş raporu: yalnızca açık satırlar, WorkOrderID desc keyset
+    ("IX_WorkOrder_Open", "WorkOrder",
+     "CREATE INDEX IX_WorkOrder_Open ON dbo.WorkOrder (WorkOrderID) "
+     "INCLUDE (RequestID, OpenedAt) WHERE ClosedAt IS NULL"),
+    # 961e99eab619 autogenerate ile düşürülmüştü; parça bazlı hareket listesi/ledger için geri
+    ("IX_WarehouseTxn_PartID", "WarehouseTxn",
+     "CREATE INDEX IX_WarehouseTxn_PartID ON dbo.WarehouseTxn (PartID)"),
+]
+
+
+def upgrade() -> None:
+    """Rapor sorguları için covering/filtered indeksler (varsa atla)."""
+    for name, table, ddl in INDEXES:
+        op.execute(f"""
+        IF NOT EXISTS (
+            SELECT 1 FROM sys.indexes
+            WHERE [name] = '{name}'
+              AND object_id = OBJECT_ID('dbo.{table}')
+        )
+            {ddl};
+        """)
+
+
+def downgrade() -> None:
+    """İndeksleri kaldır (IX_WarehouseTxn_PartID dahil; 961e99eab619 sonrası durum)."""
+    for name, table, _ in reversed(INDEXES):
+        op.execute(f"""
+        IF EXISTS (
+            SELECT 1 FROM sys.indexes
+            WHERE [name] = '{name}'
+              AND object_id = OBJECT_ID('dbo.{table}')
+        )
+            DROP INDEX {name} ON dbo.{table};
+        """)
@@ -0,0 +1,42 @@
+"""filtered index for open purchase orders (on-order netting)
+
+Revision ID: c6e2d9b4a718
+Revises: b3f7a1c9e254
+Create Date: 2026-10-18 17:05:44.913260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e2d9b4a718'
+down_revision: Union[str, Sequence[str], None] = 'b3f7a1c9e254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Reorder önerisindeki OnOrderQty toplamı: yalnızca Created/Ordered PO'lar."""
+    op.execute("""
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'IX_PurchaseOrder_Open_PartID'
+          AND object_id = OBJECT_ID('dbo.PurchaseOrder')
+    )
+        CREATE INDEX IX_PurchaseOrder_Open_PartID ON dbo.PurchaseOrder (PartID)
+        INCLUDE (Qty) WHERE Status_s IN ('Created','Ordered');
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+    IF EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'IX_PurchaseOrder_Open_PartID'
+          AND object_id = OBJECT_ID('dbo.PurchaseOrder')
+    )
+        DROP INDEX IX_PurchaseOrder_Open_PartID ON dbo.PurchaseOrder;
+    """)
@@ -0,0 +1,58 @@
+"""optional nonclustered columnstore on WarehouseTxn
+
+Revision ID: d81f4c2a6b39
+Revises: c3e8a1f5d920
+Create Date: 2026-10-18 13:22:51.904117
+
+Opsiyonel: yalnızca istenirse oluşturulur (SQL Server 2016+ güncellenebilir NCCI).
+    alembic -x columnstore=1 upgrade head
+    (ya da ortamda WAREHOUSE_COLUMNSTORE=1)
+Bayraksız upgrade no-op'tur; sonradan eklemek için:
+    alembic -x columnstore=1 downgrade c3e8a1f5d920 && alembic -x columnstore=1 upgrade head
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f4c2a6b39'
+down_revision: Union[str, Sequence[str], None] = 'c3e8a1f5d920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _enabled() -> bool:
+    x = context.get_x_argument(as_dictionary=True).get("columnstore")
+    val = x if x is not None else os.getenv("WAREHOUSE_COLUMNSTORE", "0")
+    return str(val).strip().lower() in ("1", "true", "yes", "on")
+
+
+def upgrade() -> None:
+    """NCCI_WarehouseTxn_Analytics (bayrak açıksa; sürüm < 2016 ise atla)."""
+    if not _enabled():
+        return
+    op.execute("""
+    IF CAST(SERVERPROPERTY('ProductMajorVersion') AS INT) >= 13
+       AND NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'NCCI_WarehouseTxn_Analytics'
+          AND object_id = OBJECT_ID('dbo.WarehouseTxn')
+    )
+        CREATE NONCLUSTERED COLUMNSTORE INDEX NCCI_WarehouseTxn_Analytics
+        ON dbo.WarehouseTxn (PartID, TxnType, Quantity, TxnDate, WorkOrderID);
+    """)
+
+
+def downgrade() -> None:
+    """Varsa kaldır (bayraktan bağımsız)."""
+    op.execute("""
+    IF EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'NCCI_WarehouseTxn_Analytics'
+          AND object_id = OBJECT_ID('dbo.WarehouseTxn')
+    )
+        DROP INDEX NCCI_WarehouseTxn_Analytics ON dbo.WarehouseTxn;
+    """)
@@ -0,0 +1,41 @@
+"""keyset index for purchase order list (PODate, POID)
+
+Revision ID: d8a1f5c3e927
+Revises: c6e2d9b4a718
+Create Date: 2026-10-18 18:12:07.402581
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a1f5c3e927'
+down_revision: Union[str, Sequence[str], None] = 'c6e2d9b4a718'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """PO listesi ?sort=PODate / -PODate imleçli sayfalama: (PODate, POID) seek."""
+    op.execute("""
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'IX_PurchaseOrder_PODate_POID'
+          AND object_id = OBJECT_ID('dbo.PurchaseOrder')
+    )
+        CREATE INDEX IX_PurchaseOrder_PODate_POID ON dbo.PurchaseOrder (PODate, POID);
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+    IF EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'IX_PurchaseOrder_PODate_POID'
+          AND object_id = OBJECT_ID('dbo.PurchaseOrder')
+    )
+        DROP INDEX IX_PurchaseOrder_PODate_POID ON dbo.PurchaseOrder;
+    """)
@@ -0,0 +1,68 @@
+"""WarehouseTxn archive + monthly summary tables
+
+Revision ID: e4a7b9c1d052
+Revises: d81f4c2a6b39
+Create Date: 2026-10-18 14:05:12.337815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7b9c1d052'
+down_revision: Union[str, Sequence[str], None] = 'd81f4c2a6b39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Arşiv ve aylık özet tabloları (veri taşıma: python -m app.scripts.archive_txns)."""
+    op.create_table(
+        'WarehouseTxnArchive',
+        sa.Column('TxnID', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('PartID', sa.Integer(), nullable=False),
+        sa.Column('TxnType', sa.String(length=3), nullable=False),
+        sa.Column('Quantity', sa.Integer(), nullable=False),
+        sa.Column('TxnDate', sa.DateTime(), nullable=False),
+        sa.Column('Reason', sa.String(length=100), nullable=True),
+        sa.Column('WorkOrderID', sa.Integer(), nullable=True),
+        sa.Column('POID', sa.Integer(), nullable=True),
+        sa.Column('ArchivedAt', sa.DateTime(), nullable=False, server_default=sa.text('SYSUTCDATETIME()')),
+        sa.PrimaryKeyConstraint('TxnID', name='PK_WarehouseTxnArchive'),
+    )
+    op.execute("""
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'IX_WarehouseTxnArchive_PartID'
+          AND object_id = OBJECT_ID('dbo.WarehouseTxnArchive')
+    )
+        CREATE INDEX IX_WarehouseTxnArchive_PartID ON dbo.WarehouseTxnArchive (PartID);
+    """)
+    op.execute("""
+    IF NOT EXISTS (
+        SELECT 1 FROM sys.indexes
+        WHERE [name] = 'IX_WarehouseTxnArchive_TxnType_TxnDate'
+          AND object_id = OBJECT_ID('dbo.WarehouseTxnArchive')
+    )
+        CREATE INDEX IX_WarehouseTxnArchive_TxnType_TxnDate ON dbo.WarehouseTxnArchive (TxnType, TxnDate)
+        INCLUDE (PartID, Quantity);
+    """)
+
+    op.create_table(
+        'WarehouseTxnMonthly',
+        sa.Column('PartID', sa.Integer(), sa.ForeignKey('Part.PartID'), nullable=False),
+        sa.Column('Month', sa.Date(), nullable=False),
+        sa.Column('QtyIn', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('QtyOut', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.Column('TxnCount', sa.Integer(), nullable=False, server_default=sa.text('0')),
+        sa.PrimaryKeyConstraint('PartID', 'Month', name='PK_WarehouseTxnMonthly'),
+    )
+
+
+def downgrade() -> None:
+    """Tabloları kaldır. DİKKAT: arşivdeki satırlar önce WarehouseTxn'e geri taşınmalı."""
+    op.drop_table('WarehouseTxnMonthly')
+    op.drop_table('WarehouseTxnArchive')
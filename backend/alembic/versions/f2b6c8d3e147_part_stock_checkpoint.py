@@ -0,0 +1,33 @@
+"""PartStockCheckpoint table
+
+Revision ID: f2b6c8d3e147
+Revises: e4a7b9c1d052
+Create Date: 2026-10-18 15:11:48.602931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6c8d3e147'
+down_revision: Union[str, Sequence[str], None] = 'e4a7b9c1d052'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Ay başı stok kontrol noktaları (doldurma: python -m app.scripts.build_stock_checkpoints --full)."""
+    op.create_table(
+        'PartStockCheckpoint',
+        sa.Column('PartID', sa.Integer(), sa.ForeignKey('Part.PartID'), nullable=False),
+        sa.Column('AsOf', sa.DateTime(), nullable=False),
+        sa.Column('Balance', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('PartID', 'AsOf', name='PK_PartStockCheckpoint'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('PartStockCheckpoint')
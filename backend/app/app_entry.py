@@ -1,12 +1,12 @@
 ﻿from typing import Optional, Literal
-from datetime import date
+from datetime import date, datetime
 
-from fastapi import FastAPI, APIRouter, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.core.db import SessionLocal
-from app.models import PurchaseOrder, WarehouseTxn
-from app.services.purchase_service import list_pos
+from app.services.purchase_service import create_po as create_po_svc, list_pos
+from app.services.warehouse_service import list_txns
 from app.routers.purchase import router as purchase_router  # place/receive
 
 print("=== LOADED app.app_entry ===")
@@ -43,22 +43,14 @@ def create_po(payload: dict):
     from traceback import format_exc
     db: Session = SessionLocal()
     try:
-        sid   = int(payload["SupplierID"])
-        pid   = int(payload["PartID"])
-        qty   = int(payload["Qty"])
-        price = float(str(payload["UnitPrice"]).replace(",", "."))
-
-        po = PurchaseOrder(
-            SupplierID=sid,
-            PartID=pid,
-            Qty=qty,
-            UnitPrice=price,
-            Status_s="Created",
-            PODate=date.today(),
+        # Kayıt servis üzerinden (doğrulama + PO sayım önbelleği invalidasyonu)
+        po = create_po_svc(
+            db,
+            supplier_id=int(payload["SupplierID"]),
+            part_id=int(payload["PartID"]),
+            qty=int(payload["Qty"]),
+            unit_price=str(payload["UnitPrice"]).replace(",", "."),
         )
-        db.add(po)
-        db.commit()
-        db.refresh(po)
 
         return {
             "POID": po.POID,
@@ -69,6 +61,8 @@ def create_po(payload: dict):
             "Status_s": po.Status_s,
             "PODate": po.PODate.isoformat() if getattr(po, "PODate", None) else None,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         return {"error": str(e), "trace": format_exc()[:1200]}
@@ -136,14 +130,26 @@ def warehouse_ping():
     return {"ok": True}
 
 @warehouse.get("/txns")
-def list_warehouse_txns():
+def list_warehouse_txns(
+    part_id: Optional[int] = Query(None, ge=1),
+    txn_type: Optional[Literal["IN", "OUT"]] = Query(None),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    before_id: Optional[int] = Query(None, ge=1),
+    limit: int = Query(100, ge=1, le=500),
+):
     db: Session = SessionLocal()
     try:
-        rows = (
-            db.query(WarehouseTxn)
-              .order_by(WarehouseTxn.TxnID.desc())
-              .limit(100)
-              .all()
+        # keyset sayfalı servis (sonraki sayfa: before_id = son TxnID)
+        rows = list_txns(
+            db,
+            part_id=part_id,
+            txn_type=txn_type,
+            date_from=date_from,
+            date_to=date_to,
+            before_id=before_id,
+            limit=limit,
+            sort="-TxnID",
         )
         return [
             {
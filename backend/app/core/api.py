@@ -24,11 +24,12 @@ def ok(data: Any = True, meta: Optional[Dict[str, Any]] = None, status_code: int
         payload["meta"] = meta
     return UTF8JSONResponse(content=payload, status_code=status_code)
 
-def fail(error: str, status_code: int = 400, meta: Optional[Dict[str, Any]] = None):
+def fail(error: str, status_code: int = 400, meta: Optional[Dict[str, Any]] = None,
+         headers: Optional[Dict[str, str]] = None):
     payload: Dict[str, Any] = {"ok": False, "error": error}
     if meta:
         payload["meta"] = meta
-    return UTF8JSONResponse(content=payload, status_code=status_code)
+    return UTF8JSONResponse(content=payload, status_code=status_code, headers=headers)
 
 def redirect_permanent(url: str):
     return RedirectResponse(url=url, status_code=308)
@@ -0,0 +1,106 @@
+# backend/app/core/cache.py
+"""
+Süreç içi (in-process) önbellek yardımcıları.
+TTLCache: boyut sınırlı LRU + TTL, etiket (tag) bazlı geçersiz kılma, hit/miss sayaçları.
+Not: her uvicorn worker'ının kendi önbelleği vardır; TTL bayatlığı sınırlar.
+"""
+from __future__ import annotations
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, *, maxsize: int = 256, ttl: float = 60.0, name: str = "cache"):
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self._data: "OrderedDict[Hashable, tuple[float, frozenset, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: Hashable, value: Any, *, tags: Iterable[str] = (), ttl: Optional[float] = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else float(ttl))
+        with self._lock:
+            self._data[key] = (expires, frozenset(tags), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, _MISSING) is not _MISSING:
+                self.invalidations += 1
+
+    def invalidate_tags(self, *tags: str) -> None:
+        wanted = set(tags)
+        with self._lock:
+            stale = [k for k, (_, t, _) in self._data.items() if t & wanted]
+            for k in stale:
+                del self._data[k]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttlSeconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRatio": round(self.hits / total, 4) if total else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# ---- Rapor önbelleği ----
+# Etiketler: hangi yazma hangi raporu bayatlatır
+TAG_FAILURES = "failures"        # MaintenanceRequest -> top-failure-machines
+TAG_CONSUMPTION = "consumption"  # OUT hareketleri   -> top-consumed-parts
+TAG_AGING = "aging"              # WorkOrder aç/kapa -> open-workorders-aging
+
+report_cache = TTLCache(
+    maxsize=int(os.getenv("REPORT_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("REPORT_CACHE_TTL_SECONDS", "60")),
+    name="reports",
+)
+
+
+# ---- Liste toplamları (X-Total-Count) ----
+# İmleçli (keyset) sayfalarda toplam her seferinde yeniden sayılmaz; yazmalar etiketle düşürür
+TAG_PURCHASE_ORDERS = "purchase-orders"
+
+count_cache = TTLCache(
+    maxsize=int(os.getenv("COUNT_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("COUNT_CACHE_TTL_SECONDS", "30")),
+    name="counts",
+)
@@ -0,0 +1,65 @@
+# backend/app/core/columnstore.py
+"""
+WarehouseTxn analitik modu (opsiyonel nonclustered columnstore).
+- İndeks migration'ı: alembic -x columnstore=1 upgrade head  (bkz. d81f4c2a6b39)
+- WAREHOUSE_COLUMNSTORE=1 ve indeks mevcutsa, yalnızca geniş tarih aralıklı toplama sorgularına
+  (>= WAREHOUSE_COLUMNSTORE_MIN_DAYS gün) MSSQL index hint'i eklenir (batch-mode toplama).
+  Dar aralıklarda optimizer serbest kalır (IX_WarehouseTxn_TxnType_TxnDate seek'i daha ucuz).
+- MSSQL dışı backend'de ya da indeks yoksa sorgu aynen kalır.
+"""
+from __future__ import annotations
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .dialect import dialect_name
+
+from ..models.warehouse_txn import WarehouseTxn
+
+NCCI_NAME = "NCCI_WarehouseTxn_Analytics"
+COLUMNSTORE_ENABLED = os.getenv("WAREHOUSE_COLUMNSTORE", "0").strip().lower() in ("1", "true", "yes", "on")
+COLUMNSTORE_MIN_DAYS = int(os.getenv("WAREHOUSE_COLUMNSTORE_MIN_DAYS", "180"))
+
+_present: Optional[bool] = None
+_lock = threading.Lock()
+
+
+def columnstore_available(db: Session) -> bool:
+    """Bayrak açık + MSSQL + indeks var mı (ilk çağrıda bir kez kontrol edilir)."""
+    global _present
+    if not COLUMNSTORE_ENABLED or dialect_name(db) != "mssql":
+        return False
+    if _present is None:
+        with _lock:
+            if _present is None:
+                try:
+                    _present = bool(db.execute(text("""
+                        SELECT 1 FROM sys.indexes
+                        WHERE [name] = :name
+                          AND object_id = OBJECT_ID('dbo.WarehouseTxn')
+                          AND [type] = 6
+                    """), {"name": NCCI_NAME}).scalar())
+                except Exception:
+                    _present = False
+    return _present
+
+
+def reset_columnstore_check() -> None:
+    """İndeks sonradan oluşturulur/kaldırılırsa bir sonraki çağrıda yeniden kontrol et."""
+    global _present
+    with _lock:
+        _present = None
+
+
+def with_columnstore(stmt, db: Session, span_days: Optional[int]):
+    """
+    WarehouseTxn üzerinde toplama yapan select'e NCCI hint'i ekler; aralık COLUMNSTORE_MIN_DAYS'ten
+    kısaysa (ya da bilinmiyorsa) hint eklenmez, plan seçimi optimizer'a kalır.
+    select() ve ORM Query ikisi de with_hint destekler; diğer dialect'lerde hint derlenmez.
+    """
+    if span_days is None or span_days < COLUMNSTORE_MIN_DAYS or not columnstore_available(db):
+        return stmt
+    return stmt.with_hint(WarehouseTxn, f"WITH (INDEX({NCCI_NAME}))", dialect_name="mssql")
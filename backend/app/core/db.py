@@ -5,6 +5,8 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.engine import make_url
 from dotenv import dotenv_values, load_dotenv, find_dotenv
 
+from app.core.dialect import configure_engine
+
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 DEFAULT_DOTENV = os.path.join(BASE_DIR, ".env")
 
@@ -34,6 +36,7 @@ elif backend.startswith("mssql"):
     engine_kwargs.update(pool_size=5, max_overflow=10, fast_executemany=True)
 
 engine = create_engine(DSN, **engine_kwargs)
+configure_engine(engine)  # SQLite: WAL + foreign_keys + busy_timeout (diğer lehçelerde no-op)
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
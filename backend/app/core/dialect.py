@@ -0,0 +1,194 @@
+# backend/app/core/dialect.py
+"""
+Veritabanı lehçesi (dialect) farkları tek yerde. Üretim SQL Server; yerel deney / test /
+benchmark için aynı API dosya tabanlı SQLite üzerinde de çalışır (PostgreSQL de desteklenir).
+
+- dialect_name(db)        : "mssql" | "sqlite" | "postgresql" | ... (servislerdeki dallanmalar için)
+- for_update(stmt, *ents) : satır kilidi; MSSQL WITH (UPDLOCK, ROWLOCK) ipucu, PostgreSQL/MySQL
+                            FOR UPDATE. SQLite'ta satır kilidi yok: sorgudan önce BEGIN IMMEDIATE ile
+                            veritabanı yazma kilidi alınır (oku-değiştir-yaz kaybolmaz; bekleme
+                            busy_timeout, aşılırsa "database is locked" -> @transactional yeniden dener)
+- utcnow() / utctoday()   : server_default için UTC şimdi / bugün
+                            (MSSQL SYSUTCDATETIME(), SQLite strftime('now'), PostgreSQL timezone('utc', now()))
+- localnow()              : sunucu yerel saati (MSSQL SYSDATETIME()); yalnızca AppUser.CreatedAt gibi
+                            tarihsel olarak yerel saat tutan kolonlar için
+- TOP / LIMIT             : ham SQL yerine select(...).limit(n) kullanın; MSSQL'de TOP n olarak derlenir
+- configure_engine(engine): SQLite bağlantı ayarları (WAL, foreign_keys, busy_timeout); oturum
+                            düzeyinde kilit beklemesi değiştirilen bağlantı havuza dönerken varsayılana döner
+"""
+from __future__ import annotations
+from typing import Any
+
+from sqlalchemy import Date, DateTime, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+ROWLOCK_HINT = "WITH (UPDLOCK, ROWLOCK)"
+# Aralık kilidi: satır henüz yoksa da anahtar aralığı tutulur (eşzamanlı INSERT/kontrol yarışı)
+RANGELOCK_HINT = "WITH (UPDLOCK, HOLDLOCK)"
+# for_update() sorgularını işaretler; SQLite'ta configure_engine bu sorgudan önce yazma kilidi alır
+ROW_LOCK_OPTION = "row_lock"
+# Bağlantı kaydı (pool record) işareti: kilit bekleme süresi değiştirildi; checkin'de sıfırlanır
+LOCK_TIMEOUT_INFO_KEY = "lock_timeout_set"
+
+
+def dialect_name(db_or_bind: Any) -> str:
+    """Session, Connection ya da Engine için lehçe adı; belirlenemezse "unknown"."""
+    try:
+        bind = db_or_bind.get_bind() if hasattr(db_or_bind, "get_bind") else db_or_bind
+        return bind.dialect.name
+    except Exception:
+        return "unknown"
+
+
+def for_update(stmt, *entities, hint: str = ROWLOCK_HINT, **for_update_kw):
+    """
+    select(...) / db.query(...) için taşınabilir satır kilidi.
+    entities: ipucunun ekleneceği tablolar (varsayılan: ilk FROM). Örn:
+        db.execute(for_update(select(Part).where(Part.PartID == pid))).scalar_one_or_none()
+    """
+    if not entities:
+        froms = stmt.get_final_froms() if hasattr(stmt, "get_final_froms") else stmt.statement.get_final_froms()
+        entities = tuple(froms[:1])
+    for ent in entities:
+        stmt = stmt.with_hint(ent, hint, dialect_name="mssql")
+    return stmt.with_for_update(**for_update_kw).execution_options(**{ROW_LOCK_OPTION: True})
+
+
+# =========================
+# UTC server default'ları
+# =========================
+class utcnow(FunctionElement):
+    """DateTime server_default: Column(DateTime, server_default=utcnow())."""
+    type = DateTime()
+    inherit_cache = True
+
+
+class utctoday(FunctionElement):
+    """Date server_default (UTC bugün)."""
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"  # yalnızca bilinmeyen lehçeler (oturum saat dilimi UTC varsayılır)
+
+
+@compiles(utcnow, "mssql")
+def _utcnow_mssql(element, compiler, **kw):
+    return "SYSUTCDATETIME()"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    # SQLAlchemy'nin SQLite DateTime biçimi (mikrosaniye hassasiyeti ile)
+    return "(strftime('%Y-%m-%d %H:%M:%f', 'now'))"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_pg(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+
+class localnow(FunctionElement):
+    """DateTime server_default, sunucu yerel saati (UTC değil)."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(localnow)
+def _localnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(localnow, "mssql")
+def _localnow_mssql(element, compiler, **kw):
+    return "SYSDATETIME()"
+
+
+@compiles(localnow, "sqlite")
+def _localnow_sqlite(element, compiler, **kw):
+    return "(strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))"
+
+
+@compiles(localnow, "postgresql")
+def _localnow_pg(element, compiler, **kw):
+    return "LOCALTIMESTAMP"
+
+
+@compiles(utctoday)
+def _utctoday_default(element, compiler, **kw):
+    return "CURRENT_DATE"
+
+
+@compiles(utctoday, "mssql")
+def _utctoday_mssql(element, compiler, **kw):
+    return "CAST(SYSUTCDATETIME() AS DATE)"
+
+
+@compiles(utctoday, "sqlite")
+def _utctoday_sqlite(element, compiler, **kw):
+    return "(date('now'))"
+
+
+@compiles(utctoday, "postgresql")
+def _utctoday_pg(element, compiler, **kw):
+    return "CAST(timezone('utc', now()) AS DATE)"
+
+
+# =========================
+# Engine ayarları
+# =========================
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+
+def configure_engine(engine: Engine) -> None:
+    """
+    SQLite: her bağlantıda foreign_keys + busy_timeout; dosya veritabanında WAL (okur/yazar
+    bloklamaz). for_update() sorgusu transaction dışında çalışacaksa önce BEGIN IMMEDIATE.
+    """
+    # MSSQL SET LOCK_TIMEOUT / SQLite busy_timeout bağlantıya yapışır; havuzdaki sonraki
+    # kullanıcıya sızmasın (PostgreSQL SET LOCAL zaten transaction sonunda düşer)
+    reset_sql = {
+        "mssql": "SET LOCK_TIMEOUT -1",
+        "sqlite": f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT_MS)}",
+    }.get(engine.dialect.name)
+    if reset_sql is not None:
+        @event.listens_for(engine, "checkin")
+        def _reset_lock_timeout(dbapi_conn, record):
+            if dbapi_conn is None or not record.info.pop(LOCK_TIMEOUT_INFO_KEY, False):
+                return
+            try:
+                cur = dbapi_conn.cursor()
+                try:
+                    cur.execute(reset_sql)
+                finally:
+                    cur.close()
+            except Exception:
+                record.invalidate()  # sıfırlanamayan bağlantı havuzda kalmasın
+
+    if engine.dialect.name != "sqlite":
+        return
+    in_memory = engine.url.database in (None, "", ":memory:")
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        try:
+            cur.execute("PRAGMA foreign_keys = ON")
+            cur.execute(f"PRAGMA busy_timeout = {int(SQLITE_BUSY_TIMEOUT_MS)}")
+            if not in_memory:
+                cur.execute("PRAGMA journal_mode = WAL")
+                cur.execute("PRAGMA synchronous = NORMAL")
+        finally:
+            cur.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _sqlite_row_lock(conn, cursor, statement, parameters, context, executemany):
+        # pysqlite SELECT için transaction açmaz; kilitli okuma iki istekte aynı stoğu görmesin
+        if context is None or not context.execution_options.get(ROW_LOCK_OPTION):
+            return
+        if not conn.connection.dbapi_connection.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
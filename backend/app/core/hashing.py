@@ -0,0 +1,99 @@
+# backend/app/core/hashing.py
+"""
+Parola hash/doğrulama için ayrı, sınırlı bir süreç havuzu.
+- bcrypt CPU işi FastAPI'nin ortak threadpool'unu işgal etmez
+- Bekleyen iş sayısı PWD_POOL_MAX_PENDING'i aşarsa hemen 503 + Retry-After döner
+- Süreçler forkserver (yoksa spawn) ile başlar: çok thread'li süreçte fork, kilitli durumdaki
+  mutex'leri (logging, DB sürücüsü) çocuğa kopyalayabilir
+- Havuz uygulama lifespan'inin kapanışında shutdown_pool ile kapatılır
+Not: bu modül DB/ayar import etmez; havuz süreçleri yalnızca passlib yükler.
+"""
+from __future__ import annotations
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+PWD_POOL_WORKERS = int(os.getenv("PWD_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+PWD_POOL_MAX_PENDING = int(os.getenv("PWD_POOL_MAX_PENDING", str(max(1, PWD_POOL_WORKERS) * 8)))
+PWD_RETRY_AFTER_SECONDS = int(os.getenv("PWD_RETRY_AFTER_SECONDS", "2"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pending = 0
+_pending_lock = threading.Lock()
+_rejected = 0
+
+
+# ---- Havuz süreçlerinde çalışan fonksiyonlar (pickle edilebilir, modül seviyesi) ----
+def _verify(plain: str, hashed: str) -> bool:
+    return pwd_context.verify(plain, hashed)
+
+def _hash(plain: str) -> str:
+    return pwd_context.hash(plain)
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    # PWD_POOL_WORKERS=0: havuz yok, iş ayrı bir thread'de yapılır (test/geliştirme)
+    global _pool
+    if PWD_POOL_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PWD_POOL_WORKERS, mp_context=_mp_context())
+        return _pool
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def pool_stats() -> dict:
+    with _pending_lock:
+        return {
+            "workers": PWD_POOL_WORKERS,
+            "maxPending": PWD_POOL_MAX_PENDING,
+            "pending": _pending,
+            "rejected": _rejected,
+        }
+
+
+async def _submit(fn, *args):
+    global _pending, _rejected
+    with _pending_lock:
+        if _pending >= PWD_POOL_MAX_PENDING:
+            _rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Giriş kuyruğu dolu, lütfen kısa süre sonra tekrar deneyin",
+                headers={"Retry-After": str(PWD_RETRY_AFTER_SECONDS)},
+            )
+        _pending += 1
+    try:
+        pool = _get_pool()
+        if pool is None:
+            return await asyncio.to_thread(fn, *args)
+        return await asyncio.wrap_future(pool.submit(fn, *args))
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _submit(_verify, plain, hashed)
+
+async def hash_password_async(plain: str) -> str:
+    return await _submit(_hash, plain)
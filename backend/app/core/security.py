@@ -1,29 +1,35 @@
 # backend/app/core/security.py
 import os
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Optional
+from typing import Annotated, NamedTuple, Optional
 
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.security.utils import get_authorization_scheme_param
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
+from .cache import TTLCache
+from .hashing import pwd_context
 from .db import get_db
 from ..models.user import AppUser  # ALLOWED_ROLES gerekirse ekle
 
 # OpenAPI için şema kalsın (login formuna dair dokümantasyon)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-# Parola hash kalıbı
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret-change-me")
 ALGORITHM = os.getenv("JWT_ALG", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 
-# ---- Parola yardımcıları ----
+# Username -> Principal önbelleği (guard'lı uçlarda AppUser point-lookup'ını keser).
+# Rol/aktiflik değişiminde invalidate_principal çağrılır; TTL diğer worker'lardaki bayatlığı sınırlar.
+principal_cache = TTLCache(
+    maxsize=int(os.getenv("AUTH_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30")),
+    name="principals",
+)
+
+# ---- Parola yardımcıları (senkron; script/seed için. API uçları core.hashing havuzunu kullanır) ----
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
@@ -76,32 +82,72 @@ def _extract_bearer_token(request: Request) -> str:
     return token
 
 # ---- Token'dan kullanıcıyı çöz ----
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(_extract_bearer_token),
-) -> AppUser:
-    cred_exc = HTTPException(
+class Principal(NamedTuple):
+    """Guard'lar için hafif kimlik (ORM nesnesi değil; önbellekte tutulur)."""
+    UserID: int
+    Username: str
+    Role: str
+    IsActive: bool
+
+def _cred_exc() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Kimlik doğrulaması gerekli",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _token_subject(token: str) -> str:
     try:
         data = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = data.get("sub")
-        if not username:
-            raise cred_exc
     except JWTError:
-        raise cred_exc
+        raise _cred_exc()
+    username = data.get("sub")
+    if not username:
+        raise _cred_exc()
+    return username
 
+def invalidate_principal(username: str) -> None:
+    """Rol/aktiflik değiştiğinde çağır (commit sonrası)."""
+    principal_cache.invalidate(username)
+
+def get_current_principal(
+    db: Session = Depends(get_db),
+    token: str = Depends(_extract_bearer_token),
+) -> Principal:
+    username = _token_subject(token)
+
+    principal = principal_cache.get(username)
+    if principal is None:
+        row = (
+            db.query(AppUser.UserID, AppUser.Username, AppUser.Role, AppUser.IsActive)
+            .filter(AppUser.Username == username)
+            .first()
+        )
+        if not row:
+            raise _cred_exc()
+        principal = Principal(row.UserID, row.Username, row.Role, bool(row.IsActive))
+        # Pasif kullanıcı da önbelleğe girer: tekrar eden istekler DB'ye gitmeden reddedilir
+        principal_cache.set(username, principal)
+
+    if not principal.IsActive:
+        raise _cred_exc()
+    return principal
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(_extract_bearer_token),
+) -> AppUser:
+    """Tam AppUser satırı gerektiğinde (/auth/me); her zaman DB'den okunur."""
+    username = _token_subject(token)
     user = db.query(AppUser).filter(AppUser.Username == username).first()
     if not user or not user.IsActive:
-        raise cred_exc
+        raise _cred_exc()
     return user
 
 # ---- Rol kontrol bağımlılığı ----
 def require_roles(*roles: str):
-    UserDep = Annotated[AppUser, Depends(get_current_user)]
-    def _dep(current: UserDep) -> AppUser:
+    PrincipalDep = Annotated[Principal, Depends(get_current_principal)]
+    def _dep(current: PrincipalDep) -> Principal:
         if current.Role not in roles:
             raise HTTPException(status_code=403, detail="Bu işlem için yetkin yok")
         return current
@@ -8,3 +8,6 @@ from typing import Final
 
 # Satın alma emri receive işlemi için standart reason
 REASON_PO_RECEIVE: Final[str] = "PO Receive #{}"
+
+# İş emri kapanışında rezervasyonun OUT hareketine dönüşmesi için standart reason
+REASON_WO_RESERVATION: Final[str] = "WO Reservation #{}"
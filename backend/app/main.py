@@ -1,7 +1,11 @@
 ﻿# backend/app/main.py
 import os, json
-from typing import Optional
-from fastapi import FastAPI, APIRouter, Depends, Request
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Literal, Optional
+from fastapi import FastAPI, APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi import HTTPException as FastAPIHTTPException
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -13,7 +17,7 @@ from pydantic import BaseModel, Field
 from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 
-from app.core.db import get_db, engine
+from app.core.db import get_db, engine, SessionLocal
 from app.models.user import AppUser
 from app.models import WarehouseTxn
 
@@ -22,20 +26,41 @@ from app.routers.purchase import router as purchase_router
 from app.routers.auth import router as auth_router
 from app.routers.parts import router as parts_router
 from app.routers.warehouse_guard import require_roles
+from app.core.security import Principal
 from app.routers.reports import router as reports_router
 from app.routers.maintenance import router as maintenance_router
 from app.routers.workorders import router as workorders_router
 
 # --- Service importları (IN/OUT için) ---
-from app.services.warehouse_service import create_txn
+from app.services.warehouse_service import create_txn, create_txns_bulk, list_txns, iter_txns
+from app.schemas.warehouse import WarehouseTxnBatch
+from app.services.idempotency_service import IdempotencyKeyHeader, idempotent
 
 # --- API zarfları ---
 from app.core.api import ok, fail, list_meta, UTF8JSONResponse
+from app.core.hashing import pool_stats, shutdown_pool
+from app.services.unit_of_work import tx_stats
 
 # --- CORS ---
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="TORA_M PROJECT", default_response_class=UTF8JSONResponse)
+# ---- startup: AppUser tablosu yoksa oluştur ----
+def _ensure_user_table():
+    try:
+        AppUser.__table__.create(bind=engine, checkfirst=True)
+    except Exception as e:
+        print("WARN: AppUser table create failed:", e)
+
+# ---- lifespan: açılışta tablo kontrolü, kapanışta parola hash süreç havuzu ----
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    _ensure_user_table()
+    try:
+        yield
+    finally:
+        shutdown_pool()
+
+app = FastAPI(title="TORA_M PROJECT", default_response_class=UTF8JSONResponse, lifespan=_lifespan)
 
 print("=== LOADED main.py from:", __file__)
 
@@ -54,11 +79,13 @@ async def _force_json_charset(request, call_next):
 # -----------------------------
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_to_envelope(request: Request, exc: StarletteHTTPException):
-    return fail(str(exc.detail) if exc.detail else exc.__class__.__name__, status_code=exc.status_code)
+    return fail(str(exc.detail) if exc.detail else exc.__class__.__name__, status_code=exc.status_code,
+                headers=getattr(exc, "headers", None))
 
 @app.exception_handler(FastAPIHTTPException)
 async def fastapi_http_exception_to_envelope(request: Request, exc: FastAPIHTTPException):
-    return fail(str(exc.detail) if exc.detail else exc.__class__.__name__, status_code=exc.status_code)
+    return fail(str(exc.detail) if exc.detail else exc.__class__.__name__, status_code=exc.status_code,
+                headers=getattr(exc, "headers", None))
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_to_envelope(request: Request, exc: RequestValidationError):
@@ -89,16 +116,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "Retry-After", "Idempotent-Replayed"],
 )
 
-# ---- startup: AppUser tablosu yoksa oluştur ----
-@app.on_event("startup")
-def _ensure_user_table():
-    try:
-        AppUser.__table__.create(bind=engine, checkfirst=True)
-    except Exception as e:
-        print("WARN: AppUser table create failed:", e)
-
 # ---- Sağlık uçları ----
 @app.get("/health")
 def health():
@@ -110,10 +130,20 @@ def db_ping(db: Session = Depends(get_db)):
     return ok({"db": "ok", "select1": val})
 
 # ---- Geliştirici yardımcıları ----
+AdminGuard = require_roles("admin")
+
 @app.get("/__whoami", include_in_schema=False)
 def whoami():
     return {"file": __file__}
 
+@app.get("/__pwd-pool", include_in_schema=False, dependencies=[Depends(AdminGuard)])
+def pwd_pool():
+    return pool_stats()
+
+@app.get("/__tx-stats", include_in_schema=False, dependencies=[Depends(AdminGuard)])
+def tx_retry_stats():
+    return tx_stats()
+
 @app.get("/__routes", include_in_schema=False)
 def dump_routes():
     return [getattr(r, "path", str(r)) for r in app.routes]
@@ -147,26 +177,68 @@ warehouse = APIRouter(
 def warehouse_ping():
     return {"ok": True}
 
+def _txn_dict(r) -> dict:
+    txn_date = getattr(r, "TxnDate", None)
+    d = {
+        "TxnID": r.TxnID,
+        "PartID": r.PartID,
+        "TxnType": r.TxnType,
+        "Quantity": r.Quantity,
+        "TxnDate": txn_date.isoformat() if txn_date else None,
+        "Reason": r.Reason,
+        "WorkOrderID": getattr(r, "WorkOrderID", None),
+        "POID": getattr(r, "POID", None),
+    }
+    # include_archive=true ile gelen satırlarda kaynak bilgisi
+    archived = getattr(r, "Archived", None)
+    if archived is not None:
+        d["Archived"] = bool(archived)
+    return d
+
 @warehouse.get("/txns")
-def list_warehouse_txns(db: Session = Depends(get_db)):
-    rows = (
-        db.query(WarehouseTxn)
-          .order_by(WarehouseTxn.TxnID.desc())
-          .limit(100)
-          .all()
+def list_warehouse_txns(
+    part_id: Optional[int] = Query(None, ge=1),
+    txn_type: Optional[Literal["IN", "OUT"]] = Query(None),
+    q: Optional[str] = Query(None, max_length=100, description="Reason içinde arama"),
+    date_from: Optional[datetime] = Query(None, description="UTC, dahil (TxnDate >=)"),
+    date_to: Optional[datetime] = Query(None, description="UTC, hariç (TxnDate <)"),
+    after_id: Optional[int] = Query(None, ge=0, description="Keyset imleç: TxnID > after_id"),
+    before_id: Optional[int] = Query(None, ge=1, description="Keyset imleç: TxnID < before_id"),
+    limit: int = Query(100, ge=1, le=500),
+    sort: Literal["TxnID", "-TxnID"] = Query("-TxnID"),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson: filtreye uyan tüm satırlar akış olarak (limit uygulanmaz)"),
+    include_archive: bool = Query(False, description="Arşivlenmiş (WarehouseTxnArchive) hareketleri de getir"),
+    db: Session = Depends(get_db),
+):
+    filters = dict(
+        part_id=part_id, txn_type=txn_type, q=q,
+        date_from=date_from, date_to=date_to,
+        after_id=after_id, before_id=before_id,
+        include_archive=include_archive,
     )
-    items = [
-        {
-            "TxnID": r.TxnID,
-            "PartID": r.PartID,
-            "TxnType": r.TxnType,
-            "Quantity": r.Quantity,
-            "Reason": r.Reason,
-            "WorkOrderID": getattr(r, "WorkOrderID", None),
-        }
-        for r in rows
-    ]
-    return ok(items, meta=list_meta(items))
+
+    if format == "ndjson":
+        def _stream():
+            # Akış yanıt gönderilirken sürer; istek oturumundan bağımsız session kullan
+            s = SessionLocal()
+            try:
+                for row in iter_txns(s, sort=sort, **filters):
+                    yield json.dumps(_txn_dict(SimpleNamespace(**row)), ensure_ascii=False) + "\n"
+            finally:
+                s.close()
+        return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+    rows = list_txns(db, limit=limit, sort=sort, **filters)
+    items = [_txn_dict(r) for r in rows]
+
+    # Sonraki sayfa imleci (sayfa doluysa)
+    extra = {}
+    if items and len(items) == limit:
+        if sort.startswith("-"):
+            extra["next_before_id"] = items[-1]["TxnID"]
+        else:
+            extra["next_after_id"] = items[-1]["TxnID"]
+    return ok(items, meta=list_meta(items, extra=extra))
 
 # ---- IN/OUT payload modeli ----
 class _IOPayload(BaseModel):
@@ -175,43 +247,74 @@ class _IOPayload(BaseModel):
     Reason: Optional[str] = None
     WorkOrderID: Optional[int] = None
 
+def _post_move(txn_type: str, payload: _IOPayload, db: Session, idempotency_key: Optional[str],
+               current: Principal):
+    def _do():
+        tx = create_txn(
+            db,
+            part_id=payload.PartID,
+            txn_type=txn_type,
+            quantity=payload.Quantity,
+            reason=payload.Reason,
+            workorder_id=payload.WorkOrderID,
+        )
+        return ok({
+            "TxnID": tx.TxnID,
+            "PartID": tx.PartID,
+            "TxnType": tx.TxnType,
+            "Quantity": tx.Quantity,
+            "Reason": tx.Reason,
+            "WorkOrderID": getattr(tx, "WorkOrderID", None),
+        })
+    # Idempotency-Key tekrarı: saklanan yanıt, Part kilidi alınmadan
+    return idempotent(db, scope=f"warehouse.{txn_type.lower()}", key=idempotency_key,
+                      principal=current, payload=payload.model_dump(), fn=_do)
+
 @warehouse.post("/in", status_code=201)
-def warehouse_in(payload: _IOPayload, db: Session = Depends(get_db)):
-    tx = create_txn(
-        db,
-        part_id=payload.PartID,
-        txn_type="IN",
-        quantity=payload.Quantity,
-        reason=payload.Reason,
-        workorder_id=payload.WorkOrderID,
-    )
-    return ok({
-        "TxnID": tx.TxnID,
-        "PartID": tx.PartID,
-        "TxnType": tx.TxnType,
-        "Quantity": tx.Quantity,
-        "Reason": tx.Reason,
-        "WorkOrderID": getattr(tx, "WorkOrderID", None),
-    })
+def warehouse_in(payload: _IOPayload, db: Session = Depends(get_db),
+                 idempotency_key: Optional[str] = IdempotencyKeyHeader,
+                 current: Principal = Depends(Guard)):
+    return _post_move("IN", payload, db, idempotency_key, current)
 
 @warehouse.post("/out", status_code=201)
-def warehouse_out(payload: _IOPayload, db: Session = Depends(get_db)):
-    tx = create_txn(
-        db,
-        part_id=payload.PartID,
-        txn_type="OUT",
-        quantity=payload.Quantity,
-        reason=payload.Reason,
-        workorder_id=payload.WorkOrderID,
-    )
-    return ok({
-        "TxnID": tx.TxnID,
-        "PartID": tx.PartID,
-        "TxnType": tx.TxnType,
-        "Quantity": tx.Quantity,
-        "Reason": tx.Reason,
-        "WorkOrderID": getattr(tx, "WorkOrderID", None),
-    })
+def warehouse_out(payload: _IOPayload, db: Session = Depends(get_db),
+                  idempotency_key: Optional[str] = IdempotencyKeyHeader,
+                  current: Principal = Depends(Guard)):
+    return _post_move("OUT", payload, db, idempotency_key, current)
+
+@warehouse.post("/txns:batch", status_code=201)
+def warehouse_txns_batch(payload: WarehouseTxnBatch, db: Session = Depends(get_db),
+                         idempotency_key: Optional[str] = IdempotencyKeyHeader,
+                         current: Principal = Depends(Guard)):
+    """
+    201: tüm satırlar işlendi · 207: bir kısmı işlendi (satır sonuçları data'da)
+    Hiçbiri işlenmediyse 409 (tüm hatalar stok/çakışma) ya da 422; satır hataları meta.errors'ta.
+    """
+    def _do():
+        results = create_txns_bulk(
+            db,
+            moves=[
+                {
+                    "part_id": m.PartID,
+                    "txn_type": m.TxnType,
+                    "quantity": m.Quantity,
+                    "reason": m.Reason,
+                    "workorder_id": m.WorkOrderID,
+                }
+                for m in payload.Moves
+            ],
+            atomic=payload.Atomic,
+        )
+        posted = sum(1 for r in results if r["ok"])
+        failed = len(results) - posted
+        if posted == 0:
+            code = 409 if all(r["status"] == 409 for r in results) else 422
+            return fail("Hiçbir hareket işlenmedi.", status_code=code,
+                        meta={"posted": 0, "failed": failed, "errors": results})
+        meta = list_meta(results, extra={"posted": posted, "failed": failed})
+        return ok(results, meta=meta, status_code=207 if failed else 201)
+    return idempotent(db, scope="warehouse.txns-batch", key=idempotency_key,
+                      principal=current, payload=payload.model_dump(), fn=_do)
 
 
 # =========================
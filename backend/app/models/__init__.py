@@ -7,7 +7,16 @@ from .supplier import Supplier
 from .purchase_order import PurchaseOrder
 from .warehouse_txn import WarehouseTxn
 from .user import AppUser
-__all__ = ["Machine","Technician","Part","MaintenanceRequest","WorkOrder","Supplier","PurchaseOrder","WarehouseTxn","AppUser"]
+from .machine_failure_daily import MachineFailureDaily
+from .part_consumption_daily import PartConsumptionDaily
+from .warehouse_txn_archive import WarehouseTxnArchive
+from .warehouse_txn_monthly import WarehouseTxnMonthly
+from .part_stock_checkpoint import PartStockCheckpoint
+from .idempotency_key import IdempotencyKey
+from .part_reservation import PartReservation
+__all__ = ["Machine","Technician","Part","MaintenanceRequest","WorkOrder","Supplier","PurchaseOrder","WarehouseTxn","AppUser",
+           "MachineFailureDaily","PartConsumptionDaily","WarehouseTxnArchive","WarehouseTxnMonthly",
+           "PartStockCheckpoint","IdempotencyKey","PartReservation"]
 
 
 
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, UnicodeText, Index
+from ..core.db import Base
+from ..core.dialect import utcnow
+
+class IdempotencyKey(Base):
+    """
+    Idempotency-Key başlığıyla gelen mutasyonların saklanan yanıtı (TTL ile süresi dolar).
+    StatusCode NULL: istek hâlâ işleniyor (claim); ClaimedAt + IDEMPOTENCY_LEASE_SECONDS sonra devralınabilir.
+    Scope kullanıcıya göre ayrılır (örn. "warehouse.out:12").
+    """
+    __tablename__ = "IdempotencyKey"
+
+    Scope       = Column(String(50), primary_key=True)     # örn. "warehouse.out:12" (UserID ile)
+    Key         = Column(String(100), primary_key=True)
+    RequestHash = Column(String(64), nullable=False)       # sha256(gövde) — aynı anahtar farklı gövde: 422
+    StatusCode  = Column(Integer)
+    Response    = Column(UnicodeText)                      # JSON
+    CreatedAt   = Column(DateTime, nullable=False, server_default=utcnow())
+    ExpiresAt   = Column(DateTime, nullable=False)
+    ClaimedAt   = Column(DateTime)                         # son sahiplenme (lease başlangıcı)
+    ClaimToken  = Column(String(32))                       # sahiplenen isteğin belirteci (uuid4 hex)
+
+    __table_args__ = (
+        Index("IX_IdempotencyKey_ExpiresAt", "ExpiresAt"),
+    )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, text
+from ..core.db import Base
+
+class MachineFailureDaily(Base):
+    """Makine başına günlük arıza (MaintenanceRequest) sayısı — rapor rollup'ı."""
+    __tablename__ = "MachineFailureDaily"
+
+    # PK (Day, MachineID): rapor aralık sorguları Day üzerinden seek yapar
+    Day          = Column(Date,    primary_key=True)
+    MachineID    = Column(Integer, ForeignKey("Machine.MachineID"), primary_key=True)
+    FailureCount = Column(Integer, nullable=False, server_default=text("0"))
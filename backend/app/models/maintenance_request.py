@@ -1,13 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, SmallInteger, CheckConstraint, text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, SmallInteger, CheckConstraint, Index, text
 from sqlalchemy.orm import relationship
 from ..core.db import Base
+from ..core.dialect import utcnow
 
 class MaintenanceRequest(Base):
     __tablename__ = "MaintenanceRequest"
 
     RequestID     = Column(Integer, primary_key=True, autoincrement=True)
     MachineID     = Column(Integer, ForeignKey("Machine.MachineID"), nullable=False)
-    OpenedAt      = Column(DateTime, nullable=False, server_default=text("SYSUTCDATETIME()"))
+    OpenedAt      = Column(DateTime, nullable=False, server_default=utcnow())
     OpenedBy      = Column(String(100))
     Priority_s    = Column(SmallInteger)
     Status_s      = Column(String(20), nullable=False, server_default=text("'Open'"))
@@ -15,6 +16,8 @@ class MaintenanceRequest(Base):
 
     __table_args__ = (
         CheckConstraint("Status_s in ('Open','InProgress','Closed')", name="CK_Request_Status"),
+        # Arıza raporu / rollup rebuild: OpenedAt aralığı (covering)
+        Index("IX_MaintenanceRequest_OpenedAt", "OpenedAt", mssql_include=["MachineID"]),
     )
 
     # 1-1 ilişki (aynı talebe ikinci WO yasak)
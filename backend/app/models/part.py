@@ -12,6 +12,9 @@ class Part(Base):
     MinStock     = Column(Integer,     nullable=False, server_default=text("0"))
     CurrentStock = Column(Integer,     nullable=False, server_default=text("0"))
     IsActive     = Column(Boolean,     nullable=False, server_default=text("1"))
+    # Açık iş emirleri için aktif rezervasyonların toplamı (PartReservation ile birlikte artımlı güncellenir)
+    # Kullanılabilir stok = CurrentStock - ReservedQty
+    ReservedQty  = Column(Integer,     nullable=False, server_default=text("0"))
 
     # Depo hareketleri
     txns = relationship("WarehouseTxn", back_populates="part")
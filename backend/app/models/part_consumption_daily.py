@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, text
+from ..core.db import Base
+
+class PartConsumptionDaily(Base):
+    """Parça başına günlük OUT miktarı — rapor rollup'ı."""
+    __tablename__ = "PartConsumptionDaily"
+
+    # PK (Day, PartID): rapor aralık sorguları Day üzerinden seek yapar
+    Day     = Column(Date,    primary_key=True)
+    PartID  = Column(Integer, ForeignKey("Part.PartID"), primary_key=True)
+    QtyOut  = Column(Integer, nullable=False, server_default=text("0"))
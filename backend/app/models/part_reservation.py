@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, Index, text
+from ..core.db import Base
+from ..core.dialect import utcnow
+
+class PartReservation(Base):
+    """
+    İş emri için yumuşak parça rezervasyonu. Aktif satırların toplamı Part.ReservedQty'de tutulur.
+    Active -> Consumed (iş emri kapanışında OUT hareketine dönüşür) | Released (bırakıldı)
+    """
+    __tablename__ = "PartReservation"
+
+    ReservationID = Column(Integer, primary_key=True, autoincrement=True)
+    WorkOrderID   = Column(Integer, ForeignKey("WorkOrder.WorkOrderID"), nullable=False)
+    PartID        = Column(Integer, ForeignKey("Part.PartID"), nullable=False)
+    Qty           = Column(Integer, nullable=False)
+    Status_s      = Column(String(20), nullable=False, server_default=text("'Active'"))
+    CreatedAt     = Column(DateTime, nullable=False, server_default=utcnow())
+    ClosedAt      = Column(DateTime)
+    TxnID         = Column(Integer)  # Consumed: oluşan OUT hareketi
+
+    __table_args__ = (
+        CheckConstraint("Status_s in ('Active','Consumed','Released')", name="CK_PartReservation_Status"),
+        CheckConstraint("Qty >= 0", name="CK_PartReservation_Qty"),
+        # İş emri + parça başına tek aktif satır (tekrar rezervasyon miktarı artırır)
+        Index(
+            "UX_PartReservation_Active", "WorkOrderID", "PartID",
+            unique=True,
+            mssql_where=text("Status_s = 'Active'"),
+            sqlite_where=text("Status_s = 'Active'"),
+        ),
+        Index("IX_PartReservation_PartID", "PartID"),
+    )
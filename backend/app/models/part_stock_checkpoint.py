@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from ..core.db import Base
+
+class PartStockCheckpoint(Base):
+    """Parça stok kontrol noktası: AsOf (ay başı, naive UTC) öncesindeki tüm hareketlerin bakiyesi."""
+    __tablename__ = "PartStockCheckpoint"
+
+    # PK (PartID, AsOf): "AsOf <= D olan son kontrol noktası" parça bazında seek
+    PartID  = Column(Integer,  ForeignKey("Part.PartID"), primary_key=True)
+    AsOf    = Column(DateTime, primary_key=True)
+    Balance = Column(Integer,  nullable=False)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Date, DECIMAL, ForeignKey, CheckConstraint, text
+from sqlalchemy import Column, Integer, String, Date, DECIMAL, ForeignKey, CheckConstraint, Index, text
 from sqlalchemy.orm import relationship
 from ..core.db import Base
+from ..core.dialect import utctoday
 
 class PurchaseOrder(Base):
     __tablename__ = "PurchaseOrder"
@@ -10,7 +11,7 @@ class PurchaseOrder(Base):
     PartID     = Column(Integer, ForeignKey("Part.PartID"),       nullable=False)
     Qty        = Column(Integer,     nullable=False)
     UnitPrice  = Column(DECIMAL(10,2), nullable=False)
-    PODate     = Column(Date,        nullable=False, server_default=text("CAST(SYSUTCDATETIME() AS DATE)"))
+    PODate     = Column(Date,        nullable=False, server_default=utctoday())
     ETA        = Column(Date)
     Status_s   = Column(String(20),  nullable=False)
 
@@ -18,6 +19,15 @@ class PurchaseOrder(Base):
         CheckConstraint("Qty > 0", name="CK_PO_Qty_Positive"),
         CheckConstraint("UnitPrice > 0", name="CK_PO_UnitPrice_Positive"),
         CheckConstraint("Status_s IN ('Created','Ordered','Received','Canceled')", name="CK_PO_Status"),
+        # Açık sipariş (on-order) toplamı: yalnızca Created/Ordered satırlar (filtered)
+        Index(
+            "IX_PurchaseOrder_Open_PartID", "PartID",
+            mssql_include=["Qty"],
+            mssql_where=text("Status_s IN ('Created','Ordered')"),
+            sqlite_where=text("Status_s IN ('Created','Ordered')"),
+        ),
+        # PO listesi keyset (imleç) sayfalama: sort=PODate + POID
+        Index("IX_PurchaseOrder_PODate_POID", "PODate", "POID"),
     )
 
     # Çift yönlü ilişkiler
@@ -2,6 +2,7 @@ from sqlalchemy import (
     Column, Integer, String, Boolean, DateTime, CheckConstraint, text
 )
 from ..core.db import Base
+from ..core.dialect import localnow
 
 ALLOWED_ROLES = ("viewer", "operator", "tech", "store", "admin")
 
@@ -17,7 +18,8 @@ class AppUser(Base):
     # server_default güvenli biçimde SQL ifadesiyle verildi
     Role           = Column(String(20),  nullable=False, server_default=text("'viewer'"))
     IsActive       = Column(Boolean,     nullable=False, server_default=text("1"))
-    CreatedAt      = Column(DateTime,    nullable=False, server_default=text("SYSDATETIME()"))
+    # Yerel saat (SYSDATETIME()); mevcut kayıtlarla tutarlı kalsın diye UTC'ye çevrilmedi
+    CreatedAt      = Column(DateTime,    nullable=False, server_default=localnow())
 
     __table_args__ = (
         CheckConstraint(
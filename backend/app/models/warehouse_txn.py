@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, Index, text
 from sqlalchemy.orm import relationship
 from ..core.db import Base
+from ..core.dialect import utcnow
 
 class WarehouseTxn(Base):
     __tablename__ = "WarehouseTxn"
@@ -9,13 +10,27 @@ class WarehouseTxn(Base):
     PartID      = Column(Integer, ForeignKey("Part.PartID"), nullable=False)
     TxnType     = Column(String(3), nullable=False)  # 'IN' | 'OUT'
     Quantity    = Column(Integer, nullable=False)
-    TxnDate     = Column(DateTime, nullable=False, server_default=text("SYSUTCDATETIME()"))
+    TxnDate     = Column(DateTime, nullable=False, server_default=utcnow())
     Reason      = Column(String(100))
     WorkOrderID = Column(Integer, ForeignKey("WorkOrder.WorkOrderID"))
+    # PO receive hareketlerinde dolu; Reason metni taramadan double-receive kontrolü için
+    POID        = Column(Integer, ForeignKey("PurchaseOrder.POID", name="FK_WarehouseTxn_POID"))
 
     __table_args__ = (
         CheckConstraint("TxnType IN ('IN','OUT')", name="CK_WTxn_TxnType"),
         CheckConstraint("Quantity > 0",            name="CK_WTxn_Quantity_Positive"),
+        # Bir PO için en fazla bir hareket (filtered unique index)
+        Index(
+            "UX_WarehouseTxn_POID_NotNull", "POID", unique=True,
+            mssql_where=text("POID IS NOT NULL"),
+            sqlite_where=text("POID IS NOT NULL"),
+        ),
+        Index("IX_WarehouseTxn_PartID", "PartID"),
+        # Tüketim raporu / rollup rebuild: TxnType='OUT' AND TxnDate aralığı (covering)
+        Index(
+            "IX_WarehouseTxn_TxnType_TxnDate", "TxnType", "TxnDate",
+            mssql_include=["PartID", "Quantity"],
+        ),
     )
 
     # SADECE back_populates kullan
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from ..core.db import Base
+from ..core.dialect import utcnow
+
+class WarehouseTxnArchive(Base):
+    """Ufuk (horizon) öncesi WarehouseTxn satırları — aynı TxnID ile taşınır, FK yok (soğuk veri)."""
+    __tablename__ = "WarehouseTxnArchive"
+
+    TxnID       = Column(Integer, primary_key=True, autoincrement=False)
+    PartID      = Column(Integer, nullable=False)
+    TxnType     = Column(String(3), nullable=False)
+    Quantity    = Column(Integer, nullable=False)
+    TxnDate     = Column(DateTime, nullable=False)
+    Reason      = Column(String(100))
+    WorkOrderID = Column(Integer)
+    POID        = Column(Integer)
+    ArchivedAt  = Column(DateTime, nullable=False, server_default=utcnow())
+
+    __table_args__ = (
+        Index("IX_WarehouseTxnArchive_PartID", "PartID"),
+        Index(
+            "IX_WarehouseTxnArchive_TxnType_TxnDate", "TxnType", "TxnDate",
+            mssql_include=["PartID", "Quantity"],
+        ),
+    )
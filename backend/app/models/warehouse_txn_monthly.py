@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, text
+from ..core.db import Base
+
+class WarehouseTxnMonthly(Base):
+    """Arşivlenen hareketlerin parça/ay özeti — stok geçmişi ve mutabakat için kalır."""
+    __tablename__ = "WarehouseTxnMonthly"
+
+    # PK (PartID, Month): parça bazlı geçmiş sorguları PartID üzerinden seek yapar
+    PartID   = Column(Integer, ForeignKey("Part.PartID"), primary_key=True)
+    Month    = Column(Date,    primary_key=True)  # ayın ilk günü
+    QtyIn    = Column(Integer, nullable=False, server_default=text("0"))
+    QtyOut   = Column(Integer, nullable=False, server_default=text("0"))
+    TxnCount = Column(Integer, nullable=False, server_default=text("0"))
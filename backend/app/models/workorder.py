@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from ..core.db import Base
+from ..core.dialect import utcnow
 
 class WorkOrder(Base):
     __tablename__ = "WorkOrder"
@@ -8,7 +9,7 @@ class WorkOrder(Base):
     WorkOrderID  = Column(Integer, primary_key=True, autoincrement=True)
     RequestID    = Column(Integer, ForeignKey("MaintenanceRequest.RequestID"), nullable=False)
     TechnicianID = Column(Integer, ForeignKey("Technician.TechnicianID"), nullable=False)
-    OpenedAt     = Column(DateTime, nullable=False, server_default=text("SYSUTCDATETIME()"))
+    OpenedAt     = Column(DateTime, nullable=False, server_default=utcnow())
     ClosedAt     = Column(DateTime)
     Notes        = Column(String(1000))
     Status_s     = Column(String(20), nullable=False, server_default=text("'Open'"))
@@ -16,6 +17,13 @@ class WorkOrder(Base):
     __table_args__ = (
         CheckConstraint("Status_s in ('Open','InProgress','Closed')", name="CK_WO_Status"),
         UniqueConstraint('RequestID', name='UQ_WorkOrder_RequestID'),
+        # Açık WO yaş raporu: yalnızca ClosedAt IS NULL satırları (filtered)
+        Index(
+            "IX_WorkOrder_Open", "WorkOrderID",
+            mssql_include=["RequestID", "OpenedAt"],
+            mssql_where=text("ClosedAt IS NULL"),
+            sqlite_where=text("ClosedAt IS NULL"),
+        ),
     )
 
     # İlişkiler
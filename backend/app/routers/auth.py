@@ -2,13 +2,16 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..core.db import get_db
+from ..core.hashing import hash_password_async, verify_password_async
 from ..core.security import (
-    hash_password, verify_password, create_access_token, get_current_user, require_roles
+    create_access_token, get_current_user, require_roles,
+    invalidate_principal, Principal,
 )
 from ..models.user import AppUser
-from ..schemas.user import UserCreate, UserRead, Token
+from ..schemas.user import UserCreate, UserRead, UserUpdate, Token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -46,21 +49,8 @@ def _serialize_user(u: AppUser) -> dict:
 
 ALLOWED_ROLES = {"viewer", "operator", "tech", "store", "admin"}
 
-# ---- Uçlar ----
-@router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register(payload: UserCreate, db: Session = Depends(get_db)):
-    username = payload.username.strip()
-    full_name = payload.full_name.strip() if payload.full_name else None
-    email = (payload.email or None)
-    if email:
-        email = email.strip().lower()
-
-    # İstekten rol al (varsa), yoksa viewer
-    role = (getattr(payload, "role", None) or "viewer").strip().lower()
-    if role not in ALLOWED_ROLES:
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                            detail=f"Geçersiz rol: '{role}'. İzin verilen roller: {sorted(list(ALLOWED_ROLES))}")
-
+def _create_user(db: Session, *, username: str, full_name: Optional[str],
+                 email: Optional[str], role: str, hashed: str) -> AppUser:
     if db.query(AppUser).filter(AppUser.Username == username).first():
         raise HTTPException(status_code=400, detail="kullanıcı adı zaten mevcut")
     if email and db.query(AppUser).filter(AppUser.Email == email).first():
@@ -73,20 +63,46 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
         Role=role,
         IsActive=True,
     )
-    _set_user_password_value(user, hash_password(payload.password))
+    _set_user_password_value(user, hashed)
 
     db.add(user)
     db.commit()
     db.refresh(user)
+    return user
+
+def _find_user(db: Session, username: str) -> Optional[AppUser]:
+    return db.query(AppUser).filter(AppUser.Username == username).first()
+
+# ---- Uçlar ----
+# register/login async: bcrypt işi core.hashing süreç havuzunda, DB işi threadpool'da;
+# böylece giriş yoğunluğu diğer senkron uçların threadpool'unu tüketmez.
+@router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
+async def register(payload: UserCreate, db: Session = Depends(get_db)):
+    username = payload.username.strip()
+    full_name = payload.full_name.strip() if payload.full_name else None
+    email = (payload.email or None)
+    if email:
+        email = email.strip().lower()
+
+    # İstekten rol al (varsa), yoksa viewer
+    role = (getattr(payload, "role", None) or "viewer").strip().lower()
+    if role not in ALLOWED_ROLES:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"Geçersiz rol: '{role}'. İzin verilen roller: {sorted(list(ALLOWED_ROLES))}")
+
+    hashed = await hash_password_async(payload.password)
+    user = await run_in_threadpool(
+        _create_user, db, username=username, full_name=full_name, email=email, role=role, hashed=hashed
+    )
     return _serialize_user(user)
 
 @router.post("/login", response_model=Token)
-def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     username = form.username.strip()
-    user = db.query(AppUser).filter(AppUser.Username == username).first()
+    user = await run_in_threadpool(_find_user, db, username)
 
     hashed = _get_user_password_value(user) if user else None
-    if (not user) or (not hashed) or (not verify_password(form.password, hashed)):
+    if (not user) or (not hashed) or (not await verify_password_async(form.password, hashed)):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="kullanıcı adı/şifre hatalı",
@@ -100,7 +116,28 @@ def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get
 def me(current: AppUser = Depends(get_current_user)):
     return _serialize_user(current)
 
+# ---- Admin: rol / aktiflik güncelle ----
+@router.patch("/users/{username}", response_model=UserRead)
+def update_user(
+    username: str,
+    payload: UserUpdate,
+    db: Session = Depends(get_db),
+    current: Principal = Depends(require_roles("admin")),
+):
+    user = db.query(AppUser).filter(AppUser.Username == username).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+    if payload.role is not None:
+        user.Role = payload.role
+    if payload.is_active is not None:
+        user.IsActive = payload.is_active
+    db.commit()
+    db.refresh(user)
+    # Önbellekteki yetki bilgisi bayatladı
+    invalidate_principal(user.Username)
+    return _serialize_user(user)
+
 # ---- Admin-only test ucu (rol guard) ----
 @router.get("/admin-ping")
-def admin_ping(current: AppUser = Depends(require_roles("admin"))):
+def admin_ping(current: Principal = Depends(require_roles("admin"))):
     return {"ok": True, "msg": f"Hello admin {current.Username}"}
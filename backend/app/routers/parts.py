@@ -1,4 +1,5 @@
 ﻿# app/routers/parts.py
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
@@ -6,6 +7,9 @@ from sqlalchemy import func, desc
 
 from ..core.db import get_db
 from ..models.part import Part
+from ..services.reorder_service import reorder_suggestions
+from ..services.reconcile_service import RECONCILE_CHUNK_SIZE, RECONCILE_TIME_BUDGET_SECONDS, reconcile_stock
+from ..services.stock_history_service import stock_at, stock_history
 from .warehouse_guard import require_roles
 
 router = APIRouter(prefix="/parts", tags=["parts"])
@@ -16,6 +20,7 @@ def parts_ping():
 
 # Sadece store ve admin erişsin
 Guard = require_roles("store", "admin")
+AdminGuard = require_roles("admin")
 
 @router.get("/below-min", dependencies=[Depends(Guard)])
 def parts_below_min(
@@ -27,9 +32,10 @@ def parts_below_min(
     ),
     db: Session = Depends(get_db),
 ):
-    cs = func.coalesce(Part.CurrentStock, 0)
+    # Kullanılabilir stok: rezervasyonlar Part.ReservedQty'de (satır başına ek join yok)
+    avail = func.coalesce(Part.CurrentStock, 0) - func.coalesce(Part.ReservedQty, 0)
     ms = func.coalesce(Part.MinStock, 0)
-    gap_expr = (ms - cs)  # stok açığı (pozitifse eksik var)
+    gap_expr = (ms - avail)  # stok açığı (pozitifse eksik var)
 
     sort_map = {
         "gap": gap_expr,
@@ -68,6 +74,8 @@ def parts_below_min(
                 "Unit": p.Unit,
                 "MinStock": int(p.MinStock or 0),
                 "CurrentStock": int(p.CurrentStock or 0),
+                "ReservedQty": int(p.ReservedQty or 0),
+                "AvailableStock": int(p.CurrentStock or 0) - int(p.ReservedQty or 0),
             }
             for p in rows
         ],
@@ -87,56 +95,11 @@ def parts_reorder_suggestion(
     db: Session = Depends(get_db),
 ):
     """
-    SuggestQty = max(MinStock - CurrentStock, 0)
+    SuggestQty = max(MinStock - (AvailableStock + OnOrderQty), 0)
+    AvailableStock = CurrentStock - ReservedQty; OnOrderQty = açık (Created/Ordered) PO miktarı
     """
-    cs = func.coalesce(Part.CurrentStock, 0)
-    ms = func.coalesce(Part.MinStock, 0)
-    gap_expr = (ms - cs)
-
-    sort_map = {
-        "gap": gap_expr,
-        "-gap": desc(gap_expr),
-        "PartCode": Part.PartCode,
-        "-PartCode": desc(Part.PartCode),
-        "PartName": Part.PartName,
-        "-PartName": desc(Part.PartName),
-        "PartID": Part.PartID,
-        "-PartID": desc(Part.PartID),
-    }
-    order_by_clause = sort_map.get(sort, desc(gap_expr))
-
-    base_q = (
-        db.query(Part)
-          .filter(Part.IsActive == True)
-          .filter(gap_expr >= min_gap)
-    )
-
-    total = base_q.count()
-    rows = (
-        base_q
-        .order_by(order_by_clause)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-
-    result = []
-    for p in rows:
-        min_stock = int(p.MinStock or 0)
-        cur_stock = int(p.CurrentStock or 0)
-        gap = max(min_stock - cur_stock, 0)
-        result.append({
-            "PartID": p.PartID,
-            "PartCode": p.PartCode,
-            "PartName": p.PartName,
-            "Unit": p.Unit,
-            "MinStock": min_stock,
-            "CurrentStock": cur_stock,
-            "Gap": gap,
-            "SuggestQty": gap
-        })
-
-    return {"value": result, "Count": total}
+    rows, total = reorder_suggestions(db, min_gap=min_gap, skip=skip, limit=limit, sort=sort)
+    return {"value": rows, "Count": total}
 
 
 # --- Tekil Parça Detayı (çakışmasın diye /id/{part_id}) ---
@@ -147,7 +110,8 @@ def get_part(part_id: int, db: Session = Depends(get_db)):
     Örnek yanıt:
     {
       "PartID": 1, "PartCode": "...", "PartName": "...",
-      "Unit": "adet", "MinStock": 100, "CurrentStock": 42, "IsActive": true
+      "Unit": "adet", "MinStock": 100, "CurrentStock": 42, "ReservedQty": 2,
+      "AvailableStock": 40, "IsActive": true
     }
     """
     p = (
@@ -166,5 +130,59 @@ def get_part(part_id: int, db: Session = Depends(get_db)):
         "Unit": p.Unit,
         "MinStock": int(p.MinStock or 0),
         "CurrentStock": int(p.CurrentStock or 0),
+        "ReservedQty": int(p.ReservedQty or 0),
+        "AvailableStock": int(p.CurrentStock or 0) - int(p.ReservedQty or 0),
         "IsActive": bool(p.IsActive),
     }
+
+
+# --- Geçmiş tarihli stok (denetim) ---
+def _naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    # DB'de tarihler naive UTC; naive girdi UTC varsayılır
+    if dt is None or dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+@router.get("/stock-at", dependencies=[Depends(Guard)])
+def parts_stock_at(
+    asOf: Optional[datetime] = Query(None, description="UTC ISO; bu andan ÖNCEKİ hareketler sayılır. Boşsa now(UTC)"),
+    include_inactive: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    """
+    Tüm parçaların asOf anındaki stoğu (tek SQL: son kontrol noktası + sonrası hareketler).
+    Kontrol noktaları: python -m app.scripts.build_stock_checkpoints
+    """
+    as_of = _naive_utc(asOf) or datetime.utcnow()
+    rows = stock_at(db, as_of, include_inactive=include_inactive)
+    return {"value": rows, "Count": len(rows), "AsOf": as_of.isoformat()}
+
+@router.get("/{part_id}/stock-history", dependencies=[Depends(Guard)])
+def parts_stock_history(
+    part_id: int,
+    date_from: Optional[datetime] = Query(None, description="UTC, dahil; boşsa date_to - 30 gün"),
+    date_to: Optional[datetime] = Query(None, description="UTC, hariç; boşsa now(UTC)"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """Hareketler + her hareket sonrası bakiye (BalanceAfter); açılış bakiyesi kontrol noktasından."""
+    dt_to = _naive_utc(date_to) or datetime.utcnow()
+    dt_from = _naive_utc(date_from) or (dt_to - timedelta(days=30))
+    return stock_history(db, part_id=part_id, date_from=dt_from, date_to=dt_to, limit=limit)
+
+
+# --- Mutabakat (admin) ---
+@router.get("/reconcile", dependencies=[Depends(AdminGuard)])
+def parts_reconcile(
+    after: int = Query(0, ge=0, description="önceki yanıttaki nextCursor"),
+    chunk_size: int = Query(RECONCILE_CHUNK_SIZE, ge=1, le=5000),
+    budget_seconds: float = Query(RECONCILE_TIME_BUDGET_SECONDS, gt=0, le=120),
+    db: Session = Depends(get_db),
+):
+    """
+    CurrentStock ile defter bakiyesi (IN - OUT, arşiv özetleri dahil) farkları.
+    Süre bütçesi dolarsa done=false ve nextCursor döner; ?after=<nextCursor> ile devam edin.
+    """
+    res = reconcile_stock(db, after_id=after, chunk_size=chunk_size, time_budget_s=budget_seconds)
+    items = res.pop("items")
+    return {"value": items, "Count": len(items), **res}
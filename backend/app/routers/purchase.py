@@ -3,24 +3,30 @@ from typing import List, Optional, Literal
 from datetime import date
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from pydantic import BaseModel, conint, field_validator
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, status
+from pydantic import BaseModel, Field, conint, field_validator
 from sqlalchemy.orm import Session
 
+from app.core.api import UTF8JSONResponse
 from app.core.db import get_db
+from app.core.security import Principal
 from app.routers.warehouse_guard import require_roles  # guard
 from app.schemas.purchase import PORead
 from app.models.part import Part
-from app.models.purchase_order import PurchaseOrder   # ✅ doğru import
 
 from app.services.purchase_service import (
-    list_pos,
+    InvalidCursor,
+    list_pos_page,
     create_po,
     place_po,
     receive_po,
     cancel_po,
+    create_pos_from_suggestions,
 )
 
+from app.services.idempotency_service import IdempotencyKeyHeader, idempotent
+from app.services.reorder_service import suggestion_for_part
+
 # ✅ Reason standardını tek kaynaktan kullanmak için import
 from app.domain.constants import REASON_PO_RECEIVE
 
@@ -36,25 +42,43 @@ REASON_PO_RECEIVE_DOC = REASON_PO_RECEIVE.format("<POID>")
 
 
 # --- LIST ---
+def _list_page(response: Response, db: Session, **kw):
+    """
+    Gövde eskisi gibi düz liste; sayfalama bilgisi başlıklarda:
+    X-Total-Count (filtreye uyan toplam), X-Next-Cursor (sonraki sayfa; son sayfada yok).
+    """
+    try:
+        rows, total, next_cursor = list_pos_page(db, **kw)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=f"Geçersiz cursor: {e}")
+    response.headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
 @router.get("/", response_model=List[PORead])
 def list_purchase_orders_slash(
+    response: Response,
     status_s: Optional[Literal["Created", "Ordered", "Received", "Canceled"]] = Query(None),
     supplier_id: Optional[int] = Query(None, ge=1),
     part_id: Optional[int] = Query(None, ge=1),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
+    cursor: Optional[str] = Query(None, max_length=200, description="Keyset imleç (X-Next-Cursor); verilirse skip yok sayılır"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    sort: str = Query("-POID"),
+    sort: str = Query("-POID", description="POID | PODate | ETA, azalan için '-' öneki"),
     db: Session = Depends(get_db),
 ):
-    return list_pos(
-        db,
+    return _list_page(
+        response, db,
         status_s=status_s,
         supplier_id=supplier_id,
         part_id=part_id,
         date_from=date_from,
         date_to=date_to,
+        cursor=cursor,
         skip=skip,
         limit=limit,
         sort=sort,
@@ -63,23 +87,26 @@ def list_purchase_orders_slash(
 
 @router.get("", response_model=List[PORead], include_in_schema=False)
 def list_purchase_orders_noslash(
+    response: Response,
     status_s: Optional[Literal["Created", "Ordered", "Received", "Canceled"]] = Query(None),
     supplier_id: Optional[int] = Query(None, ge=1),
     part_id: Optional[int] = Query(None, ge=1),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
+    cursor: Optional[str] = Query(None, max_length=200),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    sort: str = Query("-POID"),
+    sort: str = Query("-POID", description="POID | PODate | ETA, azalan için '-' öneki"),
     db: Session = Depends(get_db),
 ):
-    return list_pos(
-        db,
+    return _list_page(
+        response, db,
         status_s=status_s,
         supplier_id=supplier_id,
         part_id=part_id,
         date_from=date_from,
         date_to=date_to,
+        cursor=cursor,
         skip=skip,
         limit=limit,
         sort=sort,
@@ -106,28 +133,38 @@ class POCreateIn(BaseModel):
         return d
 
 
-@router.post("", response_model=PORead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(Guard)])
-def create_purchase_order(payload: POCreateIn, db: Session = Depends(get_db)):
-    return create_po(
-        db,
-        supplier_id=int(payload.SupplierID),
-        part_id=int(payload.PartID),
-        qty=int(payload.Qty),
-        unit_price=payload.UnitPrice,
-        eta=None,
-    )
-
-
-@router.post("/", response_model=PORead, include_in_schema=False, status_code=status.HTTP_201_CREATED, dependencies=[Depends(Guard)])
-def create_purchase_order_slash(payload: POCreateIn, db: Session = Depends(get_db)):
-    return create_po(
-        db,
-        supplier_id=int(payload.SupplierID),
-        part_id=int(payload.PartID),
-        qty=int(payload.Qty),
-        unit_price=payload.UnitPrice,
-        eta=None,
-    )
+def _create_po_idempotent(payload: POCreateIn, db: Session, idempotency_key: Optional[str],
+                          current: Principal):
+    def _do():
+        po = create_po(
+            db,
+            supplier_id=int(payload.SupplierID),
+            part_id=int(payload.PartID),
+            qty=int(payload.Qty),
+            unit_price=payload.UnitPrice,
+            eta=None,
+        )
+        return UTF8JSONResponse(
+            content=PORead.model_validate(po).model_dump(mode="json"),
+            status_code=status.HTTP_201_CREATED,
+        )
+    # Idempotency-Key tekrarı: saklanan yanıt, yeni PO oluşturulmadan
+    return idempotent(db, scope="purchase-orders.create", key=idempotency_key,
+                      principal=current, payload=payload.model_dump(mode="json"), fn=_do)
+
+
+@router.post("", response_model=PORead, status_code=status.HTTP_201_CREATED)
+def create_purchase_order(payload: POCreateIn, db: Session = Depends(get_db),
+                          idempotency_key: Optional[str] = IdempotencyKeyHeader,
+                          current: Principal = Depends(Guard)):
+    return _create_po_idempotent(payload, db, idempotency_key, current)
+
+
+@router.post("/", response_model=PORead, include_in_schema=False, status_code=status.HTTP_201_CREATED)
+def create_purchase_order_slash(payload: POCreateIn, db: Session = Depends(get_db),
+                                idempotency_key: Optional[str] = IdempotencyKeyHeader,
+                                current: Principal = Depends(Guard)):
+    return _create_po_idempotent(payload, db, idempotency_key, current)
 
 
 # --- FROM SUGGESTION ---
@@ -151,31 +188,87 @@ class POFromSuggestionIn(BaseModel):
 
 @router.post("/from-suggestion", response_model=PORead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(Guard)])
 def create_po_from_suggestion(payload: POFromSuggestionIn, db: Session = Depends(get_db)):
-    part = (
-        db.query(Part)
-        .filter(Part.PartID == payload.PartID)
-        .filter(Part.IsActive == True)  # noqa: E712
-        .first()
-    )
-    if not part:
+    """Qty = öneri (MinStock - kullanılabilir stok - açık PO miktarı); açık yoksa 400."""
+    sug = suggestion_for_part(db, int(payload.PartID))
+    if not sug:
         raise HTTPException(status_code=404, detail="Part not found or inactive")
 
-    ms = int(part.MinStock or 0)
-    cs = int(part.CurrentStock or 0)
-    gap = ms - cs
+    gap = int(sug["Gap"])
     if gap <= 0:
-        raise HTTPException(status_code=400, detail=f"No shortage for PartID={payload.PartID} (gap={gap})")
+        raise HTTPException(
+            status_code=400,
+            detail=f"No shortage for PartID={payload.PartID} (gap={gap}, onOrder={sug['OnOrderQty']})",
+        )
 
     return create_po(
         db,
         supplier_id=int(payload.SupplierID),
         part_id=int(payload.PartID),
-        qty=int(gap),
+        qty=gap,
         unit_price=payload.UnitPrice,
         eta=None,
     )
 
 
+# --- FROM SUGGESTIONS (BULK) ---
+def _opt_price(v: Optional[Decimal]) -> Optional[Decimal]:
+    if v is None:
+        return None
+    try:
+        d = v if isinstance(v, Decimal) else Decimal(str(v))
+        d = d.quantize(MONEY_PLACES, rounding=ROUND_HALF_UP)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError("UnitPrice must be a valid decimal")
+    if d <= 0:
+        raise ValueError("UnitPrice must be > 0")
+    return d
+
+
+class POBulkItemIn(BaseModel):
+    PartID: conint(ge=1)
+    UnitPrice: Optional[Decimal] = None     # yoksa gövdedeki UnitPrice
+    SupplierID: Optional[conint(ge=1)] = None  # yoksa gövdedeki SupplierID
+
+    @field_validator("UnitPrice")
+    @classmethod
+    def _price_decimal(cls, v: Optional[Decimal]) -> Optional[Decimal]:
+        return _opt_price(v)
+
+
+class POBulkFromSuggestionsIn(BaseModel):
+    SupplierID: conint(ge=1)
+    UnitPrice: Optional[Decimal] = None     # varsayılan birim fiyat
+    Items: Optional[List[POBulkItemIn]] = Field(None, max_length=1000)  # None: tüm öneriler
+    MinGap: conint(ge=1) = 1
+
+    @field_validator("UnitPrice")
+    @classmethod
+    def _price_decimal(cls, v: Optional[Decimal]) -> Optional[Decimal]:
+        return _opt_price(v)
+
+
+@router.post("/from-suggestions:bulk", status_code=status.HTTP_201_CREATED)
+def create_pos_from_suggestions_bulk(payload: POBulkFromSuggestionsIn, db: Session = Depends(get_db),
+                                     idempotency_key: Optional[str] = IdempotencyKeyHeader,
+                                     current: Principal = Depends(Guard)):
+    """
+    Öneri listesinden tek istekte PO'lar: Items verilmezse Gap >= MinGap olan tüm parçalar.
+    Qty = öneri; açığı kalmamış kalemler Skipped'da döner. Tek transaction.
+    Dönüş: {"POIDs": [...], "value": [...], "Count": n, "Skipped": [PartID...]}
+    """
+    def _do():
+        res = create_pos_from_suggestions(
+            db,
+            supplier_id=int(payload.SupplierID),
+            unit_price=payload.UnitPrice,
+            items=[it.model_dump() for it in payload.Items] if payload.Items is not None else None,
+            min_gap=int(payload.MinGap),
+        )
+        return UTF8JSONResponse(content=res, status_code=status.HTTP_201_CREATED)
+    return idempotent(db, scope="purchase-orders.from-suggestions", key=idempotency_key,
+                      principal=current, payload=payload.model_dump(mode="json"), fn=_do)
+
+
 # --- WORKFLOW ---
 @router.post("/{po_id}/place", response_model=PORead, dependencies=[Depends(Guard)])
 def place_purchase_order(po_id: int, db: Session = Depends(get_db)):
@@ -1,29 +1,41 @@
 ﻿# backend/app/routers/reports.py
+import asyncio
 from datetime import date, datetime, time, timezone
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 import json
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, Request
 from fastapi.responses import RedirectResponse
 from fastapi.encoders import jsonable_encoder  # <-- EKLENDİ
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from sqlalchemy import func, desc
+from sqlalchemy import Integer, case, cast, desc, func, literal_column, select
 from sqlalchemy.orm import Session
 
-from app.core.db import get_db
+from app.core.db import get_db, SessionLocal
 from app.models import (
     Machine,
+    MachineFailureDaily,
     MaintenanceRequest,
     Part,
+    PartConsumptionDaily,
     WarehouseTxn,
     WorkOrder,
 )
 
 # --- Standart API zarfı ---
 from app.core.api import ok, list_meta
+from app.core.cache import report_cache, TAG_AGING, TAG_CONSUMPTION, TAG_FAILURES
+from app.core.dialect import dialect_name
+from app.routers.warehouse_guard import require_roles
+from app.services.archive_service import ledger_union
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+# Rollup tabloları sayesinde çok yıllık aralıklar ucuz; ham sorgular için eski sınır
+MAX_PERIOD_DAYS = 3660
+MAX_RAW_PERIOD_DAYS = 366
+
 # ---------- Ortak: tarih aralığı doğrulaması ----------
 def validate_period(
     start: date = Query(..., description="UTC tarih, örn: 2025-08-01"),
@@ -34,13 +46,23 @@ def validate_period(
             status_code=422,
             detail="Geçersiz aralık: 'end' > 'start' olmalı. Not: 'end' HARIÇ (YYYY-MM-DD).",
         )
-    if (end - start).days > 366:
+    if (end - start).days > MAX_PERIOD_DAYS:
         raise HTTPException(
             status_code=422,
-            detail="Aralık çok uzun: en fazla 366 gün.",
+            detail=f"Aralık çok uzun: en fazla {MAX_PERIOD_DAYS} gün.",
         )
     return (start, end)
 
+def _check_raw_period(start: date, end: date) -> None:
+    # Ham tablo taraması pahalı: eski 366 gün sınırı yalnızca source=raw için
+    if (end - start).days > MAX_RAW_PERIOD_DAYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Aralık çok uzun: source=raw için en fazla {MAX_RAW_PERIOD_DAYS} gün.",
+        )
+
+ReportSource = Literal["rollup", "raw"]
+
 # =========================
 # TOP FAILURE MACHINES
 # =========================
@@ -49,33 +71,66 @@ class TopFailureItem(BaseModel):
     machineName: str
     failureCount: int
 
+def _top_failures_rollup(db: Session, start: date, end: date, top: int) -> List[dict]:
+    q = (
+        select(
+            Machine.MachineID.label("machineId"),
+            Machine.Name.label("machineName"),
+            func.sum(MachineFailureDaily.FailureCount).label("failureCount"),
+        )
+        .join(MachineFailureDaily, MachineFailureDaily.MachineID == Machine.MachineID)
+        .where(MachineFailureDaily.Day >= start, MachineFailureDaily.Day < end)
+        .group_by(Machine.MachineID, Machine.Name)
+        .order_by(desc("failureCount"), Machine.Name)
+        .limit(top)
+    )
+    return [{**r._mapping, "failureCount": int(r.failureCount or 0)} for r in db.execute(q).all()]
+
+def _top_failures_raw(db: Session, start: date, end: date, top: int) -> List[dict]:
+    start_dt = datetime.combine(start, time.min)
+    end_dt   = datetime.combine(end,   time.min)
+    q = (
+        db.query(
+            Machine.MachineID.label("machineId"),
+            Machine.Name.label("machineName"),
+            func.count(MaintenanceRequest.RequestID).label("failureCount"),
+        )
+        .join(MaintenanceRequest, MaintenanceRequest.MachineID == Machine.MachineID)
+        .filter(
+            MaintenanceRequest.OpenedAt >= start_dt,
+            MaintenanceRequest.OpenedAt <  end_dt,
+        )
+        .group_by(Machine.MachineID, Machine.Name)
+        .order_by(desc("failureCount"), Machine.Name)
+        .limit(top)
+    )
+    return [dict(r._mapping) for r in q.all()]
+
+def _failures_result(db: Session, start: date, end: date, top: int, source: str) -> Tuple[List[dict], dict]:
+    key = ("top-failure-machines", start.isoformat(), end.isoformat(), top, source)
+    cached = report_cache.get(key)
+    if cached is not None:
+        return cached
+    if source == "raw":
+        rows = _top_failures_raw(db, start, end, top)
+    else:
+        rows = _top_failures_rollup(db, start, end, top)
+    meta = {**list_meta(rows), "start": start.isoformat(), "end": end.isoformat(), "top": top, "source": source}
+    report_cache.set(key, (rows, meta), tags=(TAG_FAILURES,))
+    return rows, meta
+
 @router.get("/top-failure-machines")
 def top_failure_machines(
     period: Tuple[date, date] = Depends(validate_period),
     top:   int  = Query(10, ge=1, le=100),
+    source: ReportSource = Query("rollup", description="rollup: günlük özet tablo | raw: ham MaintenanceRequest"),
     db: Session = Depends(get_db),
 ):
     start, end = period
-    start_dt = datetime.combine(start, time.min)
-    end_dt   = datetime.combine(end,   time.min)
+    if source == "raw":
+        _check_raw_period(start, end)
     try:
-        q = (
-            db.query(
-                Machine.MachineID.label("machineId"),
-                Machine.Name.label("machineName"),
-                func.count(MaintenanceRequest.RequestID).label("failureCount"),
-            )
-            .join(MaintenanceRequest, MaintenanceRequest.MachineID == Machine.MachineID)
-            .filter(
-                MaintenanceRequest.OpenedAt >= start_dt,
-                MaintenanceRequest.OpenedAt <  end_dt,
-            )
-            .group_by(Machine.MachineID, Machine.Name)
-            .order_by(desc("failureCount"), Machine.Name)
-            .limit(top)
-        )
-        rows = [dict(r._mapping) for r in q.all()]
-        meta = {**list_meta(rows), "start": start.isoformat(), "end": end.isoformat(), "top": top}
+        rows, meta = _failures_result(db, start, end, top, source)
         return ok(rows, meta=meta)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"reports/top-failure-machines failed: {e}")
@@ -94,27 +149,45 @@ class TopConsumedItem(BaseModel):
     partName: str
     qtyOut: float
 
-@router.get("/top-consumed-parts")
-def top_consumed_parts(
-    period: Tuple[date, date] = Depends(validate_period),
-    top:   int  = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
-):
-    start, end = period
+def _top_consumed_rollup(db: Session, start: date, end: date, top: int) -> List[dict]:
+    subq = (
+        select(
+            PartConsumptionDaily.PartID.label("PartID"),
+            func.sum(PartConsumptionDaily.QtyOut).label("QtyOut"),
+        )
+        .where(PartConsumptionDaily.Day >= start, PartConsumptionDaily.Day < end)
+        .group_by(PartConsumptionDaily.PartID)
+    ).subquery()
+    q = (
+        select(
+            Part.PartID.label("partId"),
+            Part.PartName.label("partName"),
+            func.coalesce(subq.c.QtyOut, 0).label("qtyOut"),
+        )
+        .join(subq, subq.c.PartID == Part.PartID)
+        .order_by(desc(func.coalesce(subq.c.QtyOut, 0)), Part.PartName)
+        .limit(top)
+    )
+    return [{**r._mapping, "qtyOut": int(r.qtyOut or 0)} for r in db.execute(q).all()]
+
+def _top_consumed_raw(db: Session, start: date, end: date, top: int) -> List[dict]:
     start_dt = datetime.combine(start, time.min)
     end_dt   = datetime.combine(end,   time.min)
 
+    # Sıcak + arşiv hareketleri; toplama yalnızca ledger kolonları üzerinde (Part join'i sonra):
+    # NCCI varsa yalnızca geniş aralıkta sıcak dal batch-mode'a zorlanır
+    ledger = ledger_union(
+        lambda m: [m.TxnDate >= start_dt, m.TxnDate < end_dt, m.TxnType == "OUT"],
+        ("PartID", "Quantity"),
+        analytics_db=db,
+        span_days=(end - start).days,
+    )
     subq = (
-        db.query(
-            WarehouseTxn.PartID.label("PartID"),
-            func.sum(WarehouseTxn.Quantity).label("QtyOut"),
-        )
-        .filter(
-            WarehouseTxn.TxnDate >= start_dt,
-            WarehouseTxn.TxnDate <  end_dt,
-            WarehouseTxn.TxnType == "OUT",
+        select(
+            ledger.c.PartID.label("PartID"),
+            func.sum(ledger.c.Quantity).label("QtyOut"),
         )
-        .group_by(WarehouseTxn.PartID)
+        .group_by(ledger.c.PartID)
     ).subquery()
 
     q = (
@@ -127,8 +200,32 @@ def top_consumed_parts(
         .order_by(desc(func.coalesce(subq.c.QtyOut, 0)), Part.PartName)
         .limit(top)
     )
-    rows = [dict(r._mapping) for r in q.all()]
-    meta = {**list_meta(rows), "start": start.isoformat(), "end": end.isoformat(), "top": top}
+    return [dict(r._mapping) for r in q.all()]
+
+def _consumed_result(db: Session, start: date, end: date, top: int, source: str) -> Tuple[List[dict], dict]:
+    key = ("top-consumed-parts", start.isoformat(), end.isoformat(), top, source)
+    cached = report_cache.get(key)
+    if cached is not None:
+        return cached
+    if source == "raw":
+        rows = _top_consumed_raw(db, start, end, top)
+    else:
+        rows = _top_consumed_rollup(db, start, end, top)
+    meta = {**list_meta(rows), "start": start.isoformat(), "end": end.isoformat(), "top": top, "source": source}
+    report_cache.set(key, (rows, meta), tags=(TAG_CONSUMPTION,))
+    return rows, meta
+
+@router.get("/top-consumed-parts")
+def top_consumed_parts(
+    period: Tuple[date, date] = Depends(validate_period),
+    top:   int  = Query(10, ge=1, le=100),
+    source: ReportSource = Query("rollup", description="rollup: günlük özet tablo | raw: ham WarehouseTxn"),
+    db: Session = Depends(get_db),
+):
+    start, end = period
+    if source == "raw":
+        _check_raw_period(start, end)
+    rows, meta = _consumed_result(db, start, end, top, source)
     return ok(rows, meta=meta)
 
 # --- RAW (-list) → KALICI YÖNLENDİRME (301) ---
@@ -153,14 +250,133 @@ class AgingBucket(BaseModel):
     ageBucket: str
     openWOCount: int
 
+AGING_BUCKETS = ("0-2", "3-5", "6-10", ">10")
+
+def _age_days_expr(db: Session, as_of_naive: datetime):
+    """
+    WorkOrder.OpenedAt -> asOf arası tam gün (SQL tarafında).
+    Python'daki (as_of - opened).days ile aynı: tam 24 saatlik periyot sayısı, en az 0.
+    """
+    dialect = dialect_name(db)
+    if dialect == "mssql":
+        days = func.datediff(literal_column("second"), WorkOrder.OpenedAt, as_of_naive) // 86400
+    else:
+        days = cast(func.julianday(as_of_naive) - func.julianday(WorkOrder.OpenedAt), Integer)
+    days = func.coalesce(days, 0)
+    return case((days < 0, 0), else_=days)
+
+def _age_bucket_expr(age_days):
+    return case(
+        (age_days <= 2, "0-2"),
+        (age_days <= 5, "3-5"),
+        (age_days <= 10, "6-10"),
+        else_=">10",
+    )
+
+def _aging_summary_sql(db: Session, as_of_naive: datetime) -> List[dict]:
+    """Kova sayıları DB'de hesaplanır; veritabanından en fazla 4 satır döner."""
+    age = _age_days_expr(db, as_of_naive)
+    # GROUP BY parametreli ifade yerine alt sorgu kolonu üzerinden (MSSQL uyumlu)
+    inner = (
+        select(_age_bucket_expr(age).label("ageBucket"))
+        .select_from(WorkOrder)
+        .where(WorkOrder.ClosedAt.is_(None))
+        .subquery()
+    )
+    rows = db.execute(
+        select(inner.c.ageBucket, func.count().label("openWOCount")).group_by(inner.c.ageBucket)
+    ).all()
+    counts = {r.ageBucket: int(r.openWOCount) for r in rows}
+    return [{"ageBucket": b, "openWOCount": counts.get(b, 0)} for b in AGING_BUCKETS]
+
+def _aging_items_sql(db: Session, as_of_naive: datetime, *, before_id: Optional[int], limit: int) -> List[dict]:
+    """Açık WO listesi, WorkOrderID desc keyset sayfalı; yaş/kova SQL'de."""
+    age = _age_days_expr(db, as_of_naive)
+    q = (
+        select(
+            WorkOrder.WorkOrderID.label("workOrderId"),
+            WorkOrder.RequestID.label("requestId"),
+            MaintenanceRequest.MachineID.label("machineId"),
+            Machine.Name.label("machineName"),
+            WorkOrder.OpenedAt.label("openedAt"),
+            age.label("ageDays"),
+            _age_bucket_expr(age).label("ageBucket"),
+        )
+        .join(MaintenanceRequest, MaintenanceRequest.RequestID == WorkOrder.RequestID)
+        .join(Machine, Machine.MachineID == MaintenanceRequest.MachineID)
+        .where(WorkOrder.ClosedAt.is_(None))
+    )
+    if before_id is not None:
+        q = q.where(WorkOrder.WorkOrderID < before_id)
+    q = q.order_by(WorkOrder.WorkOrderID.desc()).limit(limit)
+
+    items = []
+    for r in db.execute(q).all():
+        d = dict(r._mapping)
+        opened = d["openedAt"]
+        if isinstance(opened, datetime):
+            d["openedAt"] = (opened if opened.tzinfo else opened.replace(tzinfo=timezone.utc)).isoformat()
+        d["ageDays"] = int(d["ageDays"] or 0)
+        items.append(d)
+    return items
+
+def _resolve_as_of(asOf: Optional[datetime]) -> Tuple[datetime, datetime]:
+    as_of = asOf or datetime.now(timezone.utc)
+    if as_of.tzinfo is None:
+        as_of = as_of.replace(tzinfo=timezone.utc)
+    # DB'de tarihler naive UTC tutuluyor
+    return as_of, as_of.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _aging_key(view: str, as_of_naive: datetime, explicit: bool,
+               before_id: Optional[int] = None, limit: Optional[int] = None) -> tuple:
+    # asOf verilmediyse anahtar "now": yaşlar zamanla değişir, TTL bayatlığı sınırlar
+    return ("open-workorders-aging", view, as_of_naive.isoformat() if explicit else "now", before_id, limit)
+
+def _aging_summary_result(db: Session, as_of: datetime, as_of_naive: datetime, *, explicit: bool) -> Tuple[dict, dict]:
+    key = _aging_key("summary", as_of_naive, explicit)
+    cached = report_cache.get(key)
+    if cached is not None:
+        return cached
+    summary = _aging_summary_sql(db, as_of_naive)
+    meta = {
+        "asOf": as_of.isoformat(),
+        "tz": "UTC",
+        "openWOCount": sum(s["openWOCount"] for s in summary),
+    }
+    report_cache.set(key, ({"summary": summary}, meta), tags=(TAG_AGING,))
+    return {"summary": summary}, meta
+
 @router.get("/open-workorders-aging")
 def open_workorders_aging(
     asOf: Optional[datetime] = Query(None, description="UTC ISO; boş bırakılırsa 'now(UTC)'. Naive verilirse UTC varsayılır."),
+    view: Literal["full", "summary", "items"] = Query(
+        "full",
+        description="full: items+summary (eski davranış) | summary: yalnızca kovalar (SQL'de) | items: sayfalı liste",
+    ),
+    before_id: Optional[int] = Query(None, ge=1, description="view=items için keyset imleç (WorkOrderID <)"),
+    limit: int = Query(100, ge=1, le=500, description="view=items sayfa boyu"),
     db: Session = Depends(get_db),
 ):
-    as_of = asOf or datetime.now(timezone.utc)
-    if as_of.tzinfo is None:
-        as_of = as_of.replace(tzinfo=timezone.utc)
+    as_of, as_of_naive = _resolve_as_of(asOf)
+
+    if view == "summary":
+        data, meta = _aging_summary_result(db, as_of, as_of_naive, explicit=asOf is not None)
+        return ok(data, meta=meta)
+
+    key = _aging_key(view, as_of_naive, asOf is not None,
+                     before_id if view == "items" else None,
+                     limit if view == "items" else None)
+    cached = report_cache.get(key)
+    if cached is not None:
+        return ok(cached[0], meta=cached[1])
+
+    if view == "items":
+        items = _aging_items_sql(db, as_of_naive, before_id=before_id, limit=limit)
+        meta = {**list_meta(items), "asOf": as_of.isoformat(), "tz": "UTC"}
+        if len(items) == limit:
+            meta["next_before_id"] = items[-1]["workOrderId"]
+        report_cache.set(key, ({"items": items}, meta), tags=(TAG_AGING,))
+        return ok({"items": items}, meta=meta)
 
     q = (
         db.query(
@@ -222,4 +438,82 @@ def open_workorders_aging(
     }
     # Datetime içeren yapıyı JSON'a güvenli çevir
     payload = jsonable_encoder(data)
+    report_cache.set(key, (payload, meta), tags=(TAG_AGING,))
     return ok(payload, meta=meta)
+
+# =========================
+# DASHBOARD — Home.py için tek istek
+# =========================
+# Bölümler birbirinden bağımsız: her biri kendi oturumuyla (ayrı havuz bağlantısı) threadpool'da
+# eşzamanlı çalışır; event loop bölümleri bekler (istek başına ek thread havuzu yok)
+def _with_session(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+def _with_cum_pct(rows: List[dict], value_key: str) -> List[dict]:
+    """Pareto için kümülatif yüzde (listelenen top-N toplamına göre)."""
+    total = sum(float(r.get(value_key) or 0) for r in rows) or 1.0
+    running = 0.0
+    out = []
+    for r in rows:
+        running += float(r.get(value_key) or 0)
+        out.append({**r, "cumPct": round(running / total * 100, 1)})
+    return out
+
+@router.get("/dashboard")
+async def dashboard(
+    period: Tuple[date, date] = Depends(validate_period),
+    top:   int  = Query(10, ge=1, le=100),
+    source: ReportSource = Query("rollup", description="rollup: günlük özet tablo | raw: ham tablolar"),
+    asOf: Optional[datetime] = Query(None, description="Yaş dağılımı için UTC ISO; boşsa 'now(UTC)'"),
+):
+    start, end = period
+    if source == "raw":
+        _check_raw_period(start, end)
+    as_of, as_of_naive = _resolve_as_of(asOf)
+
+    sections: Dict[str, Any] = {
+        "failures": run_in_threadpool(_with_session, _failures_result, start, end, top, source),
+        "consumedParts": run_in_threadpool(_with_session, _consumed_result, start, end, top, source),
+        "aging": run_in_threadpool(
+            _with_session, _aging_summary_result, as_of, as_of_naive, explicit=asOf is not None
+        ),
+    }
+    # return_exceptions: hata olsa da tüm bölümler bitip oturumlarını kapatır
+    done = await asyncio.gather(*sections.values(), return_exceptions=True)
+    results: Dict[str, Any] = {}
+    for name, res in zip(sections, done):
+        if isinstance(res, HTTPException):
+            raise res
+        if isinstance(res, Exception):
+            raise HTTPException(status_code=500, detail=f"reports/dashboard ({name}) failed: {res}")
+        results[name] = res
+
+    failures, _ = results["failures"]
+    parts, _ = results["consumedParts"]
+    aging, aging_meta = results["aging"]
+    data = {
+        "failures": _with_cum_pct(failures, "failureCount"),
+        "consumedParts": _with_cum_pct(parts, "qtyOut"),
+        "aging": aging["summary"],
+    }
+    meta = {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "top": top,
+        "source": source,
+        "asOf": aging_meta["asOf"],
+        "tz": "UTC",
+        "openWOCount": aging_meta["openWOCount"],
+    }
+    return ok(data, meta=meta)
+
+# =========================
+# Önbellek istatistikleri (boyutlandırma için)
+# =========================
+@router.get("/_cache", dependencies=[Depends(require_roles("admin"))])
+def report_cache_stats():
+    return ok(report_cache.stats())
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from app.core.db import get_db
-from app.models import WarehouseTxn, Part
+from app.models import Part
 from app.routers.warehouse_guard import require_roles
+from app.services.warehouse_service import create_txn, list_txns
 
 router = APIRouter(prefix="/warehouse", tags=["warehouse"])
 
@@ -15,11 +18,27 @@ def warehouse_ping():
     return {"ok": True}
 
 @router.get("/txns", dependencies=[Depends(Guard)])
-def list_warehouse_txns(db: Session = Depends(get_db)):
-    rows = (
-        db.query(WarehouseTxn)
-        .order_by(WarehouseTxn.TxnID.desc())
-        .all()
+def list_warehouse_txns(
+    part_id: Optional[int] = Query(None, ge=1),
+    txn_type: Optional[Literal["IN", "OUT"]] = Query(None),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    before_id: Optional[int] = Query(None, ge=1),
+    limit: int = Query(100, ge=1, le=500),
+    include_archive: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    # Tüm tabloyu .all() ile çekmek yerine keyset sayfalı servis
+    rows = list_txns(
+        db,
+        part_id=part_id,
+        txn_type=txn_type,
+        date_from=date_from,
+        date_to=date_to,
+        before_id=before_id,
+        limit=limit,
+        sort="-TxnID",
+        include_archive=include_archive,
     )
     return [
         {
@@ -35,34 +54,15 @@ def list_warehouse_txns(db: Session = Depends(get_db)):
     ]
 
 # --- Sprint-5: Stok Çıkışı (OUT) ---
+# Stok kaydı tek yoldan: create_txn (Part satır kilidi + rollup + önbellek)
 @router.post("/issue", dependencies=[Depends(Guard)])
 def issue_stock(part_id: int, qty: int, db: Session = Depends(get_db), workorder_id: int | None = None):
     if qty <= 0:
         raise HTTPException(status_code=400, detail="Miktar sıfırdan büyük olmalı")
 
-    part = db.query(Part).filter(Part.PartID == part_id, Part.IsActive == True).first()
-    if not part:
-        raise HTTPException(status_code=404, detail="Parça bulunamadı")
-
-    if (part.CurrentStock or 0) < qty:
-        raise HTTPException(status_code=400, detail="Yeterli stok yok")
-
-    # stok düş
-    part.CurrentStock = (part.CurrentStock or 0) - qty
-
-    # txn kaydı oluştur
-    txn = WarehouseTxn(
-        PartID=part_id,
-        TxnType="OUT",
-        Quantity=qty,
-        Reason="Issue",
-        WorkOrderID=workorder_id,
-    )
-    db.add(txn)
-    db.commit()
-    db.refresh(txn)
-
-    return {"ok": True, "TxnID": txn.TxnID, "CurrentStock": part.CurrentStock}
+    txn = create_txn(db, part_id=part_id, txn_type="OUT", quantity=qty,
+                     reason="Issue", workorder_id=workorder_id)
+    return {"ok": True, "TxnID": txn.TxnID, "CurrentStock": db.get(Part, part_id).CurrentStock}
 
 # --- Sprint-5: Stok Girişi (IN) ---
 @router.post("/receive", dependencies=[Depends(Guard)])
@@ -70,22 +70,5 @@ def receive_stock(part_id: int, qty: int, db: Session = Depends(get_db), reason:
     if qty <= 0:
         raise HTTPException(status_code=400, detail="Miktar sıfırdan büyük olmalı")
 
-    part = db.query(Part).filter(Part.PartID == part_id, Part.IsActive == True).first()
-    if not part:
-        raise HTTPException(status_code=404, detail="Parça bulunamadı")
-
-    # stok artır
-    part.CurrentStock = (part.CurrentStock or 0) + qty
-
-    # txn kaydı oluştur
-    txn = WarehouseTxn(
-        PartID=part_id,
-        TxnType="IN",
-        Quantity=qty,
-        Reason=reason,
-    )
-    db.add(txn)
-    db.commit()
-    db.refresh(txn)
-
-    return {"ok": True, "TxnID": txn.TxnID, "CurrentStock": part.CurrentStock}
+    txn = create_txn(db, part_id=part_id, txn_type="IN", quantity=qty, reason=reason)
+    return {"ok": True, "TxnID": txn.TxnID, "CurrentStock": db.get(Part, part_id).CurrentStock}
@@ -1,10 +1,14 @@
 # app/routers/workorders.py
-from fastapi import APIRouter, Depends, Path, HTTPException
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Path, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
-from app.schemas.maintenance import WorkOrderCreate, WorkOrderOut
+from app.routers.warehouse_guard import require_roles
+from app.schemas.maintenance import ReservationCreate, ReservationOut, WorkOrderCreate, WorkOrderOut
 from app.services.maintenance_service import create_workorder, close_workorder
+from app.services.reservation_service import list_reservations, release_part, reserve_part
 from app.models import WorkOrder  # mevcut modellerden import
 
 router = APIRouter(prefix="/workorders", tags=["Work Orders"])
@@ -30,3 +34,31 @@ def create_wo(payload: WorkOrderCreate, db: Session = Depends(get_db)):
 @router.post("/{workorder_id}/close", response_model=WorkOrderOut)
 def close_wo(workorder_id: int = Path(..., ge=1), db: Session = Depends(get_db)):
     return close_workorder(db, workorder_id=workorder_id)
+
+# --- Parça rezervasyonları (kapanışta OUT hareketine dönüşür) ---
+ReserveGuard = require_roles("tech", "store", "admin")
+
+@router.get("/{workorder_id}/reservations", response_model=List[ReservationOut],
+            dependencies=[Depends(ReserveGuard)])
+def list_wo_reservations(
+    workorder_id: int = Path(..., ge=1),
+    include_closed: bool = Query(False, description="Consumed/Released satırları da getir"),
+    db: Session = Depends(get_db),
+):
+    return list_reservations(db, workorder_id=workorder_id, include_closed=include_closed)
+
+@router.post("/{workorder_id}/reservations", response_model=ReservationOut, status_code=201,
+             dependencies=[Depends(ReserveGuard)])
+def reserve_wo_part(payload: ReservationCreate, workorder_id: int = Path(..., ge=1), db: Session = Depends(get_db)):
+    """Kullanılabilir stoktan ayırır; aynı parça tekrar gönderilirse miktar eklenir."""
+    return reserve_part(db, workorder_id=workorder_id, part_id=payload.PartID, qty=payload.Qty)
+
+@router.delete("/{workorder_id}/reservations/{part_id}", response_model=ReservationOut,
+               dependencies=[Depends(ReserveGuard)])
+def release_wo_part(
+    workorder_id: int = Path(..., ge=1),
+    part_id: int = Path(..., ge=1),
+    qty: Optional[int] = Query(None, gt=0, description="Boşsa rezervasyonun tamamı bırakılır"),
+    db: Session = Depends(get_db),
+):
+    return release_part(db, workorder_id=workorder_id, part_id=part_id, qty=qty)
@@ -38,3 +38,21 @@ class WorkOrderOut(BaseModel):
     Status_s: StatusLiteral
     Notes: Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
+
+# ---- Parça rezervasyonları ----
+ReservationStatusLiteral = Literal["Active", "Consumed", "Released"]
+
+class ReservationCreate(BaseModel):
+    PartID: int = Field(..., ge=1)
+    Qty: int = Field(..., gt=0)
+
+class ReservationOut(BaseModel):
+    ReservationID: int
+    WorkOrderID: int
+    PartID: int
+    Qty: int
+    Status_s: ReservationStatusLiteral
+    CreatedAt: datetime
+    ClosedAt: Optional[datetime] = None
+    TxnID: Optional[int] = None
+    model_config = ConfigDict(from_attributes=True)
@@ -19,6 +19,10 @@ class UserRead(BaseModel):
     Role: RoleLiteral
     IsActive: bool
 
+class UserUpdate(BaseModel):
+    role: Optional[RoleLiteral] = None
+    is_active: Optional[bool] = None
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -1,4 +1,4 @@
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from pydantic import BaseModel, Field
 from pydantic import ConfigDict
 
@@ -15,3 +15,8 @@ class WarehouseTxnRead(BaseModel):
     PartID: int
     TxnType: str
     Quantity: int
+
+class WarehouseTxnBatch(BaseModel):
+    # Vardiya sonu toplu giriş/çıkış; satırlar verilen sırayla işlenir
+    Moves: List[WarehouseTxnCreate] = Field(..., min_length=1, max_length=1000)
+    Atomic: bool = False   # True: tek satır hatalıysa hiçbiri yazılmaz
@@ -0,0 +1,43 @@
+"""
+Ufuk (horizon) öncesi WarehouseTxn hareketlerini arşive taşır, aylık parça özetlerini bırakır.
+
+Kullanım (backend/ dizininden):
+    python -m app.scripts.archive_txns --dry-run                 # kaç satır taşınacak
+    python -m app.scripts.archive_txns                           # WAREHOUSE_ARCHIVE_HORIZON_MONTHS (24)
+    python -m app.scripts.archive_txns --months 12 --chunk-size 2000
+    python -m app.scripts.archive_txns --before 2024-01-01       # ay başına yuvarlanır
+"""
+import argparse
+from datetime import date, datetime
+
+from app.core.db import SessionLocal
+from app.services.archive_service import (
+    ARCHIVE_CHUNK_SIZE,
+    ARCHIVE_HORIZON_MONTHS,
+    archive_cutoff,
+    archive_txns,
+)
+
+
+def run(*, months: int = ARCHIVE_HORIZON_MONTHS, before: date | None = None,
+        chunk_size: int = ARCHIVE_CHUNK_SIZE, max_chunks: int | None = None, dry_run: bool = False) -> dict:
+    # Aylık özetler tam ay olsun: kesim her zaman ay başı
+    cutoff = datetime(before.year, before.month, 1) if before else archive_cutoff(months)
+    db = SessionLocal()
+    try:
+        return archive_txns(db, cutoff=cutoff, chunk_size=chunk_size, max_chunks=max_chunks, dry_run=dry_run)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="WarehouseTxn arşivleme + aylık özet")
+    ap.add_argument("--months", type=int, default=ARCHIVE_HORIZON_MONTHS, help="sıcak tabloda kalacak ay sayısı")
+    ap.add_argument("--before", type=date.fromisoformat, default=None, help="YYYY-MM-DD (ay başına yuvarlanır)")
+    ap.add_argument("--chunk-size", type=int, default=ARCHIVE_CHUNK_SIZE)
+    ap.add_argument("--max-chunks", type=int, default=None, help="bu çalıştırmada en fazla kaç parça")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+    res = run(months=args.months, before=args.before, chunk_size=args.chunk_size,
+              max_chunks=args.max_chunks, dry_run=args.dry_run)
+    print(f"Arşiv: {res}")
@@ -0,0 +1,33 @@
+"""
+Parça stok kontrol noktalarını (PartStockCheckpoint, ay başı) üretir.
+/parts/stock-at ve /parts/{id}/stock-history bu noktalardan sonrasını tekrar oynatır.
+
+Kullanım (backend/ dizininden; ayda bir zamanlanması yeterli):
+    python -m app.scripts.build_stock_checkpoints              # son noktadan bu ayın başına kadar
+    python -m app.scripts.build_stock_checkpoints --full       # tamamını yeniden üret
+    python -m app.scripts.build_stock_checkpoints --until 2025-01-01
+"""
+import argparse
+from datetime import date, datetime
+
+from app.core.db import SessionLocal
+from app.services.stock_history_service import build_checkpoints
+
+
+def run(until: date | None = None, full: bool = False) -> dict:
+    db = SessionLocal()
+    try:
+        return build_checkpoints(
+            db, until=datetime(until.year, until.month, 1) if until else None, full=full
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="PartStockCheckpoint üretimi")
+    ap.add_argument("--until", type=date.fromisoformat, default=None, help="YYYY-MM-DD (ay başına yuvarlanır, hariç)")
+    ap.add_argument("--full", action="store_true", help="mevcut noktaları silip baştan üret")
+    args = ap.parse_args()
+    res = run(args.until, args.full)
+    print(f"Kontrol noktaları: {res}")
@@ -0,0 +1,30 @@
+"""
+Şemayı modellerden oluşturur (SQLite / PostgreSQL yerel deney ve benchmark ortamı için).
+SQL Server şeması Alembic migration'larıyla yönetilir (T-SQL); orada bu komut çalışmaz.
+
+Kullanım (backend/ dizininden):
+    MSSQL_DSN=sqlite:///./bench.db python -m app.scripts.create_schema [--drop]
+"""
+import argparse
+import sys
+
+from app import models  # noqa: F401  (tüm tablolar metadata'ya kayıtlı olsun)
+from app.core.db import Base, engine
+from app.core.dialect import dialect_name
+
+
+def run(drop: bool = False) -> int:
+    if dialect_name(engine) == "mssql":
+        raise SystemExit("SQL Server için: alembic upgrade head")
+    if drop:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return len(Base.metadata.tables)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Modellerden şema oluştur (SQLite/PostgreSQL)")
+    ap.add_argument("--drop", action="store_true", help="Önce tüm tabloları sil")
+    args = ap.parse_args()
+    n = run(args.drop)
+    print(f"{engine.url.render_as_string(hide_password=True)}: {n} tablo hazır", file=sys.stderr)
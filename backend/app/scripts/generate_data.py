@@ -0,0 +1,404 @@
+"""
+Büyük ölçekli, tekrarlanabilir sentetik veri üretici (ölçek / performans denemeleri için).
+Aynı --seed ve --end ile her çalıştırma aynı veriyi üretir.
+
+Dağılımlar:
+- Arızalar Pareto dağılımlı: makinelerin küçük bir kısmı taleplerin çoğunu üretir
+- Tüketim mevsimsel: parçalar düz / yaz / kış profillerinden birinde; hafta sonu ve zamanla artan yük
+- Parça popülerliği Pareto; OUT hareketlerinin bir kısmı iş emrine bağlı (aynı gün, açılıştan sonra)
+- PO yaşam döngüsü: stok + açık sipariş <= MinStock olunca Created -> Ordered -> Received
+  (tedarik süresi + gecikme; dönem sonuna yetişmeyenler açık kalır, bir kısmı Canceled)
+- Stok hiçbir anda eksiye düşmez; açılış stoğu "Opening" IN hareketi olarak deftere yazılır,
+  böylece CurrentStock = IN - OUT (mutabakat farksız)
+
+Satırlar tablo başına tamponlanır; her parça tek Core executemany (MSSQL: fast_executemany) + commit.
+Üretilen ID'ler parça sonrası "ID > önceki max" sorgusuyla eşlenir: tek yazıcı varsayılır,
+üretim sırasında API'yi aynı veritabanına yazdırmayın. Hedef tablolar boş olmalı.
+
+Kullanım (backend/ dizininden):
+    MSSQL_DSN=sqlite:///./bench.db python -m app.scripts.create_schema --drop
+    MSSQL_DSN=sqlite:///./bench.db python -m app.scripts.generate_data                 # small
+    python -m app.scripts.generate_data --preset large --seed 42 --end 2026-01-01       # ~5M hareket
+    python -m app.scripts.generate_data --parts 20000 --txns 1000000 --skip-derived
+"""
+import argparse
+import math
+import random
+import sys
+import time as _time
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import bindparam, func, insert, select, update
+
+from app.core.db import SessionLocal, engine
+from app.domain.constants import REASON_PO_RECEIVE
+from app.models import (
+    Machine, MaintenanceRequest, Part, PurchaseOrder, Supplier, Technician, WarehouseTxn, WorkOrder,
+)
+
+PRESETS = {
+    "small": dict(machines=100, technicians=20, suppliers=50, parts=2_000, requests=20_000, txns=200_000),
+    "large": dict(machines=2_000, technicians=200, suppliers=500, parts=50_000, requests=500_000,
+                  txns=5_000_000),
+}
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Pareto şekil parametreleri (küçüldükçe daha çarpık; 1.16 klasik 80/20 değeri)
+FAILURE_PARETO_ALPHA = 1.16
+PART_PARETO_ALPHA = 1.2
+
+# Mevsim profilleri: (pay, genlik, tepe günü [yılın günü])
+SEASONS = ((0.6, 0.0, 1), (0.2, 0.6, 200), (0.2, 0.6, 15))
+WEEKDAY_FACTORS = (1.0, 1.0, 1.0, 1.0, 0.95, 0.5, 0.3)
+
+OUT_QTYS, OUT_QTY_WEIGHTS = (1, 2, 3, 4, 5, 10), (40, 25, 15, 8, 7, 5)
+WO_PARTS, WO_PARTS_WEIGHTS = (0, 1, 2, 3, 4), (25, 30, 25, 12, 8)
+PRIORITIES, PRIORITY_WEIGHTS = (1, 2, 3, 4, 5), (10, 20, 40, 20, 10)
+WO_SHARE = 0.97            # iş emrine dönüşen talep oranı
+OUT_SHARE = 0.95           # hareket hedefinin (açılışlar hariç) OUT'a ayrılan payı; kalan PO girişleri
+LEAD_DAYS = (3, 21)        # tedarik süresi (gün)
+REORDER_COVER_DAYS = 45    # sipariş miktarı ~ bu kadar günlük tüketim
+MIN_REORDER_QTY = 10       # az dönen parçalar her birkaç çıkışta bir sipariş açmasın
+CANCEL_RATE = 0.03
+WO_MEDIAN_HOURS = 6        # iş emri süresi lognormal (uzun kuyruk)
+
+FAULTS = ("Yağ sızıntısı", "Aşırı ısınma", "Titreşim", "Sensör arızası", "Kayış koptu", "Motor durdu",
+          "Hidrolik basınç düşük", "Elektrik arızası", "Anormal ses", "Kalibrasyon kayması")
+PART_NAMES = ("Rulman", "Kayış", "Keçe", "Conta", "Filtre", "Sensör", "Röle", "Motor", "Pompa", "Valf",
+              "Hortum", "Sigorta", "Kontaktör", "Dişli", "Zincir", "Yağ")
+UNITS, UNIT_WEIGHTS = ("adet", "m", "lt", "kg"), (85, 5, 6, 4)
+LOCATIONS = ("A", "B", "C", "D", "E")
+
+
+# ---------- yardımcılar ----------
+
+def _season_factor(d: date, amplitude: float, peak: int) -> float:
+    if not amplitude:
+        return 1.0
+    return 1.0 + amplitude * math.cos(2 * math.pi * (d.timetuple().tm_yday - peak) / 365.25)
+
+
+def _allocate(total: int, weights) -> list:
+    """total'i ağırlıklara göre tam sayılara böl (en büyük kalan; toplam birebir korunur)."""
+    s = sum(weights)
+    raw = [total * w / s for w in weights]
+    out = [int(x) for x in raw]
+    rest = sorted(range(len(raw)), key=lambda i: raw[i] - out[i], reverse=True)
+    for i in rest[: total - sum(out)]:
+        out[i] += 1
+    return out
+
+
+def _cum(weights) -> list:
+    acc, out = 0.0, []
+    for w in weights:
+        acc += w
+        out.append(acc)
+    return out
+
+
+class _Writer:
+    """
+    Tablo başına tampon. Satırlar üst tablolara yerel sıra numarasıyla (0..n-1) bağlanır;
+    flush sırası üstten alta olduğu için çocuk satır yazılırken ebeveyn ID'si hazırdır.
+    """
+
+    ORDER = (MaintenanceRequest, WorkOrder, PurchaseOrder, WarehouseTxn)
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        self.buf = {m: [] for m in self.ORDER}
+        self.ids = {m: [] for m in self.ORDER}
+        self.counts = Counter()
+
+    def add(self, model, row: dict) -> int:
+        """Satırı tampona ekle; yerel sıra numarasını döndür."""
+        self.buf[model].append(row)
+        self.counts[model.__tablename__] += 1
+        return self.counts[model.__tablename__] - 1
+
+    def maybe_flush(self) -> None:
+        if any(len(rows) >= self.chunk_size for rows in self.buf.values()):
+            self.flush()
+
+    def flush(self) -> None:
+        for model in self.ORDER:
+            rows = self.buf[model]
+            for i in range(0, len(rows), self.chunk_size):
+                chunk = rows[i:i + self.chunk_size]
+                self._resolve(model, chunk)
+                ids = insert_chunk(model, chunk, want_ids=model is not WarehouseTxn)
+                if ids is not None:
+                    self.ids[model].extend(ids)
+            rows.clear()
+
+    def _resolve(self, model, chunk) -> None:
+        if model is WorkOrder:
+            req_ids = self.ids[MaintenanceRequest]
+            for r in chunk:
+                r["RequestID"] = req_ids[r["RequestID"]]
+        elif model is WarehouseTxn:
+            wo_ids, po_ids = self.ids[WorkOrder], self.ids[PurchaseOrder]
+            for r in chunk:
+                if r["WorkOrderID"] is not None:
+                    r["WorkOrderID"] = wo_ids[r["WorkOrderID"]]
+                if r["POID"] is not None:
+                    r["POID"] = po_ids[r["POID"]]
+                    r["Reason"] = REASON_PO_RECEIVE.format(r["POID"])
+
+
+def insert_chunk(model, rows: list, *, want_ids: bool = True):
+    """Tek executemany + commit; want_ids: eklenen satırların ID'leri (eklenme sırasıyla)."""
+    table = model.__table__
+    pk = table.primary_key.columns[0]
+    with engine.begin() as conn:
+        last = (conn.scalar(select(func.max(pk))) or 0) if want_ids else None
+        conn.execute(insert(table), rows)
+        if not want_ids:
+            return None
+        ids = conn.scalars(select(pk).where(pk > last).order_by(pk).limit(len(rows))).all()
+    if len(ids) != len(rows):
+        raise RuntimeError(f"{table.name}: {len(rows)} satır eklendi, {len(ids)} ID okundu (eşzamanlı yazıcı?)")
+    return ids
+
+
+def _ensure_empty() -> None:
+    with engine.connect() as conn:
+        for model in (Machine, Technician, Supplier, Part, MaintenanceRequest, WarehouseTxn, PurchaseOrder):
+            if conn.scalar(select(func.count()).select_from(model.__table__)):
+                raise SystemExit(
+                    f"{model.__tablename__} tablosu boş değil; boş bir veritabanında çalıştırın "
+                    "(SQLite/PostgreSQL: python -m app.scripts.create_schema --drop)"
+                )
+
+
+# ---------- üretim ----------
+
+def generate(*, machines: int, technicians: int, suppliers: int, parts: int, requests: int, txns: int,
+             days: int = 730, end: date | None = None, seed: int = 42,
+             chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None) -> dict:
+    """
+    [end - days, end) dönemi için veri üretir ve yazar. txns hedefi açılış + OUT + PO girişleridir;
+    PO girişleri yeniden sipariş kuralından çıktığı için gerçekleşen sayı yaklaşıktır.
+    """
+    rng = random.Random(seed)
+    end = end or datetime.utcnow().date()
+    start = end - timedelta(days=days)
+    end_dt = datetime.combine(end, time.min)
+    _ensure_empty()
+    w = _Writer(chunk_size)
+
+    # --- ana veriler ---
+    machine_ids = insert_chunks(Machine, [
+        {"Code": f"M-{i:05d}", "Name": f"Makine {i}", "Location": f"{rng.choice(LOCATIONS)}-{rng.randint(1, 20)}",
+         "CommissionDate": start - timedelta(days=rng.randint(0, 5000)), "IsActive": True}
+        for i in range(1, machines + 1)
+    ], chunk_size)
+    tech_ids = insert_chunks(Technician, [
+        {"FullName": f"Teknisyen {i}", "SkillLevel": rng.randint(3, 10), "Phone": f"05{rng.randint(10**8, 10**9 - 1)}"}
+        for i in range(1, technicians + 1)
+    ], chunk_size)
+    supplier_ids = insert_chunks(Supplier, [
+        {"Name": f"Tedarikçi {i}", "Phone": f"0212{rng.randint(10**6, 10**7 - 1)}", "Email": f"satis{i}@tedarik.example"}
+        for i in range(1, suppliers + 1)
+    ], chunk_size)
+
+    failure_cum = _cum(rng.paretovariate(FAILURE_PARETO_ALPHA) for _ in range(machines))
+    supplier_cum = _cum(rng.paretovariate(FAILURE_PARETO_ALPHA) for _ in range(suppliers))
+
+    # Parça popülerliği + mevsim profili; beklenen günlük tüketimden MinStock / sipariş miktarı
+    out_total = round(max(0, txns - parts) * OUT_SHARE)
+    mean_qty = sum(q * wt for q, wt in zip(OUT_QTYS, OUT_QTY_WEIGHTS)) / sum(OUT_QTY_WEIGHTS)
+    pop = [rng.paretovariate(PART_PARETO_ALPHA) for _ in range(parts)]
+    pop_sum = sum(pop)
+    season_of = rng.choices(range(len(SEASONS)), weights=[s[0] for s in SEASONS], k=parts)
+    rate = [out_total * p / pop_sum * mean_qty / days for p in pop]
+    min_stock = [max(1, math.ceil(r * LEAD_DAYS[1] * 1.2)) for r in rate]
+    reorder_qty = [max(MIN_REORDER_QTY, math.ceil(r * REORDER_COVER_DAYS), 2 * m) for r, m in zip(rate, min_stock)]
+    stock = [m + q + rng.randint(0, q) for m, q in zip(min_stock, reorder_qty)]
+    preferred = [rng.choices(range(suppliers), cum_weights=supplier_cum)[0] for _ in range(parts)]
+    part_ids = insert_chunks(Part, [
+        {"PartCode": f"P-{i + 1:06d}", "PartName": f"{rng.choice(PART_NAMES)} {rng.randint(10, 999)}",
+         "Unit": rng.choices(UNITS, weights=UNIT_WEIGHTS)[0], "MinStock": min_stock[i], "CurrentStock": 0,
+         "IsActive": True, "ReservedQty": 0}
+        for i in range(parts)
+    ], chunk_size)
+
+    group_parts = [[i for i in range(parts) if season_of[i] == g] for g in range(len(SEASONS))]
+    group_cum = [_cum(pop[i] for i in gp) for gp in group_parts]
+    group_pop = [cum[-1] if cum else 0.0 for cum in group_cum]
+
+    def pick_parts(d: date, k: int) -> list:
+        gw = [group_pop[g] * _season_factor(d, amp, peak) for g, (_, amp, peak) in enumerate(SEASONS)]
+        out = []
+        for g, n in Counter(rng.choices(range(len(SEASONS)), weights=gw, k=k)).items():
+            out += rng.choices(group_parts[g], cum_weights=group_cum[g], k=n)
+        rng.shuffle(out)
+        return out
+
+    # --- günlük hacimler (hafta içi/sonu, mevsim, zamanla artan yük) ---
+    day_list = [start + timedelta(days=d) for d in range(days)]
+    load = [WEEKDAY_FACTORS[d.weekday()] * (1 + 0.3 * i / days) for i, d in enumerate(day_list)]
+    req_per_day = _allocate(requests, [l * _season_factor(d, 0.15, 15) for l, d in zip(load, day_list)])
+    out_per_day = _allocate(out_total, [l * _season_factor(d, 0.2, 200) for l, d in zip(load, day_list)])
+
+    on_order = [0] * parts
+    receipts = defaultdict(list)  # gün -> [(po_local, part, qty, eta)]
+    stats = Counter()
+
+    # Açılış stokları (dönem başı)
+    opening = datetime.combine(start, time.min)
+    for i in range(parts):
+        w.add(WarehouseTxn, {"PartID": part_ids[i], "TxnType": "IN", "Quantity": stock[i], "TxnDate": opening,
+                             "Reason": "Opening", "WorkOrderID": None, "POID": None})
+
+    def new_po(i: int, d_idx: int, d: date) -> None:
+        qty = reorder_qty[i]
+        lead = rng.randint(*LEAD_DAYS)
+        eta = d + timedelta(days=lead)
+        recv = d_idx + max(1, lead + rng.randint(-2, 5))
+        row = {"SupplierID": supplier_ids[preferred[i]], "PartID": part_ids[i], "Qty": qty,
+               "UnitPrice": round(rng.uniform(5, 2500), 2), "PODate": d, "ETA": eta}
+        if recv < days:
+            row["Status_s"] = "Received"
+            receipts[recv].append((w.add(PurchaseOrder, row), i, qty))
+        else:
+            row["Status_s"] = "Ordered" if d_idx < days - 1 else "Created"
+            w.add(PurchaseOrder, row)
+        on_order[i] += qty
+        if rng.random() < CANCEL_RATE:  # iptal edilip yerine yenisi açılmış sipariş
+            w.add(PurchaseOrder, {**row, "SupplierID": supplier_ids[rng.randrange(suppliers)],
+                                  "Status_s": "Canceled"})
+
+    t0 = _time.perf_counter()
+    for d_idx, d in enumerate(day_list):
+        day0 = datetime.combine(d, time.min)
+
+        # 1) PO girişleri (mesai öncesi; günün çıkışlarından önce)
+        for po_local, i, qty in receipts.pop(d_idx, ()):
+            stock[i] += qty
+            on_order[i] -= qty
+            w.add(WarehouseTxn, {"PartID": part_ids[i], "TxnType": "IN", "Quantity": qty,
+                                 "TxnDate": day0 + timedelta(hours=5, seconds=rng.randrange(3600)),
+                                 "Reason": None, "WorkOrderID": None, "POID": po_local})
+
+        # 2) Arıza talepleri + iş emirleri; iş emri parçaları açılıştan kısa süre sonra çıkar
+        moves = []  # (zaman, parça, miktar, wo_local)
+        n_req = req_per_day[d_idx]
+        for m in rng.choices(range(machines), cum_weights=failure_cum, k=n_req):
+            opened = day0 + timedelta(seconds=rng.randrange(6 * 3600, 22 * 3600))
+            req = {"MachineID": machine_ids[m], "OpenedAt": opened, "OpenedBy": f"Operator{rng.randint(1, 50)}",
+                   "Priority_s": rng.choices(PRIORITIES, weights=PRIORITY_WEIGHTS)[0], "Description_s": rng.choice(FAULTS), "Status_s": "Open"}
+            req_local = w.add(MaintenanceRequest, req)
+            if rng.random() >= WO_SHARE:
+                continue
+            wo_opened = min(opened + timedelta(seconds=rng.randrange(300, 7200)), day0 + timedelta(seconds=86399))
+            closed = wo_opened + timedelta(hours=rng.lognormvariate(math.log(WO_MEDIAN_HOURS), 1.0))
+            closed = closed if closed < end_dt else None
+            wo_local = w.add(WorkOrder, {
+                "RequestID": req_local, "TechnicianID": rng.choice(tech_ids), "OpenedAt": wo_opened,
+                "ClosedAt": closed, "Notes": None,
+                "Status_s": "Closed" if closed else rng.choice(("Open", "InProgress")),
+            })
+            req["Status_s"] = "Closed" if closed else "InProgress"
+            k = rng.choices(WO_PARTS, weights=WO_PARTS_WEIGHTS)[0]
+            for i in pick_parts(d, k) if k else ():
+                t = min(wo_opened + timedelta(seconds=rng.randrange(3600)), day0 + timedelta(seconds=86399))
+                moves.append((t, i, rng.choices(OUT_QTYS, weights=OUT_QTY_WEIGHTS)[0], wo_local))
+
+        # 3) Genel tüketim: günün OUT bütçesinin kalanı
+        n_free = max(0, out_per_day[d_idx] - len(moves))
+        qtys = rng.choices(OUT_QTYS, weights=OUT_QTY_WEIGHTS, k=n_free)
+        for i, q in zip(pick_parts(d, n_free), qtys):
+            moves.append((day0 + timedelta(seconds=rng.randrange(9 * 3600, 86400)), i, q, None))
+
+        # 4) Zaman sırasıyla stoktan düş; eksik stokta kısmi çıkış, sıfırda kaçırılan talep
+        moves.sort(key=lambda mv: mv[0])
+        touched = set()
+        for t, i, q, wo_local in moves:
+            q = min(q, stock[i])
+            if q <= 0:
+                stats["stockouts"] += 1
+                continue
+            stock[i] -= q
+            touched.add(i)
+            w.add(WarehouseTxn, {"PartID": part_ids[i], "TxnType": "OUT", "Quantity": q, "TxnDate": t,
+                                 "Reason": "Issue", "WorkOrderID": wo_local, "POID": None})
+
+        # 5) Gün sonu yeniden sipariş
+        for i in sorted(touched):
+            if stock[i] + on_order[i] <= min_stock[i]:
+                new_po(i, d_idx, d)
+
+        w.maybe_flush()
+        if progress and (d_idx + 1) % max(1, days // 10) == 0:
+            progress(f"{d.isoformat()}: {dict(w.counts)} ({_time.perf_counter() - t0:.0f} sn)")
+
+    w.flush()
+
+    # Son stoklar (hareketlerle birebir)
+    stmt = (
+        update(Part.__table__)
+        .where(Part.__table__.c.PartID == bindparam("b_id"))
+        .values(CurrentStock=bindparam("b_stock"))
+    )
+    params = [{"b_id": pid, "b_stock": s} for pid, s in zip(part_ids, stock)]
+    for i in range(0, len(params), chunk_size):
+        with engine.begin() as conn:
+            conn.execute(stmt, params[i:i + chunk_size])
+
+    return {
+        "start": start.isoformat(), "end": end.isoformat(), "seed": seed,
+        "Machine": machines, "Technician": technicians, "Supplier": suppliers, "Part": parts,
+        **dict(w.counts), "stockouts": stats["stockouts"],
+        "seconds": round(_time.perf_counter() - t0, 1),
+    }
+
+
+def insert_chunks(model, rows: list, chunk_size: int) -> list:
+    ids = []
+    for i in range(0, len(rows), chunk_size):
+        ids += insert_chunk(model, rows[i:i + chunk_size])
+    return ids
+
+
+def build_derived(progress=None) -> dict:
+    """Rollup tabloları ve stok kontrol noktaları (raporlar / stock-at üretilen veriyi görsün)."""
+    from app.services.rollup_service import rebuild_rollups
+    from app.services.stock_history_service import build_checkpoints
+
+    db = SessionLocal()
+    try:
+        res = {"rollups": rebuild_rollups(db)}
+        if progress:
+            progress(f"rollup: {res['rollups']}")
+        res["checkpoints"] = build_checkpoints(db, full=True)
+        return res
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Tekrarlanabilir sentetik veri üretimi (boş veritabanına)")
+    ap.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for name in ("machines", "technicians", "suppliers", "parts", "requests", "txns"):
+        ap.add_argument(f"--{name}", type=int, default=None, help="preset değerini ezer")
+    ap.add_argument("--days", type=int, default=730, help="üretilecek dönem (gün)")
+    ap.add_argument("--end", type=date.fromisoformat, default=None, help="dönem sonu YYYY-MM-DD (hariç; varsayılan bugün)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    ap.add_argument("--skip-derived", action="store_true", help="rollup / kontrol noktası üretme")
+    args = ap.parse_args()
+
+    volumes = {k: getattr(args, k) if getattr(args, k) is not None else v for k, v in PRESETS[args.preset].items()}
+
+    def log(msg: str) -> None:
+        print(msg, file=sys.stderr, flush=True)
+
+    log(f"{engine.url.render_as_string(hide_password=True)}: {volumes}")
+    res = generate(**volumes, days=args.days, end=args.end, seed=args.seed, chunk_size=args.chunk_size,
+                   progress=log)
+    if not args.skip_derived:
+        res["derived"] = build_derived(progress=log)
+    print(f"Üretim tamam: {res}")
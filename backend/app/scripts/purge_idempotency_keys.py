@@ -0,0 +1,25 @@
+"""
+Süresi dolmuş Idempotency-Key satırlarını siler (IDEMPOTENCY_TTL_HOURS).
+
+Kullanım (backend/ dizininden; günde bir zamanlanması yeterli):
+    python -m app.scripts.purge_idempotency_keys
+"""
+import argparse
+
+from app.core.db import SessionLocal
+from app.services.idempotency_service import purge_expired
+
+
+def run(batch_size: int = 5000) -> int:
+    db = SessionLocal()
+    try:
+        return purge_expired(db, batch_size=batch_size)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="IdempotencyKey temizliği")
+    ap.add_argument("--batch-size", type=int, default=5000)
+    args = ap.parse_args()
+    print(f"Silinen anahtar: {run(args.batch_size)}")
@@ -0,0 +1,29 @@
+"""
+Rapor rollup tablolarını ham verilerden yeniden üretir (backfill / onarım).
+
+Kullanım (backend/ dizininden):
+    python -m app.scripts.rebuild_rollups                         # tamamı
+    python -m app.scripts.rebuild_rollups --start 2025-01-01 --end 2025-02-01
+"""
+import argparse
+from datetime import date
+
+from app.core.db import SessionLocal
+from app.services.rollup_service import rebuild_rollups
+
+
+def run(start: date | None = None, end: date | None = None) -> dict:
+    db = SessionLocal()
+    try:
+        return rebuild_rollups(db, start=start, end=end)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="MachineFailureDaily / PartConsumptionDaily rebuild")
+    ap.add_argument("--start", type=date.fromisoformat, default=None, help="YYYY-MM-DD (dahil)")
+    ap.add_argument("--end", type=date.fromisoformat, default=None, help="YYYY-MM-DD (hariç)")
+    args = ap.parse_args()
+    res = run(args.start, args.end)
+    print(f"Rollup tamam: {res}")
@@ -0,0 +1,48 @@
+"""
+Part.CurrentStock ile defter bakiyesini (IN - OUT, arşiv özetleri dahil) karşılaştırır; farkları raporlar.
+Yalnızca okur (MSSQL'de SNAPSHOT); depo hareketlerini bloklamaz.
+
+Kullanım (backend/ dizininden):
+    python -m app.scripts.reconcile_stock                              # tamamı, ekrana özet
+    python -m app.scripts.reconcile_stock --out stock_diff.csv         # farklar CSV'ye
+    python -m app.scripts.reconcile_stock --budget 60 --after 12000    # süre sınırlı, kaldığı yerden
+"""
+import argparse
+import csv
+
+from app.core.db import SessionLocal
+from app.services.reconcile_service import RECONCILE_CHUNK_SIZE, reconcile_stock
+
+CSV_FIELDS = ("PartID", "PartCode", "PartName", "CurrentStock", "LedgerStock", "Diff")
+
+
+def run(*, after: int = 0, chunk_size: int = RECONCILE_CHUNK_SIZE, budget: float | None = None,
+        out: str | None = None) -> dict:
+    db = SessionLocal()
+    try:
+        # Komut satırında rapor kesilmesin: tüm farklar dosyaya
+        res = reconcile_stock(db, after_id=after, chunk_size=chunk_size, time_budget_s=budget,
+                              max_items=10**9)
+    finally:
+        db.close()
+    if out:
+        with open(out, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            w.writeheader()
+            w.writerows(res["items"])
+    return res
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="CurrentStock / defter mutabakatı")
+    ap.add_argument("--after", type=int, default=0, help="bu PartID'den sonra başla (önceki nextCursor)")
+    ap.add_argument("--chunk-size", type=int, default=RECONCILE_CHUNK_SIZE)
+    ap.add_argument("--budget", type=float, default=None, help="saniye; dolarsa nextCursor yazdırılır")
+    ap.add_argument("--out", default=None, help="farkların yazılacağı CSV")
+    args = ap.parse_args()
+    res = run(after=args.after, chunk_size=args.chunk_size, budget=args.budget, out=args.out)
+    for it in res["items"][:20]:
+        print(f"  PartID={it['PartID']} {it['PartCode']}: CurrentStock={it['CurrentStock']} "
+              f"defter={it['LedgerStock']} fark={it['Diff']:+d}")
+    summary = {k: v for k, v in res.items() if k != "items"}
+    print(f"Mutabakat: {summary}")
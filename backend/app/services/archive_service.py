@@ -0,0 +1,156 @@
+# backend/app/services/archive_service.py
+"""
+WarehouseTxn saklama (retention):
+- archive_txns: ufuk öncesi hareketleri parça parça (chunk) WarehouseTxnArchive'a taşır,
+  taşınan ayların parça özetini WarehouseTxnMonthly'ye ekler, sıcak tablodan siler
+- ledger_union: sıcak + arşiv hareketlerini aynı kolonlarla birleştiren UNION ALL (okuma yolları için)
+Ufuk ay başına hizalanır; böylece özetlenen aylar her zaman tam aydır.
+"""
+from __future__ import annotations
+import os
+from datetime import date, datetime
+from typing import Callable, Optional
+
+from sqlalchemy import Integer, case, delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.dialect import dialect_name
+from app.core.columnstore import with_columnstore
+from app.models import WarehouseTxn, WarehouseTxnArchive, WarehouseTxnMonthly
+from app.services.rollup_service import bump_counters
+
+ARCHIVE_HORIZON_MONTHS = int(os.getenv("WAREHOUSE_ARCHIVE_HORIZON_MONTHS", "24"))
+ARCHIVE_CHUNK_SIZE = int(os.getenv("WAREHOUSE_ARCHIVE_CHUNK_SIZE", "5000"))
+
+# Sıcak ve arşiv tablolarında ortak kolonlar (UNION ALL sırası)
+TXN_COLUMNS = ("TxnID", "PartID", "TxnType", "Quantity", "TxnDate", "Reason", "WorkOrderID", "POID")
+
+
+def month_expr(db: Session, col):
+    if dialect_name(db) == "mssql":
+        return func.datefromparts(func.year(col), func.month(col), 1)
+    return func.date(col, "start of month")
+
+
+def archive_cutoff(horizon_months: int = ARCHIVE_HORIZON_MONTHS, today: Optional[date] = None) -> datetime:
+    """today'in ayından horizon_months ay önceki ayın ilk günü (naive UTC)."""
+    today = today or datetime.utcnow().date()
+    idx = today.year * 12 + (today.month - 1) - max(0, int(horizon_months))
+    return datetime(idx // 12, idx % 12 + 1, 1)
+
+
+def ledger_union(
+    where: Callable[[type], list],
+    columns=TXN_COLUMNS,
+    *,
+    archived_flag: bool = False,
+    analytics_db: Optional[Session] = None,
+    span_days: Optional[int] = None,
+):
+    """
+    where(model) -> koşul listesi; iki tabloya da aynı filtre uygulanır.
+    Dönüş: UNION ALL subquery (kolon adları columns; archived_flag ise + Archived).
+    analytics_db verilirse ve span_days (filtrenin gün aralığı) columnstore eşiğini aşıyorsa
+    sıcak dala NCCI hint'i eklenir (geniş aralıklı toplama sorguları).
+    """
+    def _branch(model, flag: int):
+        cols = [getattr(model, c).label(c) for c in columns]
+        if archived_flag:
+            cols.append(literal(flag, Integer).label("Archived"))
+        return select(*cols).where(*where(model))
+
+    hot = _branch(WarehouseTxn, 0)
+    if analytics_db is not None:
+        hot = with_columnstore(hot, analytics_db, span_days)
+    return union_all(hot, _branch(WarehouseTxnArchive, 1)).subquery("ledger")
+
+
+def archive_txns(
+    db: Session,
+    *,
+    cutoff: datetime,
+    chunk_size: int = ARCHIVE_CHUNK_SIZE,
+    max_chunks: Optional[int] = None,
+    dry_run: bool = False,
+) -> dict:
+    """
+    TxnDate < cutoff olan hareketleri TxnID sırasıyla chunk_size'lık aralıklarla taşır.
+    Her aralık tek transaction: arşive kopyala -> aylık özeti artır -> sıcak tablodan sil -> commit.
+    Kısa transaction'lar canlı create_txn/receive_po kilitleriyle uzun süre çakışmaz.
+    """
+    if dry_run:
+        row = db.execute(
+            select(func.count(), func.min(WarehouseTxn.TxnDate), func.max(WarehouseTxn.TxnDate))
+            .where(WarehouseTxn.TxnDate < cutoff)
+        ).one()
+        return {"cutoff": cutoff.isoformat(), "dryRun": True, "eligible": int(row[0] or 0),
+                "oldest": row[1].isoformat() if row[1] else None,
+                "newest": row[2].isoformat() if row[2] else None}
+
+    moved = chunks = 0
+    months: set = set()
+    last_id = 0
+    chunk_size = max(1, int(chunk_size))
+    while max_chunks is None or chunks < max_chunks:
+        ids = (
+            select(WarehouseTxn.TxnID)
+            .where(WarehouseTxn.TxnDate < cutoff, WarehouseTxn.TxnID > last_id)
+            .order_by(WarehouseTxn.TxnID)
+            .limit(chunk_size)
+            .subquery()
+        )
+        hi, n = db.execute(select(func.max(ids.c.TxnID), func.count())).one()
+        if not n:
+            db.rollback()
+            break
+        rng = [WarehouseTxn.TxnDate < cutoff, WarehouseTxn.TxnID > last_id, WarehouseTxn.TxnID <= hi]
+        try:
+            db.execute(
+                insert(WarehouseTxnArchive).from_select(
+                    list(TXN_COLUMNS),
+                    select(*[getattr(WarehouseTxn, c) for c in TXN_COLUMNS]).where(*rng),
+                )
+            )
+
+            # Aylık özet (GROUP BY ifade yerine alt sorgu kolonu; MSSQL uyumlu)
+            inner = select(
+                WarehouseTxn.PartID.label("PartID"),
+                month_expr(db, WarehouseTxn.TxnDate).label("Month"),
+                case((WarehouseTxn.TxnType == "IN", WarehouseTxn.Quantity), else_=0).label("QtyIn"),
+                case((WarehouseTxn.TxnType == "OUT", WarehouseTxn.Quantity), else_=0).label("QtyOut"),
+            ).where(*rng).subquery()
+            agg = db.execute(
+                select(
+                    inner.c.PartID, inner.c.Month,
+                    func.sum(inner.c.QtyIn), func.sum(inner.c.QtyOut), func.count(),
+                )
+                .group_by(inner.c.PartID, inner.c.Month)
+                .order_by(inner.c.PartID, inner.c.Month)
+            ).all()
+            for part_id, month, qty_in, qty_out, cnt in agg:
+                if isinstance(month, str):
+                    month = date.fromisoformat(month)
+                elif isinstance(month, datetime):
+                    month = month.date()
+                months.add(month)
+                bump_counters(
+                    db, WarehouseTxnMonthly,
+                    {"PartID": int(part_id), "Month": month},
+                    {"QtyIn": int(qty_in or 0), "QtyOut": int(qty_out or 0), "TxnCount": int(cnt)},
+                )
+
+            deleted = db.execute(delete(WarehouseTxn).where(*rng)).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        moved += int(deleted or 0)
+        chunks += 1
+        last_id = hi
+
+    return {
+        "cutoff": cutoff.isoformat(),
+        "moved": moved,
+        "chunks": chunks,
+        "months": sorted(m.isoformat() for m in months),
+    }
@@ -0,0 +1,217 @@
+# backend/app/services/idempotency_service.py
+"""
+Idempotency-Key desteği (el terminalleri zaman aşımında aynı POST'u tekrar gönderir).
+- Anahtarlar kullanıcıya özeldir: Scope = "<uç>:<UserID>" (başka kullanıcının yanıtı dönmez)
+- İlk istek: (Scope, Key) satırı "işleniyor" olarak eklenir (claim) ve commit edilir (eşzamanlı
+  tekrar 409 alır); ardından mutasyon + yanıt satırı (status + JSON gövde) tek @transactional
+  birimde çalışır: servis commit'leri ertelenir (unit_of_work.deferred_commit), ikisi tek commit'le
+  yazılır (çökme: ya ikisi de var ya hiçbiri). Commit anındaki kilit hataları birimle birlikte
+  yeniden denenir; önbellek düşürmeleri yalnızca commit başarılıysa çalışır
+- Tekrar (replay): saklanan yanıt döner; Part / PurchaseOrder satırlarına dokunulmaz (kilit yok)
+- Aynı anahtar hâlâ işleniyorsa 409 + Retry-After; farklı gövdeyle kullanılmışsa 422
+- IDEMPOTENCY_LEASE_SECONDS'i aşan "işleniyor" satırı (çöken istek) yeni isteğe devredilir;
+  devredilen eski istek commit'te claim'ini kaybettiğini görür ve geri alınır (409)
+- Mutasyon hata verirse ya da 4xx/5xx yanıt dönerse claim silinir (istemci aynı anahtarla yeniden deneyebilir)
+- Satırlar IDEMPOTENCY_TTL_HOURS sonra geçersizdir; temizlik: python -m app.scripts.purge_idempotency_keys
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import Header, HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.api import UTF8JSONResponse
+from app.core.security import Principal
+from app.models import IdempotencyKey
+from app.services.unit_of_work import deferred_commit, transactional
+
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+IDEMPOTENCY_RETRY_AFTER_SECONDS = int(os.getenv("IDEMPOTENCY_RETRY_AFTER_SECONDS", "1"))
+# Kilit beklemesi + yeniden denemelerden uzun tutulmalı (aksi halde yavaş istek devralınır)
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+# Endpoint parametresi: idempotency_key: Optional[str] = IdempotencyKeyHeader
+IdempotencyKeyHeader = Header(
+    None, alias="Idempotency-Key", min_length=1, max_length=100,
+    description="Aynı anahtarla tekrar gönderilen istek saklanan yanıtı alır (TTL: IDEMPOTENCY_TTL_HOURS)",
+)
+
+
+def request_hash(payload: Any) -> str:
+    """Gövdenin kararlı (anahtar sıralı) JSON'undan sha256."""
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _conflict(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=detail,
+        headers={"Retry-After": str(IDEMPOTENCY_RETRY_AFTER_SECONDS)},
+    )
+
+
+def claim(db: Session, *, scope: str, key: str, req_hash: str, token: str) -> Optional[Tuple[int, Any]]:
+    """
+    Anahtarı token ile sahiplenir. Dönüş: None (yeni istek; mutasyonu çalıştır) ya da saklanan (status, gövde).
+    """
+    now = datetime.utcnow()
+    for _ in range(3):
+        try:
+            db.execute(insert(IdempotencyKey).values(
+                Scope=scope, Key=key, RequestHash=req_hash,
+                CreatedAt=now, ExpiresAt=now + timedelta(hours=IDEMPOTENCY_TTL_HOURS),
+                ClaimedAt=now, ClaimToken=token,
+            ))
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+
+        row = db.execute(
+            select(IdempotencyKey.RequestHash, IdempotencyKey.StatusCode,
+                   IdempotencyKey.Response, IdempotencyKey.ExpiresAt,
+                   IdempotencyKey.CreatedAt, IdempotencyKey.ClaimedAt, IdempotencyKey.ClaimToken)
+            .where(IdempotencyKey.Scope == scope, IdempotencyKey.Key == key)
+        ).first()
+        db.rollback()
+        if row is None:
+            continue  # arada silindi; tekrar dene
+        if row.ExpiresAt <= now:
+            # Süresi dolmuş: yeni istek gibi davran
+            db.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.Scope == scope, IdempotencyKey.Key == key,
+                IdempotencyKey.ExpiresAt <= now,
+            ))
+            db.commit()
+            continue
+        if row.RequestHash != req_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key farklı bir istek gövdesiyle kullanılmış.",
+            )
+        if row.StatusCode is None:
+            claimed_at = row.ClaimedAt or row.CreatedAt
+            if claimed_at > now - timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS):
+                raise _conflict("Aynı Idempotency-Key ile istek hâlâ işleniyor; biraz sonra tekrar deneyin.")
+            # Süresi geçmiş claim (istek yarıda kalmış; mutasyon commit edilmemiş): devral
+            prev = (IdempotencyKey.ClaimToken.is_(None) if row.ClaimToken is None
+                    else IdempotencyKey.ClaimToken == row.ClaimToken)
+            res = db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.Scope == scope, IdempotencyKey.Key == key,
+                       IdempotencyKey.StatusCode.is_(None), prev)
+                .values(ClaimedAt=now, ClaimToken=token)
+            )
+            db.commit()
+            if res.rowcount == 1:
+                return None
+            continue  # başka istek önce devraldı ya da tamamladı; satırı yeniden oku
+        return int(row.StatusCode), json.loads(row.Response) if row.Response else None
+    raise _conflict("Idempotency-Key sahiplenilemedi; tekrar deneyin.")
+
+
+def complete(db: Session, *, scope: str, key: str, token: str, status_code: int, body: Any) -> None:
+    """
+    Yanıtı satıra yazar; commit etmez (mutasyonla aynı transaction). Claim devredildiyse 409
+    (çağıran rollback yapar; mutasyon da geri alınır).
+    """
+    res = db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.Scope == scope, IdempotencyKey.Key == key,
+               IdempotencyKey.StatusCode.is_(None), IdempotencyKey.ClaimToken == token)
+        .values(StatusCode=status_code, Response=json.dumps(body, ensure_ascii=False, default=str))
+    )
+    if res.rowcount != 1:
+        raise _conflict("Idempotency-Key başka bir istek tarafından devralındı; yanıt için tekrar deneyin.")
+
+
+def release(db: Session, *, scope: str, key: str, token: str) -> None:
+    db.execute(delete(IdempotencyKey).where(
+        IdempotencyKey.Scope == scope, IdempotencyKey.Key == key,
+        IdempotencyKey.StatusCode.is_(None), IdempotencyKey.ClaimToken == token,
+    ))
+    db.commit()
+
+
+def idempotent(
+    db: Session,
+    *,
+    scope: str,
+    key: Optional[str],
+    principal: Principal,
+    payload: Any,
+    fn: Callable[[], JSONResponse],
+) -> JSONResponse:
+    """
+    fn(): mutasyonu yapar ve JSON yanıtını döner (ör. ok(...)). key yoksa fn doğrudan çalışır.
+    Anahtar principal.UserID ile kapsamlanır. Tekrarlarda saklanan yanıt Idempotent-Replayed: true
+    başlığıyla döner.
+    """
+    if not key:
+        return fn()
+
+    scope = f"{scope}:{principal.UserID}"
+    token = uuid.uuid4().hex
+    stored = claim(db, scope=scope, key=key, req_hash=request_hash(payload), token=token)
+    if stored is not None:
+        code, body = stored
+        return UTF8JSONResponse(content=body, status_code=code, headers={REPLAY_HEADER: "true"})
+
+    @transactional(name="idempotent")
+    def _unit(db: Session) -> Tuple[JSONResponse, bool]:
+        with deferred_commit(db) as after_commit:
+            resp = fn()
+            if resp.status_code >= 400:
+                # Hata yanıtı saklanmaz (fırlatılan HTTPException gibi): aynı anahtarla yeniden denenebilir
+                db.rollback()
+                return resp, False
+            complete(db, scope=scope, key=key, token=token,
+                     status_code=resp.status_code, body=json.loads(resp.body))
+            db.commit()
+        for job in after_commit:
+            job()
+        return resp, True
+
+    try:
+        resp, stored = _unit(db)
+    except Exception:
+        db.rollback()
+        release(db, scope=scope, key=key, token=token)
+        raise
+    if not stored:
+        release(db, scope=scope, key=key, token=token)
+    return resp
+
+
+def purge_expired(db: Session, *, batch_size: int = 5000) -> int:
+    """Süresi dolmuş satırları parça parça siler (kısa transaction'lar)."""
+    now = datetime.utcnow()
+    total = 0
+    while True:
+        keys = db.execute(
+            select(IdempotencyKey.Scope, IdempotencyKey.Key)
+            .where(IdempotencyKey.ExpiresAt <= now)
+            .limit(batch_size)
+        ).all()
+        if not keys:
+            db.rollback()
+            break
+        t = IdempotencyKey.__table__
+        db.execute(
+            delete(t).where(t.c.Scope == bindparam("s"), t.c.Key == bindparam("k")),
+            [{"s": scope, "k": key} for scope, key in keys],
+        )
+        db.commit()
+        total += len(keys)
+    return total
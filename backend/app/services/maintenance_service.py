@@ -5,6 +5,10 @@ from sqlalchemy.exc import DBAPIError, IntegrityError
 from fastapi import HTTPException
 
 from app.models import Machine, MaintenanceRequest, Technician, WorkOrder
+from app.services.rollup_service import bump_machine_failure, bump_part_consumption_many
+from app.services.reservation_service import consume_reservations, lock_workorder
+from app.services.unit_of_work import transactional
+from app.core.cache import report_cache, TAG_AGING, TAG_CONSUMPTION, TAG_FAILURES
 
 # SQLAlchemy 1.3/1.4 uyumlu get
 def _get(db: Session, model, pk):
@@ -35,7 +39,10 @@ def create_request(
         )
         db.add(req)
         db.flush()
+        # Rapor rollup'ı aynı transaction'da
+        bump_machine_failure(db, machine_id=machine_id, day=req.OpenedAt.date())
         db.commit()
+        report_cache.invalidate_tags(TAG_FAILURES)
         db.refresh(req)
         return req
     except HTTPException:
@@ -81,6 +88,7 @@ def create_workorder(
         req.Status_s = "InProgress"
         db.flush()
         db.commit()
+        report_cache.invalidate_tags(TAG_AGING)
         db.refresh(wo)
         return wo
     except HTTPException:
@@ -94,21 +102,29 @@ def create_workorder(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"create_workorder_error: {e!r}")
 
+@transactional
 def close_workorder(db: Session, *, workorder_id: int):
     try:
-        wo = _get(db, WorkOrder, workorder_id)
+        # Kilit: eşzamanlı rezervasyon ekleme/bırakma kapanışla yarışmasın
+        wo = lock_workorder(db, workorder_id)
         if not wo:
             raise HTTPException(status_code=404, detail="WorkOrder not found")
         if wo.ClosedAt is not None:
             raise HTTPException(status_code=409, detail="WorkOrder is already closed")
 
-        wo.ClosedAt = datetime.utcnow()
+        now = datetime.utcnow()
+        # Aktif parça rezervasyonları -> OUT hareketleri (aynı transaction)
+        consumed = consume_reservations(db, workorder_id=workorder_id, now=now)
+        bump_part_consumption_many(db, [(pid, now.date(), qty) for pid, qty in consumed])
+
+        wo.ClosedAt = now
         wo.Status_s = "Closed"
         if wo.request and wo.request.Status_s != "Closed":
             wo.request.Status_s = "Closed"
 
         db.flush()
         db.commit()
+        report_cache.invalidate_tags(*((TAG_AGING, TAG_CONSUMPTION) if consumed else (TAG_AGING,)))
         db.refresh(wo)
         return wo
     except HTTPException:
@@ -1,26 +1,30 @@
 ﻿from __future__ import annotations
 from datetime import date
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
 import logging
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import Date, and_, func, insert, literal, or_, select
+from sqlalchemy.exc import IntegrityError
 
+from app.core.cache import count_cache, TAG_PURCHASE_ORDERS
+from app.core.dialect import RANGELOCK_HINT, for_update
 from app.models import PurchaseOrder, Supplier, Part, WarehouseTxn
 from app.domain.constants import REASON_PO_RECEIVE
+from app.services.reorder_service import suggestions_for_parts
+from app.services.unit_of_work import classify_retryable, commit_unit, on_commit, transactional
 
 logger = logging.getLogger(__name__)
 
 MONEY_PLACES = Decimal("0.01")
 
 
-def _dialect(db: Session) -> str:
-    try:
-        return db.bind.dialect.name
-    except Exception:
-        return "unknown"
+def _drop_po_counts() -> None:
+    count_cache.invalidate_tags(TAG_PURCHASE_ORDERS)
 
 
 def _to_money(val) -> Decimal:
@@ -68,7 +72,8 @@ def create_po(
     )
     try:
         db.add(po)
-        db.commit()
+        commit_unit(db)
+        on_commit(db, _drop_po_counts)
         db.refresh(po)
         return po
     except Exception as e:
@@ -77,33 +82,149 @@ def create_po(
         raise HTTPException(status_code=500, detail=f"create_po error: {type(e).__name__}: {e}")
 
 
-def _lock_po_for_update(db: Session, po_id: int) -> Optional[PurchaseOrder]:
+@transactional
+def create_pos_from_suggestions(
+    db: Session,
+    *,
+    supplier_id: int,
+    unit_price=None,
+    items: Optional[List[dict]] = None,
+    min_gap: int = 1,
+) -> Dict[str, Any]:
     """
-    PO satırını güncelleme için kilitle ve taze oku.
-    MSSQL'de UPDLOCK+ROWLOCK kullanılır; diğerlerinde SELECT ... FOR UPDATE.
+    Reorder önerilerinden toplu PO (tek transaction).
+    - items None: Gap >= min_gap olan tüm aktif parçalar; verilirse yalnızca o parçalar
+      (her kalemde PartID, isteğe bağlı UnitPrice / SupplierID)
+    - Qty = öneri (Gap); açığı kalmamış parçalar atlanır (Skipped)
+    - Tedarikçiler ve parçalar birer IN-list sorgusuyla doğrulanır; PO'lar executemany ile eklenir
+    - Etkilenen Part satırları PartID sırasıyla kilitlenir; Gap kilitten sonra hesaplanır
     """
-    try:
-        if _dialect(db) == "mssql":
-            db.execute(
-                text("SELECT POID FROM PurchaseOrder WITH (UPDLOCK, ROWLOCK) WHERE POID=:pid"),
-                {"pid": po_id},
+    overrides: Dict[int, dict] = {}
+    for it in items or []:
+        pid = int(it["PartID"])
+        if pid in overrides:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"PartID={pid} birden fazla kez gönderildi.",
             )
-            po = db.get(PurchaseOrder, po_id)
-            if po:
-                # Session cache ihtimaline karşı taze veriyi çek
-                db.refresh(po)
-            return po
-        else:
-            return (
-                db.query(PurchaseOrder)
-                .filter(PurchaseOrder.POID == po_id)
-                .with_for_update()
-                .one_or_none()
+        overrides[pid] = it
+
+    # Tedarikçiler: tek IN sorgusu
+    supplier_ids = {int(supplier_id)} | {
+        int(it["SupplierID"]) for it in overrides.values() if it.get("SupplierID")
+    }
+    found = set(db.execute(
+        select(Supplier.SupplierID).where(Supplier.SupplierID.in_(sorted(supplier_ids)))
+    ).scalars())
+    missing_sup = sorted(supplier_ids - found)
+    if missing_sup:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tedarikçi bulunamadı: {missing_sup}",
+        )
+
+    # Aday parçaları PartID sırasıyla kilitle; eşzamanlı toplu istek aynı parçayı bekler
+    # (sabit sıra: deadlock yok). Öneri/açık sipariş miktarı kilitten SONRA yeniden okunur,
+    # böylece önceki isteğin commit ettiği PO'lar Gap'ten düşer ve mükerrer PO oluşmaz.
+    if items is not None:
+        part_ids = sorted(overrides)
+    else:
+        pre, _ = suggestions_for_parts(db, part_ids=None, min_gap=min_gap)
+        part_ids = [r["PartID"] for r in pre]
+    if part_ids:
+        db.execute(for_update(
+            select(Part.PartID).where(Part.PartID.in_(part_ids)).order_by(Part.PartID)
+        )).all()
+
+    # Parçalar + öneri: tek IN sorgusu
+    rows, missing_parts = suggestions_for_parts(db, part_ids=part_ids, min_gap=min_gap)
+    if items is None:
+        missing_parts = []  # kilitlenene kadar pasifleşen aday hata değil
+    if missing_parts:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Parça bulunamadı ya da pasif: {missing_parts}",
+        )
+    sug_ids = {r["PartID"] for r in rows}
+    skipped = [pid for pid in sorted(overrides) if pid not in sug_ids]
+
+    default_price = _to_money(unit_price) if unit_price is not None else None
+    today = date.today()
+    values: List[dict] = []
+    no_price: List[int] = []
+    for r in rows:
+        it = overrides.get(r["PartID"], {})
+        price = _to_money(it["UnitPrice"]) if it.get("UnitPrice") is not None else default_price
+        if price is None or price <= 0:
+            no_price.append(r["PartID"])
+            continue
+        values.append({
+            "SupplierID": int(it.get("SupplierID") or supplier_id),
+            "PartID": int(r["PartID"]),
+            "Qty": int(r["Gap"]),
+            "UnitPrice": price,
+            "ETA": None,
+            "PODate": today,
+            "Status_s": "Created",
+        })
+    if no_price:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"UnitPrice eksik (varsayılan fiyat da yok): PartID {no_price}",
+        )
+
+    created: List[dict] = []
+    if values:
+        try:
+            # executemany (insertmanyvalues) + RETURNING: çok satırlı INSERT, POID'ler ek sorgusuz.
+            # Dönüş sırası garanti değil; PartID toplu istekte tekil olduğundan eşleme PartID ile.
+            res = db.execute(
+                insert(PurchaseOrder).returning(PurchaseOrder.POID, PurchaseOrder.PartID),
+                values,
             )
-    except Exception:
+            poids = {int(pid): int(poid) for poid, pid in res.all()}
+            commit_unit(db)
+            on_commit(db, _drop_po_counts)
+            created = [{
+                "POID": poids[v["PartID"]],
+                "SupplierID": v["SupplierID"],
+                "PartID": v["PartID"],
+                "Qty": v["Qty"],
+                "UnitPrice": float(v["UnitPrice"]),
+            } for v in values]
+        except Exception as e:
+            db.rollback()
+            if classify_retryable(e):
+                raise
+            logger.exception("create_pos_from_suggestions error (%s satır)", len(values))
+            raise HTTPException(status_code=500, detail=f"create_pos_bulk error: {type(e).__name__}: {e}")
+
+    return {
+        "POIDs": [c["POID"] for c in created],
+        "value": created,
+        "Count": len(created),
+        "Skipped": skipped,
+    }
+
+
+def _lock_po_for_update(db: Session, po_id: int) -> Optional[PurchaseOrder]:
+    """
+    PO satırını güncelleme için kilitle ve taze oku
+    (MSSQL UPDLOCK+ROWLOCK, PostgreSQL FOR UPDATE; bkz. app.core.dialect.for_update).
+    """
+    try:
+        return db.execute(
+            for_update(select(PurchaseOrder).where(PurchaseOrder.POID == po_id))
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+    except Exception as e:
+        # Kilitlenme / kilit zaman aşımı yutulmasın: @transactional birimi tekrar dener
+        if classify_retryable(e):
+            raise
         return db.get(PurchaseOrder, po_id)
 
 
+@transactional
 def place_po(db: Session, *, po_id: int) -> PurchaseOrder:
     po = _lock_po_for_update(db, po_id)
     if not po:
@@ -120,11 +241,13 @@ def place_po(db: Session, *, po_id: int) -> PurchaseOrder:
 
     po.Status_s = "Ordered"
     db.add(po)
-    db.commit()
+    commit_unit(db)
+    on_commit(db, _drop_po_counts)
     db.refresh(po)
     return po
 
 
+@transactional
 def receive_po(db: Session, *, po_id: int) -> PurchaseOrder:
     po = _lock_po_for_update(db, po_id)
     if not po:
@@ -144,46 +267,28 @@ def receive_po(db: Session, *, po_id: int) -> PurchaseOrder:
 
     try:
         # Part'ı da kilitle
-        if _dialect(db) == "mssql":
-            db.execute(
-                text("SELECT PartID FROM Part WITH (UPDLOCK, ROWLOCK) WHERE PartID=:pid"),
-                {"pid": po.PartID},
-            )
-            part = db.get(Part, po.PartID)
-            if part:
-                db.refresh(part)
-        else:
-            part = (
-                db.query(Part)
-                .filter(Part.PartID == po.PartID)
-                .with_for_update()
-                .one_or_none()
-            )
+        part = db.execute(
+            for_update(select(Part).where(Part.PartID == po.PartID))
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
 
         if not part:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parça bulunamadı.")
 
-        # --- DOUBLE RECEIVE GUARD (2) : WarehouseTxn'de aynı PO için önceden IN var mı?
+        # --- DOUBLE RECEIVE GUARD (2) : WarehouseTxn'de aynı PO için önceden hareket var mı?
+        # POID üzerindeki filtered unique index (UX_WarehouseTxn_POID_NotNull) sayesinde
+        # Reason metni taranmaz; kontrol tek bir index seek'tir.
         reason = REASON_PO_RECEIVE.format(po.POID)
-        already_exists = False
-        if _dialect(db) == "mssql":
-            # HOLDLOCK => seri hale getir; aynı anda iki receive'ın kaçmasını engeller
-            row = db.execute(
-                text(
-                    "SELECT TOP 1 TxnID FROM WarehouseTxn WITH (UPDLOCK, HOLDLOCK) "
-                    "WHERE TxnType='IN' AND Reason=:reason"
-                ),
-                {"reason": reason},
-            ).first()
-            already_exists = row is not None
-        else:
-            row = (
-                db.query(WarehouseTxn)
-                .filter(WarehouseTxn.TxnType == "IN", WarehouseTxn.Reason == reason)
-                .with_for_update()
-                .first()
+        # MSSQL: UPDLOCK + HOLDLOCK => satır yoksa da aralık kilitlenir; aynı anda iki receive kaçmaz
+        row = db.execute(
+            for_update(
+                select(WarehouseTxn.TxnID)
+                .where(WarehouseTxn.POID == po.POID, WarehouseTxn.POID.isnot(None))
+                .limit(1),
+                hint=RANGELOCK_HINT,
             )
-            already_exists = row is not None
+        ).first()
+        already_exists = row is not None
 
         if already_exists:
             raise HTTPException(
@@ -202,6 +307,7 @@ def receive_po(db: Session, *, po_id: int) -> PurchaseOrder:
             Quantity=int(po.Qty or 0),
             Reason=reason,
             WorkOrderID=None,
+            POID=po.POID,
         )
         db.add(tx)
 
@@ -209,19 +315,31 @@ def receive_po(db: Session, *, po_id: int) -> PurchaseOrder:
         po.Status_s = "Received"
         db.add(po)
 
-        db.commit()
+        commit_unit(db)
+        on_commit(db, _drop_po_counts)
         db.refresh(po)
         return po
 
     except HTTPException:
         db.rollback()
         raise
+    except IntegrityError:
+        # Unique index son savunma hattı: eşzamanlı ikinci receive
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Bu PO için daha önce IN hareketi oluşturulmuş (double receive engellendi).",
+        )
     except Exception as e:
         db.rollback()
-        logger.exception("receive_po error (POID=%s)", po_id)
+        if classify_retryable(e):
+            logger.warning("receive_po kilit çakışması (POID=%s): %s", po_id, type(e).__name__)
+        else:
+            logger.exception("receive_po error (POID=%s)", po_id)
         raise HTTPException(status_code=500, detail=f"receive_po error: {type(e).__name__}: {e}")
 
 
+@transactional
 def cancel_po(db: Session, *, po_id: int) -> PurchaseOrder:
     """
     Created/Ordered -> Canceled (idempotent).
@@ -243,46 +361,175 @@ def cancel_po(db: Session, *, po_id: int) -> PurchaseOrder:
     # Created veya Ordered ise iptal et
     po.Status_s = "Canceled"
     db.add(po)
-    db.commit()
+    commit_unit(db)
+    on_commit(db, _drop_po_counts)
     db.refresh(po)
     return po
 
 
 # ---- Listeleme servisi ----
-def list_pos(
-    db: Session,
+# =========================
+# Liste (keyset sayfalama)
+# =========================
+# Tarih sıralamasında NULL ETA en sona (artan) gider; imleç karşılaştırması da aynı ifadeyle yapılır
+_ETA_NULL = date(9999, 12, 31)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _po_filters(
     *,
     status_s: Optional[str] = None,
     supplier_id: Optional[int] = None,
     part_id: Optional[int] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
-    skip: int = 0,
-    limit: int = 100,
-    sort: str = "-POID",
-) -> List[PurchaseOrder]:
-    q = db.query(PurchaseOrder)
-
+) -> list:
+    conds = []
     if status_s:
-        q = q.filter(PurchaseOrder.Status_s == status_s)
+        conds.append(PurchaseOrder.Status_s == status_s)
     if supplier_id:
-        q = q.filter(PurchaseOrder.SupplierID == supplier_id)
+        conds.append(PurchaseOrder.SupplierID == supplier_id)
     if part_id:
-        q = q.filter(PurchaseOrder.PartID == part_id)
+        conds.append(PurchaseOrder.PartID == part_id)
     if date_from:
-        q = q.filter(PurchaseOrder.PODate >= date_from)
+        conds.append(PurchaseOrder.PODate >= date_from)
     if date_to:
-        q = q.filter(PurchaseOrder.PODate <= date_to)
+        conds.append(PurchaseOrder.PODate <= date_to)
+    return conds
 
-    order_fields = {
-        "POID": PurchaseOrder.POID,
-        "PODate": PurchaseOrder.PODate,
-        "ETA": PurchaseOrder.ETA,
-    }
-    desc = sort.startswith("-")
-    key = sort[1:] if desc else sort
-    col = order_fields.get(key, PurchaseOrder.POID)
-    q = q.order_by(col.desc() if desc else col.asc())
 
-    return q.offset(max(0, skip)).limit(min(max(1, limit), 500)).all()
+def _sort_spec(sort: str) -> Tuple[str, Any, bool]:
+    """(anahtar adı, sıralama ifadesi, desc). Bilinmeyen anahtar -> POID."""
+    desc_ = sort.startswith("-")
+    key = sort[1:] if desc_ else sort
+    if key == "PODate":
+        return key, PurchaseOrder.PODate, desc_
+    if key == "ETA":
+        return key, func.coalesce(PurchaseOrder.ETA, literal(_ETA_NULL, Date)), desc_
+    return "POID", PurchaseOrder.POID, desc_
+
+
+def encode_cursor(sort_key: str, value, poid: int) -> str:
+    if isinstance(value, date):
+        value = value.isoformat()
+    raw = json.dumps([sort_key, value, int(poid)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> Tuple[Any, int]:
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        key, value, poid = json.loads(base64.urlsafe_b64decode(cursor + pad))
+        if key != sort_key:
+            raise InvalidCursor("cursor farklı bir sıralama için üretilmiş")
+        if key in ("PODate", "ETA"):
+            value = date.fromisoformat(value)
+        return value, int(poid)
+    except InvalidCursor:
+        raise
+    except Exception:
+        raise InvalidCursor("cursor çözülemedi")
+
+
+def _po_columns():
+    # Hafif projeksiyon: Row döner, ORM identity map'e nesne yüklenmez
+    return [c for c in PurchaseOrder.__table__.c]
+
+
+def list_pos_page(
+    db: Session,
+    *,
+    status_s: Optional[str] = None,
+    supplier_id: Optional[int] = None,
+    part_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    sort: str = "-POID",
+) -> Tuple[List[Any], int, Optional[str]]:
+    """
+    (satırlar, toplam, sonraki imleç). cursor verilirse keyset (sıralama anahtarı + POID),
+    verilmezse skip/OFFSET (eski davranış). Toplam aynı sorguda skaler COUNT alt sorgusuyla
+    gelir; imleçli sayfalarda count_cache'ten okunur (yazmalar TAG_PURCHASE_ORDERS ile düşürür).
+    """
+    filters = _po_filters(
+        status_s=status_s, supplier_id=supplier_id, part_id=part_id,
+        date_from=date_from, date_to=date_to,
+    )
+    sort_key, key_expr, desc_ = _sort_spec(sort)
+    limit = min(max(1, limit), 500)
+
+    conds = list(filters)
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_key)
+        if sort_key == "POID":
+            conds.append(PurchaseOrder.POID < last_id if desc_ else PurchaseOrder.POID > last_id)
+        elif desc_:
+            conds.append(or_(key_expr < value, and_(key_expr == value, PurchaseOrder.POID < last_id)))
+        else:
+            conds.append(or_(key_expr > value, and_(key_expr == value, PurchaseOrder.POID > last_id)))
+
+    cache_key = ("po", status_s, supplier_id, part_id, date_from, date_to)
+    total = count_cache.get(cache_key) if cursor else None
+
+    cols = _po_columns()
+    if total is None:
+        # COUNT(*) OVER() imleç koşulundan sonra hesaplanırdı; toplam filtrenin tamamı için
+        # ayrı bir skaler alt sorgu (aynı round trip)
+        cols.append(
+            select(func.count()).select_from(PurchaseOrder).where(*filters)
+            .scalar_subquery().label("Total")
+        )
+    order = [key_expr.desc() if desc_ else key_expr.asc()]
+    if sort_key != "POID":
+        order.append(PurchaseOrder.POID.desc() if desc_ else PurchaseOrder.POID.asc())
+    stmt = select(*cols).where(*conds).order_by(*order)
+    if not cursor and skip:
+        stmt = stmt.offset(max(0, skip))
+    rows = list(db.execute(stmt.limit(limit + 1)).all())
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if total is None:
+        if rows:
+            total = int(rows[0].Total)
+        else:
+            total = int(db.execute(
+                select(func.count()).select_from(PurchaseOrder).where(*filters)
+            ).scalar() or 0)
+        count_cache.set(cache_key, total, tags=(TAG_PURCHASE_ORDERS,))
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        if sort_key == "ETA":
+            value = last.ETA or _ETA_NULL
+        else:
+            value = getattr(last, sort_key)
+        next_cursor = encode_cursor(sort_key, value, last.POID)
+    return rows, total, next_cursor
+
 
+def list_pos(
+    db: Session,
+    *,
+    status_s: Optional[str] = None,
+    supplier_id: Optional[int] = None,
+    part_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    skip: int = 0,
+    limit: int = 100,
+    sort: str = "-POID",
+) -> List[Any]:
+    """Geriye dönük: yalnızca satırlar (OFFSET sayfalama). Yeni kod list_pos_page kullanmalı."""
+    rows, _, _ = list_pos_page(
+        db, status_s=status_s, supplier_id=supplier_id, part_id=part_id,
+        date_from=date_from, date_to=date_to, skip=skip, limit=limit, sort=sort,
+    )
+    return rows
@@ -0,0 +1,150 @@
+# backend/app/services/reconcile_service.py
+"""
+Part.CurrentStock ile defter (ledger) bakiyesinin mutabakatı.
+- Defter bakiyesi = sıcak WarehouseTxn netleri + WarehouseTxnMonthly (arşivlenmiş aylar) netleri
+- Parçalar PartID sırasıyla keyset parçalarında (chunk) işlenir; bellekte yalnızca bir parça + farklar tutulur
+- Her parça kendi kısa read-only transaction'ında okunur: MSSQL'de SNAPSHOT izolasyonu
+  (depo hareketlerini bloklamaz, paylaşımlı kilit almaz); ALLOW_SNAPSHOT_ISOLATION kapalıysa
+  READ COMMITTED'a düşer ve raporda belirtilir
+- Süre bütçesi dolarsa nextCursor döner; aynı imleçle kaldığı yerden devam edilir
+Not: hareketsiz girilmiş açılış stokları da fark olarak raporlanır (defterde karşılığı yoktur).
+"""
+from __future__ import annotations
+import os
+import time
+from typing import List, Optional
+
+from sqlalchemy import case, func, select, union_all
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.dialect import dialect_name
+from app.models import Part, WarehouseTxn, WarehouseTxnMonthly
+
+RECONCILE_CHUNK_SIZE = int(os.getenv("RECONCILE_CHUNK_SIZE", "500"))
+RECONCILE_TIME_BUDGET_SECONDS = float(os.getenv("RECONCILE_TIME_BUDGET_SECONDS", "10"))
+# Raporda tutulacak en fazla fark satırı (sayım her zaman tam)
+RECONCILE_MAX_ITEMS = int(os.getenv("RECONCILE_MAX_ITEMS", "1000"))
+
+# SQL Server: "Snapshot isolation transaction failed ... not allowed" (ALLOW_SNAPSHOT_ISOLATION OFF)
+_SNAPSHOT_NOT_ALLOWED = "3952"
+
+
+def _chunk_stmt(after_id: int, chunk_size: int):
+    """PartID > after_id olan ilk chunk_size parça + aynı aralığın defter bakiyesi (tek sorgu)."""
+    parts = (
+        select(Part.PartID, Part.PartCode, Part.PartName, Part.CurrentStock)
+        .where(Part.PartID > after_id)
+        .order_by(Part.PartID)
+        .limit(chunk_size)
+        .subquery("p")
+    )
+    hi = select(func.max(parts.c.PartID)).scalar_subquery()
+    hot = select(
+        WarehouseTxn.PartID.label("PartID"),
+        case((WarehouseTxn.TxnType == "IN", WarehouseTxn.Quantity), else_=-WarehouseTxn.Quantity).label("Net"),
+    ).where(WarehouseTxn.PartID > after_id, WarehouseTxn.PartID <= hi)
+    archived = select(
+        WarehouseTxnMonthly.PartID.label("PartID"),
+        (WarehouseTxnMonthly.QtyIn - WarehouseTxnMonthly.QtyOut).label("Net"),
+    ).where(WarehouseTxnMonthly.PartID > after_id, WarehouseTxnMonthly.PartID <= hi)
+    u = union_all(hot, archived).subquery("u")
+    ledger = (
+        select(u.c.PartID, func.sum(u.c.Net).label("Ledger"))
+        .group_by(u.c.PartID)
+        .subquery("l")
+    )
+    return (
+        select(
+            parts.c.PartID,
+            parts.c.PartCode,
+            parts.c.PartName,
+            parts.c.CurrentStock,
+            func.coalesce(ledger.c.Ledger, 0).label("Ledger"),
+        )
+        .outerjoin(ledger, ledger.c.PartID == parts.c.PartID)
+        .order_by(parts.c.PartID)
+    )
+
+
+def reconcile_stock(
+    db: Session,
+    *,
+    after_id: int = 0,
+    chunk_size: int = RECONCILE_CHUNK_SIZE,
+    time_budget_s: Optional[float] = RECONCILE_TIME_BUDGET_SECONDS,
+    max_items: int = RECONCILE_MAX_ITEMS,
+) -> dict:
+    """
+    after_id'den sonraki parçaları tarar. Dönüş:
+      scanned, mismatched, items (PartID, PartCode, PartName, CurrentStock, LedgerStock, Diff),
+      nextCursor (bütçe dolduysa; bitti ise None), done, isolation, elapsedMs.
+    Diff = CurrentStock - LedgerStock. Yalnızca okur; düzeltme yapmaz.
+    db yalnızca bağlantı kaynağı olarak kullanılır; okuma ayrı bir bağlantıda yapılır.
+    """
+    chunk_size = max(1, int(chunk_size))
+    started = time.monotonic()
+    isolation = "SNAPSHOT" if dialect_name(db) == "mssql" else None
+
+    items: List[dict] = []
+    scanned = mismatched = chunks = 0
+    cursor = int(after_id or 0)
+    done = False
+
+    conn = db.get_bind().connect()
+    try:
+        if isolation:
+            conn = conn.execution_options(isolation_level=isolation)
+        while True:
+            try:
+                rows = conn.execute(_chunk_stmt(cursor, chunk_size)).all()
+            except DBAPIError as e:
+                if isolation == "SNAPSHOT" and _SNAPSHOT_NOT_ALLOWED in str(e.orig):
+                    conn.rollback()
+                    isolation = "READ COMMITTED"
+                    conn = conn.execution_options(isolation_level=isolation)
+                    continue
+                raise
+            # Parça başına kısa transaction: snapshot sürümleri tutulmasın
+            conn.rollback()
+
+            if not rows:
+                done = True
+                break
+            chunks += 1
+            scanned += len(rows)
+            for r in rows:
+                current = int(r.CurrentStock or 0)
+                ledger = int(r.Ledger or 0)
+                if current != ledger:
+                    mismatched += 1
+                    if len(items) < max_items:
+                        items.append({
+                            "PartID": int(r.PartID),
+                            "PartCode": r.PartCode,
+                            "PartName": r.PartName,
+                            "CurrentStock": current,
+                            "LedgerStock": ledger,
+                            "Diff": current - ledger,
+                        })
+            cursor = int(rows[-1].PartID)
+            if len(rows) < chunk_size:
+                done = True
+                break
+            if time_budget_s is not None and time.monotonic() - started >= time_budget_s:
+                break
+    finally:
+        conn.close()
+
+    return {
+        "afterId": int(after_id or 0),
+        "nextCursor": None if done else cursor,
+        "done": done,
+        "scanned": scanned,
+        "chunks": chunks,
+        "mismatched": mismatched,
+        "itemsTruncated": mismatched > len(items),
+        "isolation": isolation or "default",
+        "elapsedMs": int((time.monotonic() - started) * 1000),
+        "items": items,
+    }
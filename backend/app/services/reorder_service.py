@@ -0,0 +1,143 @@
+# backend/app/services/reorder_service.py
+"""
+Yeniden sipariş (reorder) önerileri — açık siparişler (on-order) netlenerek.
+- OnOrderQty: Created/Ordered PurchaseOrder satırlarının Qty toplamı
+  (IX_PurchaseOrder_Open_PartID filtered indeksinden; parça başına ek sorgu yok)
+- Gap = MinStock - (CurrentStock - ReservedQty + OnOrderQty);  SuggestQty = max(Gap, 0)
+- Liste + toplam sayı tek SQL (COUNT(*) OVER())
+"""
+from __future__ import annotations
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import Session
+
+from app.models import Part, PurchaseOrder
+
+OPEN_PO_STATUSES = ("Created", "Ordered")
+
+SORT_KEYS = ("gap", "-gap", "PartCode", "-PartCode", "PartName", "-PartName", "PartID", "-PartID")
+
+
+def on_order_subquery():
+    """PartID -> OnOrderQty (açık PO'lar)."""
+    return (
+        select(PurchaseOrder.PartID, func.sum(PurchaseOrder.Qty).label("OnOrderQty"))
+        .where(PurchaseOrder.Status_s.in_(OPEN_PO_STATUSES))
+        .group_by(PurchaseOrder.PartID)
+        .subquery("onorder")
+    )
+
+
+def _columns():
+    o = on_order_subquery()
+    cs = func.coalesce(Part.CurrentStock, 0)
+    rq = func.coalesce(Part.ReservedQty, 0)
+    oo = func.coalesce(o.c.OnOrderQty, 0)
+    ms = func.coalesce(Part.MinStock, 0)
+    gap = (ms - (cs - rq + oo)).label("Gap")
+    cols = [
+        Part.PartID, Part.PartCode, Part.PartName, Part.Unit,
+        ms.label("MinStock"), cs.label("CurrentStock"), rq.label("ReservedQty"),
+        oo.label("OnOrderQty"), gap,
+    ]
+    return o, cols, gap
+
+
+def _row_dict(r) -> dict:
+    cur, res, oo = int(r.CurrentStock), int(r.ReservedQty), int(r.OnOrderQty)
+    gap = max(int(r.Gap), 0)
+    return {
+        "PartID": r.PartID,
+        "PartCode": r.PartCode,
+        "PartName": r.PartName,
+        "Unit": r.Unit,
+        "MinStock": int(r.MinStock),
+        "CurrentStock": cur,
+        "ReservedQty": res,
+        "AvailableStock": cur - res,
+        "OnOrderQty": oo,
+        "Gap": gap,
+        "SuggestQty": gap,
+    }
+
+
+def reorder_suggestions(
+    db: Session,
+    *,
+    min_gap: int = 1,
+    skip: int = 0,
+    limit: int = 50,
+    sort: str = "-gap",
+) -> Tuple[List[dict], int]:
+    """(satırlar, toplam) — tek sorgu."""
+    o, cols, gap = _columns()
+    sort_map = {
+        "gap": gap, "-gap": desc(gap),
+        "PartCode": Part.PartCode, "-PartCode": desc(Part.PartCode),
+        "PartName": Part.PartName, "-PartName": desc(Part.PartName),
+        "PartID": Part.PartID, "-PartID": desc(Part.PartID),
+    }
+    order = sort_map.get(sort, desc(gap))
+    stmt = (
+        select(*cols, func.count().over().label("Total"))
+        .outerjoin(o, o.c.PartID == Part.PartID)
+        .where(Part.IsActive == True, gap >= min_gap)  # noqa: E712
+        .order_by(order, Part.PartID)
+        .offset(skip)
+        .limit(limit)
+    )
+    rows = db.execute(stmt).all()
+    total = int(rows[0].Total) if rows else 0
+    if not rows and skip:
+        # Sayfa boşsa toplamı ayrıca say (yalnızca aralık dışı sayfa isteğinde)
+        total = int(db.execute(
+            select(func.count()).select_from(Part).outerjoin(o, o.c.PartID == Part.PartID)
+            .where(Part.IsActive == True, gap >= min_gap)  # noqa: E712
+        ).scalar() or 0)
+    return [_row_dict(r) for r in rows], total
+
+
+def suggestion_for_part(db: Session, part_id: int) -> Optional[dict]:
+    """Tek (aktif) parça için aynı hesap; yoksa None."""
+    o, cols, _ = _columns()
+    r = db.execute(
+        select(*cols)
+        .outerjoin(o, o.c.PartID == Part.PartID)
+        .where(Part.PartID == part_id, Part.IsActive == True)  # noqa: E712
+    ).first()
+    return _row_dict(r) if r else None
+
+
+def suggestions_for_parts(
+    db: Session,
+    *,
+    part_ids: Optional[Iterable[int]] = None,
+    min_gap: int = 1,
+) -> Tuple[List[dict], List[int]]:
+    """
+    Toplu PO için öneriler (sayfasız). part_ids None ise Gap >= min_gap olan tüm aktif parçalar.
+    Dönüş: (Gap >= min_gap satırlar, part_ids içinde bulunamayan/pasif PartID'ler).
+    """
+    o, cols, gap = _columns()
+    stmt = (
+        select(*cols)
+        .outerjoin(o, o.c.PartID == Part.PartID)
+        .where(Part.IsActive == True)  # noqa: E712
+        .order_by(Part.PartID)
+    )
+    wanted = None
+    if part_ids is not None:
+        wanted = sorted({int(p) for p in part_ids})
+        if not wanted:
+            return [], []
+        stmt = stmt.where(Part.PartID.in_(wanted))
+    else:
+        stmt = stmt.where(gap >= min_gap)
+
+    rows = [_row_dict(r) for r in db.execute(stmt).all()]
+    missing: List[int] = []
+    if wanted is not None:
+        found = {r["PartID"] for r in rows}
+        missing = [p for p in wanted if p not in found]
+    return [r for r in rows if r["Gap"] >= min_gap], missing
@@ -0,0 +1,192 @@
+# backend/app/services/reservation_service.py
+"""
+İş emri parça rezervasyonları (yumuşak ayırma).
+- reserve_part: kullanılabilir stok (CurrentStock - ReservedQty) yeterliyse Part.ReservedQty'yi
+  tek koşullu UPDATE ile artırır ve (WorkOrder, Part) aktif satırına miktar ekler
+- release_part: rezervasyonu kısmen/tamamen bırakır
+- consume_reservations: close_workorder içinde aktif rezervasyonları OUT hareketine çevirir
+  (CurrentStock ve ReservedQty birlikte düşer; commit çağıranda)
+Kilit sırası her yolda aynı: WorkOrder -> Part (PartID sırasıyla) -> PartReservation.
+"""
+from __future__ import annotations
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.domain.constants import REASON_WO_RESERVATION
+from app.models import Part, PartReservation, WarehouseTxn, WorkOrder
+from app.core.dialect import for_update
+from app.services.unit_of_work import transactional
+
+
+def lock_workorder(db: Session, workorder_id: int) -> Optional[WorkOrder]:
+    """WorkOrder satırını kilitle ve taze oku (bkz. app.core.dialect.for_update)."""
+    return db.execute(
+        for_update(select(WorkOrder).where(WorkOrder.WorkOrderID == workorder_id))
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+
+
+def _open_workorder(db: Session, workorder_id: int) -> WorkOrder:
+    wo = lock_workorder(db, workorder_id)
+    if not wo:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="WorkOrder bulunamadı.")
+    if wo.ClosedAt is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="WorkOrder kapalı; rezervasyon değiştirilemez.")
+    return wo
+
+
+def _active(db: Session, workorder_id: int, part_id: int) -> Optional[PartReservation]:
+    return db.execute(
+        select(PartReservation).where(
+            PartReservation.WorkOrderID == workorder_id,
+            PartReservation.PartID == part_id,
+            PartReservation.Status_s == "Active",
+        )
+    ).scalar_one_or_none()
+
+
+def list_reservations(db: Session, *, workorder_id: int, include_closed: bool = False) -> List[PartReservation]:
+    if not db.get(WorkOrder, workorder_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="WorkOrder bulunamadı.")
+    q = select(PartReservation).where(PartReservation.WorkOrderID == workorder_id)
+    if not include_closed:
+        q = q.where(PartReservation.Status_s == "Active")
+    return list(db.execute(q.order_by(PartReservation.PartID, PartReservation.ReservationID)).scalars())
+
+
+@transactional
+def reserve_part(db: Session, *, workorder_id: int, part_id: int, qty: int) -> PartReservation:
+    try:
+        if qty is None or qty <= 0:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Qty > 0 olmalı.")
+        _open_workorder(db, workorder_id)
+
+        # Kullanılabilir stok kontrolü + artış tek koşullu UPDATE (okuma-yazma yarışı yok)
+        reserved = db.execute(
+            update(Part)
+            .where(
+                Part.PartID == part_id,
+                Part.IsActive == True,  # noqa: E712
+                Part.CurrentStock - Part.ReservedQty >= qty,
+            )
+            .values(ReservedQty=Part.ReservedQty + qty)
+            .returning(Part.ReservedQty),
+            execution_options={"synchronize_session": False},
+        ).scalar_one_or_none()
+        if reserved is None:
+            row = db.execute(
+                select(Part.CurrentStock, Part.ReservedQty)
+                .where(Part.PartID == part_id, Part.IsActive == True)  # noqa: E712
+            ).first()
+            if row is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parça (Part) bulunamadı.")
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Kullanılabilir stok yetersiz. Kullanılabilir: {int(row.CurrentStock or 0) - int(row.ReservedQty or 0)}, istenen: {qty}",
+            )
+
+        res = _active(db, workorder_id, part_id)
+        if res:
+            res.Qty = int(res.Qty) + int(qty)
+        else:
+            res = PartReservation(WorkOrderID=workorder_id, PartID=part_id, Qty=int(qty),
+                                  Status_s="Active", CreatedAt=datetime.utcnow())
+            db.add(res)
+        db.commit()
+        db.refresh(res)
+        return res
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Aynı parça için eşzamanlı rezervasyon; tekrar deneyin.")
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Beklenmeyen hata: {str(e)}")
+
+
+@transactional
+def release_part(db: Session, *, workorder_id: int, part_id: int, qty: Optional[int] = None) -> PartReservation:
+    """qty None ise aktif rezervasyonun tamamı bırakılır."""
+    try:
+        if qty is not None and qty <= 0:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Qty > 0 olmalı.")
+        _open_workorder(db, workorder_id)
+        res = _active(db, workorder_id, part_id)
+        if not res:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aktif rezervasyon bulunamadı.")
+        n = int(res.Qty) if qty is None else min(int(qty), int(res.Qty))
+
+        db.execute(
+            update(Part)
+            .where(Part.PartID == part_id)
+            .values(ReservedQty=Part.ReservedQty - n),
+            execution_options={"synchronize_session": False},
+        )
+        res.Qty = int(res.Qty) - n
+        if res.Qty == 0:
+            res.Status_s = "Released"
+            res.ClosedAt = datetime.utcnow()
+        db.commit()
+        db.refresh(res)
+        return res
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Beklenmeyen hata: {str(e)}")
+
+
+def consume_reservations(db: Session, *, workorder_id: int, now: datetime) -> List[Tuple[int, int]]:
+    """
+    Aktif rezervasyonları OUT hareketine çevirir (çağıran WorkOrder'ı kilitlemiş olmalı; commit çağıranda).
+    Dönüş: [(PartID, Qty)] — tüketim rollup'ı / önbellek için.
+    """
+    rows = db.execute(
+        select(PartReservation)
+        .where(PartReservation.WorkOrderID == workorder_id, PartReservation.Status_s == "Active")
+        .order_by(PartReservation.PartID)
+    ).scalars().all()
+
+    consumed: List[Tuple[int, int]] = []
+    for res in rows:
+        qty = int(res.Qty)
+        if qty > 0:
+            # Rezerve miktar CurrentStock'tan düşer; koşul yalnızca rezervasyon dışı kayma (drift) için
+            ok = db.execute(
+                update(Part)
+                .where(Part.PartID == res.PartID, Part.CurrentStock >= qty)
+                .values(CurrentStock=Part.CurrentStock - qty, ReservedQty=Part.ReservedQty - qty)
+                .returning(Part.PartID),
+                execution_options={"synchronize_session": False},
+            ).scalar_one_or_none()
+            if ok is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"PartID={res.PartID} için stok rezervasyonu karşılamıyor (istenen: {qty}); stok mutabakatını kontrol edin.",
+                )
+            res.TxnID = db.execute(
+                insert(WarehouseTxn).returning(WarehouseTxn.TxnID),
+                {
+                    "PartID": int(res.PartID),
+                    "TxnType": "OUT",
+                    "Quantity": qty,
+                    "TxnDate": now,
+                    "Reason": REASON_WO_RESERVATION.format(workorder_id),
+                    "WorkOrderID": workorder_id,
+                },
+            ).scalar_one()
+            consumed.append((int(res.PartID), qty))
+        res.Status_s = "Consumed"
+        res.ClosedAt = now
+    return consumed
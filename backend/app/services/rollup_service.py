@@ -0,0 +1,116 @@
+# backend/app/services/rollup_service.py
+"""
+Rapor rollup tabloları (MachineFailureDaily, PartConsumptionDaily).
+- bump_*: yazma yollarında, çağıranın transaction'ı içinde artımlı güncelleme
+  (commit çağırana aittir)
+- rebuild_rollups: ham tablolardan (MaintenanceRequest / WarehouseTxn) yeniden hesap
+"""
+from __future__ import annotations
+from collections import defaultdict
+from datetime import date, datetime, time
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Date, cast, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import report_cache
+from app.core.dialect import RANGELOCK_HINT, dialect_name
+from app.models import MachineFailureDaily, MaintenanceRequest, PartConsumptionDaily, WarehouseTxn
+
+
+def _day_expr(db: Session, col):
+    # SQLite'ta CAST(x AS DATE) sayısal affinity verir; date() kullan
+    if dialect_name(db) == "sqlite":
+        return func.date(col)
+    return cast(col, Date)
+
+
+def bump_counters(db: Session, model, key: dict, incs: Dict[str, int]) -> None:
+    """UPDATE col = col + n (her sayaç için); satır yoksa INSERT (aynı transaction)."""
+    stmt = (
+        update(model)
+        .where(*[getattr(model, k) == v for k, v in key.items()])
+        .values({c: getattr(model, c) + n for c, n in incs.items()})
+    )
+    # MSSQL HOLDLOCK: satır yoksa da anahtar aralığı kilitlenir; eşzamanlı iki INSERT yarışmaz
+    stmt = stmt.with_hint(RANGELOCK_HINT, dialect_name="mssql")
+    res = db.execute(stmt, execution_options={"synchronize_session": False})
+    if res.rowcount == 0:
+        db.execute(insert(model).values(**key, **incs))
+
+
+def bump_machine_failure(db: Session, *, machine_id: int, day: date, n: int = 1) -> None:
+    bump_counters(db, MachineFailureDaily, {"Day": day, "MachineID": int(machine_id)}, {"FailureCount": int(n)})
+
+
+def bump_part_consumption(db: Session, *, part_id: int, day: date, qty: int) -> None:
+    bump_counters(db, PartConsumptionDaily, {"Day": day, "PartID": int(part_id)}, {"QtyOut": int(qty)})
+
+
+def bump_part_consumption_many(db: Session, moves: Iterable[Tuple[int, date, int]]) -> None:
+    """(PartID, Day, Qty) listesi; aynı anahtarlar önce toplanır, PartID sırasıyla yazılır."""
+    totals: Dict[Tuple[date, int], int] = defaultdict(int)
+    for part_id, day, qty in moves:
+        totals[(day, int(part_id))] += int(qty)
+    for (day, part_id), qty in sorted(totals.items(), key=lambda kv: (kv[0][1], kv[0][0])):
+        bump_part_consumption(db, part_id=part_id, day=day, qty=qty)
+
+
+def rebuild_rollups(db: Session, *, start: Optional[date] = None, end: Optional[date] = None) -> dict:
+    """
+    [start, end) aralığındaki rollup satırlarını silip ham tablolardan yeniden üretir
+    (aralık verilmezse tamamı). Tek transaction; backfill ve onarım için.
+    """
+    start_dt = datetime.combine(start, time.min) if start else None
+    end_dt = datetime.combine(end, time.min) if end else None
+
+    def _range(model_day_col, raw_col):
+        conds_rollup, conds_raw = [], []
+        if start:
+            conds_rollup.append(model_day_col >= start)
+            conds_raw.append(raw_col >= start_dt)
+        if end:
+            conds_rollup.append(model_day_col < end)
+            conds_raw.append(raw_col < end_dt)
+        return conds_rollup, conds_raw
+
+    try:
+        # --- Arızalar ---
+        r_conds, m_conds = _range(MachineFailureDaily.Day, MaintenanceRequest.OpenedAt)
+        db.execute(delete(MachineFailureDaily).where(*r_conds))
+        day = _day_expr(db, MaintenanceRequest.OpenedAt)
+        src = (
+            select(day.label("Day"), MaintenanceRequest.MachineID, func.count().label("FailureCount"))
+            .where(*m_conds)
+            .group_by(day, MaintenanceRequest.MachineID)
+        )
+        failures = db.execute(
+            insert(MachineFailureDaily).from_select(["Day", "MachineID", "FailureCount"], src)
+        ).rowcount
+
+        # --- Tüketim (OUT): sıcak + arşiv (arşivlenen günler rollup'tan düşmesin) ---
+        from app.services.archive_service import ledger_union  # döngüsel import'u önle
+
+        r_conds, _ = _range(PartConsumptionDaily.Day, WarehouseTxn.TxnDate)
+        db.execute(delete(PartConsumptionDaily).where(*r_conds))
+
+        def _outs(model):
+            _, conds = _range(PartConsumptionDaily.Day, model.TxnDate)
+            return [model.TxnType == "OUT", *conds]
+
+        ledger = ledger_union(_outs, ("PartID", "Quantity", "TxnDate"))
+        day = _day_expr(db, ledger.c.TxnDate)
+        src = (
+            select(day.label("Day"), ledger.c.PartID, func.sum(ledger.c.Quantity).label("QtyOut"))
+            .group_by(day, ledger.c.PartID)
+        )
+        consumption = db.execute(
+            insert(PartConsumptionDaily).from_select(["Day", "PartID", "QtyOut"], src)
+        ).rowcount
+
+        db.commit()
+        report_cache.clear()
+        return {"machineFailureDaily": failures, "partConsumptionDaily": consumption}
+    except Exception:
+        db.rollback()
+        raise
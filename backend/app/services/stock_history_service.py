@@ -0,0 +1,254 @@
+# backend/app/services/stock_history_service.py
+"""
+Geçmiş tarihli stok (point-in-time) hesapları.
+- build_checkpoints: ay başı PartStockCheckpoint satırları (AsOf öncesi bakiye) üretir;
+  aylık netler WarehouseTxnMonthly (arşiv) + sıcak WarehouseTxn'den, bakiyeler pencere (running) toplamıyla
+- stock_at: tüm parçaların D anındaki stoğu tek SQL'de (son kontrol noktası + [L, D) hareketleri)
+- stock_history: tek parça için hareketler + her satır sonrası bakiye (pencere toplamı)
+
+Değişmez: kontrol noktaları ilk hareket ayından itibaren kesintisiz üretilir. L = D'den önceki
+son kontrol noktası zamanı ise, hiçbir parçanın kendi son kontrol noktası ile L arasında
+hareketi yoktur; bu yüzden tüm parçalar için yalnızca [L, D) (< 1 ay) tekrar oynatılır.
+Not: bakiyeler defterden (ledger) hesaplanır; hareketsiz girilmiş açılış stokları dahil değildir.
+"""
+from __future__ import annotations
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, case, delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models import Part, PartStockCheckpoint, WarehouseTxn, WarehouseTxnMonthly
+from app.services.archive_service import TXN_COLUMNS, ledger_union, month_expr
+
+# Kontrol noktası yoksa alt sınır (tüm defter; yalnızca ilk aydan önceki tarihler için)
+_FLOOR = datetime(1900, 1, 1)
+
+
+def month_start(dt: datetime) -> datetime:
+    return datetime(dt.year, dt.month, 1)
+
+
+def next_month(dt) -> datetime:
+    y, m = (dt.year + 1, 1) if dt.month == 12 else (dt.year, dt.month + 1)
+    return datetime(y, m, 1)
+
+
+def _signed(c):
+    return case((c.TxnType == "IN", c.Quantity), else_=-c.Quantity)
+
+
+def _as_date(v) -> date:
+    if isinstance(v, str):
+        return date.fromisoformat(v[:10])
+    if isinstance(v, datetime):
+        return v.date()
+    return v
+
+
+# =========================
+# Kontrol noktası üretimi
+# =========================
+def build_checkpoints(db: Session, *, until: Optional[datetime] = None, full: bool = False) -> dict:
+    """
+    until (ay başına yuvarlanır; varsayılan: bu ayın başı) öncesindeki tam aylar için kontrol noktası.
+    full=False: yalnızca son kontrol noktasından sonraki aylar eklenir (artımlı).
+    """
+    until = month_start(until or datetime.utcnow())
+    last = db.scalar(select(func.max(PartStockCheckpoint.AsOf)))
+
+    try:
+        base: Dict[int, int] = {}
+        start: Optional[datetime] = None
+        if full or last is None:
+            db.execute(delete(PartStockCheckpoint))
+        else:
+            if last >= until:
+                db.rollback()
+                return {"from": last.isoformat(), "until": until.isoformat(), "checkpoints": 0, "parts": 0}
+            start = last
+            # Parça başına son bakiye (artımlı yürütmede başlangıç)
+            a = (
+                select(PartStockCheckpoint.PartID, func.max(PartStockCheckpoint.AsOf).label("AsOf"))
+                .group_by(PartStockCheckpoint.PartID)
+                .subquery()
+            )
+            base = dict(db.execute(
+                select(PartStockCheckpoint.PartID, PartStockCheckpoint.Balance)
+                .join(a, and_(PartStockCheckpoint.PartID == a.c.PartID, PartStockCheckpoint.AsOf == a.c.AsOf))
+            ).all())
+
+        # Aylık netler: arşivlenmiş aylar özetten, sıcak aylar hareketlerden
+        m_conds = [WarehouseTxnMonthly.Month < until.date()]
+        t_conds = [WarehouseTxn.TxnDate < until]
+        if start is not None:
+            m_conds.append(WarehouseTxnMonthly.Month >= start.date())
+            t_conds.append(WarehouseTxn.TxnDate >= start)
+        hot = select(
+            WarehouseTxn.PartID.label("PartID"),
+            month_expr(db, WarehouseTxn.TxnDate).label("Month"),
+            _signed(WarehouseTxn).label("Net"),
+        ).where(*t_conds)
+        summary = select(
+            WarehouseTxnMonthly.PartID.label("PartID"),
+            WarehouseTxnMonthly.Month.label("Month"),
+            (WarehouseTxnMonthly.QtyIn - WarehouseTxnMonthly.QtyOut).label("Net"),
+        ).where(*m_conds)
+        u = union_all(summary, hot).subquery("u")
+        g = (
+            select(u.c.PartID, u.c.Month, func.sum(u.c.Net).label("Net"))
+            .group_by(u.c.PartID, u.c.Month)
+            .subquery("g")
+        )
+        running = func.sum(g.c.Net).over(partition_by=g.c.PartID, order_by=g.c.Month, rows=(None, 0))
+        rows = db.execute(
+            select(g.c.PartID, g.c.Month, running.label("Running")).order_by(g.c.PartID, g.c.Month)
+        ).all()
+
+        payload = [
+            {
+                "PartID": int(pid),
+                "AsOf": next_month(_as_date(month)),
+                "Balance": int(base.get(int(pid), 0)) + int(run or 0),
+            }
+            for pid, month, run in rows
+        ]
+        for i in range(0, len(payload), 1000):
+            db.execute(insert(PartStockCheckpoint), payload[i:i + 1000])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {
+        "from": start.isoformat() if start else None,
+        "until": until.isoformat(),
+        "checkpoints": len(payload),
+        "parts": len({p["PartID"] for p in payload}),
+    }
+
+
+# =========================
+# Okuma
+# =========================
+def stock_at(db: Session, as_of: datetime, *, include_inactive: bool = False) -> List[dict]:
+    """Tüm (aktif) parçaların as_of (naive UTC, hariç) anındaki stoğu — tek SQL."""
+    cp = PartStockCheckpoint
+    # L: as_of öncesi son kontrol noktası zamanı (global)
+    lower = func.coalesce(
+        select(func.max(cp.AsOf)).where(cp.AsOf <= as_of).scalar_subquery(),
+        literal(_FLOOR),
+    )
+    a = (
+        select(cp.PartID, func.max(cp.AsOf).label("AsOf"))
+        .where(cp.AsOf <= as_of)
+        .group_by(cp.PartID)
+        .subquery("a")
+    )
+    anchor = (
+        select(cp.PartID, cp.Balance)
+        .join(a, and_(cp.PartID == a.c.PartID, cp.AsOf == a.c.AsOf))
+        .subquery("anchor")
+    )
+    ledger = ledger_union(
+        lambda m: [m.TxnDate >= lower, m.TxnDate < as_of],
+        ("PartID", "TxnType", "Quantity"),
+    )
+    delta = (
+        select(ledger.c.PartID, func.sum(_signed(ledger.c)).label("Delta"))
+        .group_by(ledger.c.PartID)
+        .subquery("delta")
+    )
+    stmt = (
+        select(
+            Part.PartID,
+            Part.PartCode,
+            Part.PartName,
+            Part.Unit,
+            Part.CurrentStock,
+            (func.coalesce(anchor.c.Balance, 0) + func.coalesce(delta.c.Delta, 0)).label("StockAt"),
+        )
+        .outerjoin(anchor, anchor.c.PartID == Part.PartID)
+        .outerjoin(delta, delta.c.PartID == Part.PartID)
+        .order_by(Part.PartID)
+    )
+    if not include_inactive:
+        stmt = stmt.where(Part.IsActive == True)  # noqa: E712
+    return [
+        {**r._mapping, "CurrentStock": int(r.CurrentStock or 0), "StockAt": int(r.StockAt or 0)}
+        for r in db.execute(stmt).all()
+    ]
+
+
+def _balance_before(db: Session, part_id: int, at: datetime) -> tuple:
+    """(bakiye, kullanılan kontrol noktası AsOf) — at öncesindeki tüm hareketler."""
+    cp = db.execute(
+        select(PartStockCheckpoint.AsOf, PartStockCheckpoint.Balance)
+        .where(PartStockCheckpoint.PartID == part_id, PartStockCheckpoint.AsOf <= at)
+        .order_by(PartStockCheckpoint.AsOf.desc())
+        .limit(1)
+    ).first()
+    lo = cp.AsOf if cp else _FLOOR
+    ledger = ledger_union(
+        lambda m: [m.PartID == part_id, m.TxnDate >= lo, m.TxnDate < at],
+        ("TxnType", "Quantity"),
+    )
+    delta = db.scalar(select(func.coalesce(func.sum(_signed(ledger.c)), 0)))
+    return (int(cp.Balance) if cp else 0) + int(delta or 0), (cp.AsOf if cp else None)
+
+
+def stock_history(
+    db: Session,
+    *,
+    part_id: int,
+    date_from: datetime,
+    date_to: datetime,
+    limit: int = 500,
+) -> dict:
+    """[date_from, date_to) hareketleri + her hareket sonrası bakiye (açılış + pencere toplamı)."""
+    if not db.get(Part, part_id):
+        raise HTTPException(status_code=404, detail="Part not found")
+    if date_to <= date_from:
+        raise HTTPException(status_code=422, detail="Geçersiz aralık: 'date_to' > 'date_from' olmalı.")
+
+    opening, anchor_as_of = _balance_before(db, part_id, date_from)
+
+    ledger = ledger_union(
+        lambda m: [m.PartID == part_id, m.TxnDate >= date_from, m.TxnDate < date_to],
+        TXN_COLUMNS,
+        archived_flag=True,
+    )
+    running = func.sum(_signed(ledger.c)).over(
+        order_by=(ledger.c.TxnDate, ledger.c.TxnID), rows=(None, 0)
+    )
+    rows = db.execute(
+        select(ledger, (literal(opening) + running).label("BalanceAfter"))
+        .order_by(ledger.c.TxnDate, ledger.c.TxnID)
+        .limit(limit + 1)
+    ).all()
+
+    truncated = len(rows) > limit
+    rows = rows[:limit]
+    items = []
+    for r in rows:
+        d = dict(r._mapping)
+        d["TxnDate"] = d["TxnDate"].isoformat() if d.get("TxnDate") else None
+        d["Archived"] = bool(d.get("Archived"))
+        d["BalanceAfter"] = int(d["BalanceAfter"] or 0)
+        items.append(d)
+
+    closing = None
+    if not truncated:
+        closing = items[-1]["BalanceAfter"] if items else opening
+    return {
+        "PartID": part_id,
+        "From": date_from.isoformat(),
+        "To": date_to.isoformat(),
+        "OpeningBalance": opening,
+        "ClosingBalance": closing,  # truncated ise None (sonraki sayfa için date_from ilerletin)
+        "CheckpointAsOf": anchor_as_of.isoformat() if anchor_as_of else None,
+        "Truncated": truncated,
+        "value": items,
+        "Count": len(items),
+    }
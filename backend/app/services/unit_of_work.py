@@ -0,0 +1,227 @@
+# backend/app/services/unit_of_work.py
+"""
+Transaction birimi (unit of work) + kilitlenme yeniden deneme katmanı.
+
+    @transactional
+    def create_txn(db: Session, *, ...): ...
+
+- Her denemede birimin bağlantısına kilit bekleme süresi verilir (TX_LOCK_TIMEOUT_MS):
+  MSSQL SET LOCK_TIMEOUT, PostgreSQL SET LOCAL lock_timeout, SQLite PRAGMA busy_timeout.
+  MSSQL/SQLite ayarı bağlantı düzeyindedir: bağlantı havuza dönerken (checkin) varsayılana
+  sıfırlanır (bkz. configure_engine); PostgreSQL'de transaction sonunda kendiliğinden düşer
+- Hata zinciri (__cause__ / __context__) taranır; servisler hatayı HTTPException(500) içine
+  sarsa bile asıl DB hatası bulunur:
+    deadlock      : MSSQL 1205, PostgreSQL 40P01
+    lock_timeout  : MSSQL 1222, PostgreSQL 55P03, SQLite "database is locked"
+    serialization : MSSQL 3960 (snapshot update conflict), PostgreSQL 40001
+- Bu hatalarda rollback + jitter'lı üstel bekleme ile birimin TAMAMI tekrar çalışır
+  (fonksiyon kendi içinde commit/rollback yapar; yarım kalan deneme hiçbir şey yazmamış olur)
+- Denemeler tükenirse 503 + Retry-After (500 "Beklenmeyen hata" yerine)
+- İç içe çağrılarda yalnızca en dıştaki birim tekrar dener
+- Servisler commit_unit(db) ile commit eder; on_commit(db, fn) commit sonrası işleri (önbellek
+  düşürme) bağlar. deferred_commit(db) bloğunda servis commit'leri flush olur ve on_commit işleri
+  biriktirilir: dış birim (ör. Idempotency-Key) kendi satırını da yazıp tek commit yapar, işleri
+  ancak bu commit başarılıysa çalıştırır
+- Sayaçlar: tx_stats() (bkz. /__tx-stats)
+"""
+from __future__ import annotations
+import functools
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.dialect import LOCK_TIMEOUT_INFO_KEY, dialect_name
+
+TX_MAX_ATTEMPTS = max(1, int(os.getenv("TX_MAX_ATTEMPTS", "4")))
+TX_RETRY_BASE_MS = int(os.getenv("TX_RETRY_BASE_MS", "25"))
+TX_RETRY_MAX_MS = int(os.getenv("TX_RETRY_MAX_MS", "1000"))
+TX_LOCK_TIMEOUT_MS = int(os.getenv("TX_LOCK_TIMEOUT_MS", "5000"))  # <= 0: sürücü varsayılanı
+TX_RETRY_AFTER_SECONDS = int(os.getenv("TX_RETRY_AFTER_SECONDS", "1"))
+
+_MSSQL_CODES = {"1205": "deadlock", "1222": "lock_timeout", "3960": "serialization"}
+_PG_CODES = {"40P01": "deadlock", "55P03": "lock_timeout", "40001": "serialization"}
+_MSSQL_RE = re.compile(r"\((1205|1222|3960)[),]")  # pyodbc: "... (1205) (SQLExecDirectW)", pymssql: "(1205, b'...')"
+_SQLITE_LOCKED = ("database is locked", "database table is locked")
+
+_DEPTH_KEY = "uow_depth"
+_DEFERRED_KEY = "uow_deferred"  # on_commit işleri (liste); varsa commit dış birime ait
+
+
+# =========================
+# Sınıflandırma
+# =========================
+def _classify_one(exc: BaseException) -> Optional[str]:
+    orig = exc.orig if isinstance(exc, DBAPIError) else exc
+    if orig is None:
+        return None
+    pgcode = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    if pgcode in _PG_CODES:
+        return _PG_CODES[pgcode]
+    msg = str(orig)
+    if isinstance(exc, DBAPIError) or type(orig).__module__.startswith(("pyodbc", "pymssql", "sqlite3")):
+        m = _MSSQL_RE.search(msg)
+        if m:
+            return _MSSQL_CODES[m.group(1)]
+        low = msg.lower()
+        if any(s in low for s in _SQLITE_LOCKED):
+            return "lock_timeout"
+    return None
+
+
+def classify_retryable(exc: BaseException) -> Optional[str]:
+    """Hata zincirinde yeniden denenebilir bir kilit/serileştirme hatası varsa türü; yoksa None."""
+    seen = set()
+    stack = [exc]
+    while stack:
+        e = stack.pop()
+        if e is None or id(e) in seen:
+            continue
+        seen.add(id(e))
+        if not isinstance(e, HTTPException):
+            kind = _classify_one(e)
+            if kind:
+                return kind
+        stack.extend((e.__cause__, e.__context__))
+    return None
+
+
+# =========================
+# Sayaçlar
+# =========================
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _bump(unit: str, **incs: int) -> None:
+    with _stats_lock:
+        s = _stats.setdefault(unit, {
+            "calls": 0, "retries": 0, "exhausted": 0,
+            "deadlock": 0, "lock_timeout": 0, "serialization": 0,
+        })
+        for k, v in incs.items():
+            s[k] = s.get(k, 0) + v
+
+
+def tx_stats() -> dict:
+    with _stats_lock:
+        units = {k: dict(v) for k, v in _stats.items()}
+    return {
+        "maxAttempts": TX_MAX_ATTEMPTS,
+        "lockTimeoutMs": TX_LOCK_TIMEOUT_MS,
+        "units": units,
+    }
+
+
+def reset_tx_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+# =========================
+# Birim
+# =========================
+def _set_lock_timeout(db: Session) -> None:
+    if TX_LOCK_TIMEOUT_MS <= 0:
+        return
+    d = dialect_name(db)
+    ms = int(TX_LOCK_TIMEOUT_MS)
+    if d == "postgresql":
+        db.execute(text(f"SET LOCAL lock_timeout = {ms}"))  # transaction'a özel
+        return
+    sql = {"mssql": f"SET LOCK_TIMEOUT {ms}", "sqlite": f"PRAGMA busy_timeout = {ms}"}.get(d)
+    if sql is None:
+        return
+    db.execute(text(sql))
+    # Bağlantı düzeyinde kalır: havuza dönerken configure_engine varsayılanı geri yükler
+    db.connection().connection.info[LOCK_TIMEOUT_INFO_KEY] = True
+
+
+def commit_unit(db: Session) -> None:
+    """Servis commit'i: deferred_commit bloğu içindeyse yalnızca flush (commit dış birime ait)."""
+    if db.info.get(_DEFERRED_KEY) is not None:
+        db.flush()
+    else:
+        db.commit()
+
+
+def on_commit(db: Session, fn: Callable[[], Any]) -> None:
+    """commit_unit sonrası çağrılır: ertelenmiş birimde gerçek commit'e kadar bekletilir."""
+    pending = db.info.get(_DEFERRED_KEY)
+    if pending is not None:
+        pending.append(fn)
+    else:
+        fn()
+
+
+@contextmanager
+def deferred_commit(db: Session) -> Iterator[List[Callable[[], Any]]]:
+    """
+    Blok içindeki servislerin commit_unit/on_commit çağrılarını dış birime devreder.
+    Dönen liste: gerçek db.commit() başarılı olduktan sonra çalıştırılacak işler.
+    """
+    pending: List[Callable[[], Any]] = []
+    db.info[_DEFERRED_KEY] = pending
+    try:
+        yield pending
+    finally:
+        db.info.pop(_DEFERRED_KEY, None)
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Full jitter: [0, min(max, base * 2^(attempt-1))] ms."""
+    cap = min(TX_RETRY_MAX_MS, TX_RETRY_BASE_MS * (2 ** (attempt - 1)))
+    return random.uniform(0, cap) / 1000.0
+
+
+def transactional(fn: Optional[Callable] = None, *, max_attempts: Optional[int] = None, name: Optional[str] = None):
+    """
+    İlk argümanı Session olan servis fonksiyonlarını sarar: @transactional ya da
+    @transactional(max_attempts=2). Fonksiyon commit/rollback'ini kendisi yapmaya devam eder.
+    """
+    def deco(f: Callable) -> Callable:
+        unit = name or f.__name__
+
+        @functools.wraps(f)
+        def wrapper(db: Session, *args: Any, **kwargs: Any):
+            if db.info.get(_DEPTH_KEY):
+                return f(db, *args, **kwargs)
+
+            attempts = max_attempts or TX_MAX_ATTEMPTS
+            _bump(unit, calls=1)
+            attempt = 0
+            while True:
+                attempt += 1
+                db.info[_DEPTH_KEY] = 1
+                try:
+                    _set_lock_timeout(db)
+                    return f(db, *args, **kwargs)
+                except Exception as e:
+                    kind = classify_retryable(e)
+                    if kind is None:
+                        raise
+                    db.rollback()
+                    _bump(unit, **{kind: 1})
+                    if attempt >= attempts:
+                        _bump(unit, exhausted=1)
+                        raise HTTPException(
+                            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail=f"İşlem eşzamanlı bir işlemle çakıştı ({kind}); lütfen tekrar deneyin.",
+                            headers={"Retry-After": str(TX_RETRY_AFTER_SECONDS)},
+                        ) from e
+                    _bump(unit, retries=1)
+                    time.sleep(_backoff_seconds(attempt))
+                finally:
+                    db.info.pop(_DEPTH_KEY, None)
+
+        return wrapper
+
+    return deco(fn) if fn is not None else deco
@@ -1,14 +1,29 @@
 # backend/app/services/warehouse_service.py
 from __future__ import annotations
-from typing import Optional, List
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
 
 from fastapi import HTTPException, status
-from sqlalchemy import text, func
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
 
 from app.models import WarehouseTxn, Part, WorkOrder
+from app.services.rollup_service import bump_part_consumption, bump_part_consumption_many
+from app.core.cache import report_cache, TAG_CONSUMPTION
+from app.services.archive_service import TXN_COLUMNS, ledger_union
+from app.services.unit_of_work import commit_unit, on_commit, transactional
+from app.core.dialect import for_update
 
+# Hareket motoru: "locking" (UPDLOCK + ORM, varsayılan) | "atomic" (tek koşullu UPDATE)
+TXN_MODE = os.getenv("WAREHOUSE_TXN_MODE", "locking").strip().lower()
 
+
+def _drop_consumption_reports() -> None:
+    report_cache.invalidate_tags(TAG_CONSUMPTION)
+
+
+@transactional
 def create_txn(
     db: Session,
     *,
@@ -17,13 +32,24 @@ def create_txn(
     quantity: int,         # > 0
     reason: str | None = None,
     workorder_id: int | None = None,
+    mode: str | None = None,   # None -> TXN_MODE
 ) -> WarehouseTxn:
     """
     Depo hareketi oluşturur ve Part.CurrentStock'u günceller.
     - IN  -> stok += quantity
     - OUT -> stok -= quantity (yetersiz stokta 409)
-    - Satır kilidi: Part üzerinde UPDLOCK/ROWLOCK (yarışlara karşı)
+    - Satır kilidi: Part üzerinde for_update (MSSQL UPDLOCK/ROWLOCK; yarışlara karşı)
+    - mode="atomic": kilit + ORM okuması yerine tek koşullu UPDATE (bkz. _create_txn_atomic)
     """
+    if (mode or TXN_MODE) == "atomic":
+        return _create_txn_atomic(
+            db,
+            part_id=part_id,
+            txn_type=txn_type,
+            quantity=quantity,
+            reason=reason,
+            workorder_id=workorder_id,
+        )
     try:
         # 1) Girdi doğrulama
         if quantity is None or quantity <= 0:
@@ -37,12 +63,11 @@ def create_txn(
                 detail="TxnType 'IN' | 'OUT' olmalı."
             )
 
-        # 2) Part satırını kilitle (SQL Server için UPDLOCK/ROWLOCK)
-        db.execute(
-            text("SELECT PartID FROM Part WITH (UPDLOCK, ROWLOCK) WHERE PartID = :pid"),
-            {"pid": part_id},
-        )
-        part = db.get(Part, part_id)
+        # 2) Part satırını kilitle ve taze oku (MSSQL UPDLOCK/ROWLOCK, PostgreSQL FOR UPDATE)
+        part = db.execute(
+            for_update(select(Part).where(Part.PartID == part_id))
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
         if not part:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -58,28 +83,35 @@ def create_txn(
                     detail="WorkOrder bulunamadı."
                 )
 
-        # 4) Stok hesapla
+        # 4) Stok hesapla (OUT: iş emri rezervasyonları düşülmüş kullanılabilir stok)
         cur = part.CurrentStock or 0
         if txn_type == "OUT":
-            if cur < quantity:
+            available = cur - (part.ReservedQty or 0)
+            if available < quantity:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
-                    detail=f"Stok yetersiz. Mevcut: {cur}, istenen: {quantity}"
+                    detail=f"Stok yetersiz. Kullanılabilir: {available}, istenen: {quantity}"
                 )
             part.CurrentStock = cur - quantity
         else:  # "IN"
             part.CurrentStock = cur + quantity
 
-        # 5) Hareket kaydı
+        # 5) Hareket kaydı (TxnDate burada set edilir; rollup günü ile aynı olsun)
+        now = datetime.utcnow()
         tx = WarehouseTxn(
             PartID=part.PartID,
             TxnType=txn_type,
             Quantity=quantity,
+            TxnDate=now,
             Reason=reason,
             WorkOrderID=workorder_id,
         )
         db.add(tx)
-        db.commit()
+        if txn_type == "OUT":
+            bump_part_consumption(db, part_id=part.PartID, day=now.date(), qty=quantity)
+        commit_unit(db)
+        if txn_type == "OUT":
+            on_commit(db, _drop_consumption_reports)
         db.refresh(tx)
         return tx
 
@@ -94,26 +126,358 @@ def create_txn(
         )
 
 
+def _create_txn_atomic(
+    db: Session,
+    *,
+    part_id: int,
+    txn_type: str,
+    quantity: int,
+    reason: str | None = None,
+    workorder_id: int | None = None,
+) -> WarehouseTxn:
+    """
+    Kilitsiz (lock-free) yol: stok değişimi tek bir koşullu UPDATE ile yapılır.
+      UPDATE Part SET CurrentStock = CurrentStock - :q
+      OUTPUT/RETURNING CurrentStock
+      WHERE PartID = :p AND CurrentStock - ReservedQty >= :q
+    Etkilenen satır yoksa stok yetersizdir (409) ya da parça yoktur (404).
+    Satır kilidi yalnızca UPDATE ile commit arasında tutulur.
+    """
+    try:
+        if quantity is None or quantity <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Quantity > 0 olmalı."
+            )
+        if txn_type not in ("IN", "OUT"):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="TxnType 'IN' | 'OUT' olmalı."
+            )
+
+        # WorkOrder doğrulaması kilitten ÖNCE (kilit süresini uzatmasın)
+        if workorder_id is not None and not db.get(WorkOrder, workorder_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="WorkOrder bulunamadı."
+            )
+
+        stmt = update(Part).where(Part.PartID == part_id)
+        if txn_type == "OUT":
+            stmt = stmt.where(Part.CurrentStock - Part.ReservedQty >= quantity).values(
+                CurrentStock=Part.CurrentStock - quantity
+            )
+        else:
+            stmt = stmt.values(CurrentStock=Part.CurrentStock + quantity)
+        new_stock = db.execute(
+            stmt.returning(Part.CurrentStock),
+            execution_options={"synchronize_session": False},
+        ).scalar_one_or_none()
+
+        if new_stock is None:
+            # Yalnızca hata yolunda ek okuma: 404 mü 409 mu?
+            row = db.execute(
+                select(Part.CurrentStock, Part.ReservedQty).where(Part.PartID == part_id)
+            ).first()
+            if row is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Parça (Part) bulunamadı."
+                )
+            available = int(row.CurrentStock or 0) - int(row.ReservedQty or 0)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Stok yetersiz. Kullanılabilir: {available}, istenen: {quantity}"
+            )
+
+        now = datetime.utcnow()
+        tx = db.scalars(
+            insert(WarehouseTxn).returning(WarehouseTxn),
+            {
+                "PartID": part_id,
+                "TxnType": txn_type,
+                "Quantity": quantity,
+                "TxnDate": now,
+                "Reason": reason,
+                "WorkOrderID": workorder_id,
+            },
+        ).one()
+        if txn_type == "OUT":
+            bump_part_consumption(db, part_id=part_id, day=now.date(), qty=quantity)
+        # RETURNING ile dolu nesne; commit sonrası expire + refresh turu olmasın
+        db.expunge(tx)
+        commit_unit(db)
+        if txn_type == "OUT":
+            on_commit(db, _drop_consumption_reports)
+        return tx
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Beklenmeyen hata: {str(e)}"
+        )
+
+
+def _lock_parts_ordered(db: Session, part_ids: Sequence[int]) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """
+    Verilen Part satırlarını TEK sorguda, PartID sırasıyla kilitler.
+    Sabit kilit sırası, aynı parçalara dokunan eşzamanlı toplu işlemler
+    arasındaki deadlock'ları önler. Dönen: ({PartID: CurrentStock}, {PartID: ReservedQty})
+    """
+    ids = sorted(set(int(i) for i in part_ids))
+    if not ids:
+        return {}, {}
+    rows = db.execute(
+        for_update(
+            select(Part.PartID, Part.CurrentStock, Part.ReservedQty)
+            .where(Part.PartID.in_(ids))
+            .order_by(Part.PartID)
+        )
+    ).all()
+    return (
+        {int(r.PartID): int(r.CurrentStock or 0) for r in rows},
+        {int(r.PartID): int(r.ReservedQty or 0) for r in rows},
+    )
+
+
+@transactional
+def create_txns_bulk(
+    db: Session,
+    *,
+    moves: Sequence[Mapping[str, Any]],
+    atomic: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Çok sayıda depo hareketini tek transaction'da işler.
+    - moves: {"part_id", "txn_type", "quantity", "reason", "workorder_id"} sözlükleri
+    - Etkilenen Part satırları PartID sırasıyla bir kez kilitlenir
+    - Satırlar verilen sırayla doğrulanır (stok, satır satır ilerleyen bakiyeye göre)
+    - Geçerli satırlar tek executemany ile eklenir; satır bazında sonuç döner
+    - atomic=True: herhangi bir satır hatalıysa hiçbir şey yazılmaz (ilk hata fırlatılır)
+    """
+    try:
+        if not moves:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="En az bir hareket gönderilmeli."
+            )
+
+        # 1) Kilit + referans doğrulamaları (toplam iki sorgu)
+        stock, reserved = _lock_parts_ordered(db, [m["part_id"] for m in moves])
+
+        wo_ids = {int(m["workorder_id"]) for m in moves if m.get("workorder_id") is not None}
+        known_wos = set()
+        if wo_ids:
+            known_wos = set(
+                db.execute(
+                    select(WorkOrder.WorkOrderID).where(WorkOrder.WorkOrderID.in_(sorted(wo_ids)))
+                ).scalars()
+            )
+
+        # 2) Satır satır doğrula (bellekteki bakiye üzerinden)
+        now = datetime.utcnow()
+        results: List[Dict[str, Any]] = []
+        to_insert: List[Dict[str, Any]] = []
+        for i, m in enumerate(moves):
+            part_id = int(m["part_id"])
+            txn_type = m.get("txn_type")
+            quantity = m.get("quantity")
+            workorder_id = m.get("workorder_id")
+
+            error: Optional[tuple] = None
+            if quantity is None or quantity <= 0:
+                error = (status.HTTP_422_UNPROCESSABLE_ENTITY, "Quantity > 0 olmalı.")
+            elif txn_type not in ("IN", "OUT"):
+                error = (status.HTTP_422_UNPROCESSABLE_ENTITY, "TxnType 'IN' | 'OUT' olmalı.")
+            elif part_id not in stock:
+                error = (status.HTTP_404_NOT_FOUND, "Parça (Part) bulunamadı.")
+            elif workorder_id is not None and int(workorder_id) not in known_wos:
+                error = (status.HTTP_404_NOT_FOUND, "WorkOrder bulunamadı.")
+            elif txn_type == "OUT" and stock[part_id] - reserved[part_id] < quantity:
+                error = (
+                    status.HTTP_409_CONFLICT,
+                    f"Stok yetersiz. Kullanılabilir: {stock[part_id] - reserved[part_id]}, istenen: {quantity}",
+                )
+
+            if error is not None:
+                if atomic:
+                    raise HTTPException(status_code=error[0], detail=f"Satır {i}: {error[1]}")
+                results.append({"line": i, "ok": False, "status": error[0], "error": error[1]})
+                continue
+
+            stock[part_id] += quantity if txn_type == "IN" else -quantity
+            to_insert.append({
+                "PartID": part_id,
+                "TxnType": txn_type,
+                "Quantity": int(quantity),
+                "TxnDate": now,
+                "Reason": m.get("reason"),
+                "WorkOrderID": workorder_id,
+            })
+            results.append({
+                "line": i,
+                "ok": True,
+                "PartID": part_id,
+                "TxnType": txn_type,
+                "Quantity": int(quantity),
+                "Reason": m.get("reason"),
+                "WorkOrderID": workorder_id,
+                "CurrentStock": stock[part_id],
+            })
+
+        if not to_insert:
+            db.rollback()
+            return results
+
+        # 3) Hareketler: tek executemany (TxnID'ler parametre sırasıyla döner)
+        txn_ids = db.execute(
+            insert(WarehouseTxn).returning(WarehouseTxn.TxnID, sort_by_parameter_order=True),
+            to_insert,
+        ).scalars().all()
+
+        # 4) Son bakiyeler: parça başına tek UPDATE (executemany)
+        touched = sorted({r["PartID"] for r in to_insert})
+        db.execute(
+            update(Part),
+            [{"PartID": pid, "CurrentStock": stock[pid]} for pid in touched],
+        )
+        outs = [(r["PartID"], now.date(), r["Quantity"]) for r in to_insert if r["TxnType"] == "OUT"]
+        bump_part_consumption_many(db, outs)
+        commit_unit(db)
+        if outs:
+            on_commit(db, _drop_consumption_reports)
+
+        ok_rows = iter(txn_ids)
+        for r in results:
+            if r["ok"]:
+                r["TxnID"] = int(next(ok_rows))
+        return results
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Beklenmeyen hata: {str(e)}"
+        )
+
+
+def _txn_filters(
+    *,
+    part_id: Optional[int] = None,
+    txn_type: Optional[str] = None,
+    q: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    model=WarehouseTxn,   # WarehouseTxn | WarehouseTxnArchive (aynı kolonlar)
+) -> list:
+    conds = []
+    if part_id is not None:
+        conds.append(model.PartID == part_id)
+    if txn_type is not None:
+        conds.append(model.TxnType == txn_type)
+    if q:
+        conds.append(func.lower(model.Reason).like(f"%{q.lower()}%"))
+    if date_from is not None:
+        conds.append(model.TxnDate >= date_from)
+    if date_to is not None:
+        conds.append(model.TxnDate < date_to)
+    # Keyset (cursor) sayfalama: OFFSET yerine TxnID üzerinden index seek
+    if after_id is not None:
+        conds.append(model.TxnID > after_id)
+    if before_id is not None:
+        conds.append(model.TxnID < before_id)
+    return conds
+
+
 def list_txns(
     db: Session,
     *,
     part_id: Optional[int] = None,
     txn_type: Optional[str] = None,   # "IN" | "OUT"
     q: Optional[str] = None,          # Reason içinde arama
-    skip: int = 0,
+    date_from: Optional[datetime] = None,  # TxnDate >= (UTC, dahil)
+    date_to: Optional[datetime] = None,    # TxnDate <  (UTC, hariç)
+    after_id: Optional[int] = None,   # TxnID >  after_id
+    before_id: Optional[int] = None,  # TxnID <  before_id
     limit: int = 100,
     sort: str = "-TxnID",             # "TxnID" | "-TxnID"
-) -> List[WarehouseTxn]:
-    query = db.query(WarehouseTxn)
+    include_archive: bool = False,    # True: WarehouseTxnArchive da okunur (UNION ALL)
+) -> List[Any]:
+    filters = dict(
+        part_id=part_id, txn_type=txn_type, q=q,
+        date_from=date_from, date_to=date_to,
+        after_id=after_id, before_id=before_id,
+    )
+    limit = min(max(1, limit), 500)
+    desc_ = sort.startswith("-")
 
-    if part_id is not None:
-        query = query.filter(WarehouseTxn.PartID == part_id)
-    if txn_type is not None:
-        query = query.filter(WarehouseTxn.TxnType == txn_type)
-    if q:
-        query = query.filter(func.lower(WarehouseTxn.Reason).like(f"%{q.lower()}%"))
+    if include_archive:
+        # Satır (Row) döner; alanlar WarehouseTxn ile aynı + Archived (0/1)
+        src = ledger_union(lambda m: _txn_filters(model=m, **filters), archived_flag=True)
+        stmt = (
+            select(src)
+            .order_by(src.c.TxnID.desc() if desc_ else src.c.TxnID.asc())
+            .limit(limit)
+        )
+        return list(db.execute(stmt).all())
 
     col = WarehouseTxn.TxnID
-    query = query.order_by(col.desc() if sort.startswith("-") else col.asc())
+    stmt = (
+        select(WarehouseTxn)
+        .where(*_txn_filters(**filters))
+        .order_by(col.desc() if desc_ else col.asc())
+        .limit(limit)
+    )
+    return list(db.scalars(stmt).all())
 
-    return query.offset(max(0, skip)).limit(min(max(1, limit), 500)).all()
+
+def iter_txns(
+    db: Session,
+    *,
+    part_id: Optional[int] = None,
+    txn_type: Optional[str] = None,
+    q: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    sort: str = "TxnID",
+    batch_size: int = 1000,
+    include_archive: bool = False,
+) -> Iterator[Mapping[str, Any]]:
+    """
+    Filtreye uyan TÜM hareketleri sunucu taraflı imleçle (stream_results)
+    batch_size'lık parçalar halinde üretir; ORM nesnesi oluşturmaz.
+    Bellek kullanımı sonuç boyutundan bağımsızdır (NDJSON export için).
+    """
+    filters = dict(
+        part_id=part_id, txn_type=txn_type, q=q,
+        date_from=date_from, date_to=date_to,
+        after_id=after_id, before_id=before_id,
+    )
+    if include_archive:
+        src = ledger_union(lambda m: _txn_filters(model=m, **filters), archived_flag=True)
+        col = src.c.TxnID
+        stmt = select(src)
+    else:
+        col = WarehouseTxn.TxnID
+        stmt = (
+            select(*[getattr(WarehouseTxn, c) for c in TXN_COLUMNS])
+            .where(*_txn_filters(**filters))
+        )
+    stmt = (
+        stmt
+        .order_by(col.desc() if sort.startswith("-") else col.asc())
+        .execution_options(yield_per=max(1, batch_size))
+    )
+    for row in db.execute(stmt):
+        yield row._mapping
@@ -0,0 +1,352 @@
+# backend/scripts/bench_endpoints.py
+"""
+Uç (endpoint) benchmark'ı: app.main:app süreç içinde (TestClient) açılır, üretilmiş veri üzerinde
+rapor, parça, PO ve depo uçlarının gecikme yüzdeliklerini (p50/p95/p99) ve satır/sn değerini ölçer.
+Sonuç JSON baseline dosyasına yazılır; --compare ile önceki baseline'a göre gerilemeler işaretlenir
+(gerileme varsa çıkış kodu 1).
+
+- Her ölçek için şablon SQLite veritabanı app.scripts.generate_data ile bir kez üretilir (--data-dir),
+  her koşu şablonun kopyası üzerinde çalışır (yazma uçları baseline'ı kaydırmasın)
+- Her ölçek ayrı süreçte ölçülür (engine DSN'i import anında kurulur)
+- Rapor uçları her istekten önce rapor / toplam önbelleği temizlenerek ölçülür (SQL maliyeti)
+- --dsn: mevcut bir veritabanında (örn. yerel MSSQL bench DB'si) tek koşu; veri üretilmez,
+  yazma uçları o veritabanına gerçekten yazar
+
+Kullanım (backend klasöründen):
+    python -m scripts.bench_endpoints --scales xs,s --out bench_baseline.json
+    python -m scripts.bench_endpoints --scales xs,s --compare bench_baseline.json --threshold 0.25
+    python -m scripts.bench_endpoints --dsn "mssql+pyodbc://...ToraMakinaBench..." --out mssql.json
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+# Ölçekler: generate_data hacimleri (large preset = "l")
+SCALES: Dict[str, dict] = {
+    "xs": dict(machines=20, technicians=5, suppliers=10, parts=500, requests=2_000, txns=20_000),
+    "s": dict(machines=100, technicians=20, suppliers=50, parts=2_000, requests=20_000, txns=200_000),
+    "m": dict(machines=500, technicians=60, suppliers=200, parts=10_000, requests=100_000, txns=1_000_000),
+    "l": dict(machines=2_000, technicians=200, suppliers=500, parts=50_000, requests=500_000, txns=5_000_000),
+}
+BENCH_END = date(2026, 1, 1)  # sabit dönem sonu: aynı seed ile aynı veri, aynı rapor aralıkları
+BENCH_SEED = 42
+DEFAULT_THRESHOLD = 0.20
+# Mutlak gürültü tabanı: bu kadar ms'den küçük farklar gerileme sayılmaz
+DEFAULT_MIN_DELTA_MS = 1.0
+# p95/p99 az örnekte gürültülü; istenirse --metrics p50_ms,p95_ms
+DEFAULT_METRICS = ("p50_ms",)
+
+
+def _pct(values: List[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(p / 100.0 * len(s) + 0.5)) - 1))
+    return s[k]
+
+
+def _rows_of(body) -> int:
+    """Yanıttaki satır sayısı: liste, ok() zarfı ({"data": [...]}) ya da {"value": [...]}."""
+    if isinstance(body, list):
+        return len(body)
+    if isinstance(body, dict):
+        for key in ("data", "value", "items"):
+            if isinstance(body.get(key), list):
+                return len(body[key])
+    return 1
+
+
+def _summary(lat: List[float], rows: int, errors: int) -> dict:
+    total_s = sum(lat) / 1000.0
+    return {
+        "requests": len(lat) + errors,
+        "errors": errors,
+        "p50_ms": round(_pct(lat, 50), 2),
+        "p95_ms": round(_pct(lat, 95), 2),
+        "p99_ms": round(_pct(lat, 99), 2),
+        "mean_ms": round(statistics.fmean(lat), 2) if lat else None,
+        "rows": rows,
+        "rows_per_s": round(rows / total_s, 1) if total_s else None,
+    }
+
+
+# =========================
+# Ölçüm (alt süreç: MSSQL_DSN ayarlı)
+# =========================
+def _measure(iterations: int, warmup: int) -> dict:
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select
+
+    from app.core.cache import count_cache, report_cache
+    from app.core.db import SessionLocal, engine
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.models import AppUser, Part, Supplier, WarehouseTxn
+
+    db = SessionLocal()
+    try:
+        if not db.query(AppUser).filter(AppUser.Username == "bench_admin").first():
+            db.add(AppUser(Username="bench_admin", HashedPassword="-", Role="admin"))
+            db.commit()
+        # Depo/PO uçları için sık kullanılan parçalar ve bir tedarikçi
+        part_ids = db.scalars(select(Part.PartID).order_by(Part.CurrentStock.desc()).limit(20)).all()
+        supplier_id = db.scalar(select(func.min(Supplier.SupplierID)))
+        # Rapor aralıkları verinin son gününe göre (dönem sonu hariç)
+        last = db.scalar(select(func.max(WarehouseTxn.TxnDate)))
+        end = date.fromisoformat(str(last)[:10]) + timedelta(days=1) if last else BENCH_END
+    finally:
+        db.close()
+    if not part_ids or supplier_id is None:
+        raise SystemExit("Veritabanında parça / tedarikçi yok (önce app.scripts.generate_data)")
+
+    h = {"Authorization": f"Bearer {create_access_token('bench_admin', 'admin')}"}
+    period = {"start": (end - timedelta(days=90)).isoformat(), "end": end.isoformat()}
+    as_of = datetime.combine(end, datetime.min.time()).replace(tzinfo=timezone.utc).isoformat()
+    results: Dict[str, dict] = {}
+
+    with TestClient(app) as client:
+        def run(name: str, call: Callable[[int], object], *, nocache: bool = False,
+                setup: Optional[Callable[[int], object]] = None) -> None:
+            lat: List[float] = []
+            rows = errors = 0
+            gc.collect()
+            gc.disable()  # toplayıcı duraklamaları yüzdelikleri oynatmasın
+            try:
+                for i in range(warmup + iterations):
+                    arg = setup(i) if setup else i
+                    if nocache:
+                        report_cache.clear()
+                        count_cache.clear()
+                    t0 = time.perf_counter()
+                    r = call(arg)
+                    ms = (time.perf_counter() - t0) * 1000.0
+                    if i < warmup:
+                        continue
+                    if not (200 <= r.status_code < 300):
+                        errors += 1
+                        continue
+                    lat.append(ms)
+                    rows += _rows_of(r.json())
+            finally:
+                gc.enable()
+            results[name] = _summary(lat, rows, errors)
+            print(f"  {name:<34} p50={results[name]['p50_ms']}ms p95={results[name]['p95_ms']}ms "
+                  f"rows/s={results[name]['rows_per_s']} err={errors}", file=sys.stderr, flush=True)
+
+        def get(path: str, **params):
+            return lambda _i: client.get(path, params=params, headers=h)
+
+        # --- raporlar ---
+        for src in ("rollup", "raw"):
+            run(f"reports.top-failure-machines[{src}]",
+                get("/reports/top-failure-machines", **period, top=20, source=src), nocache=True)
+            run(f"reports.top-consumed-parts[{src}]",
+                get("/reports/top-consumed-parts", **period, top=20, source=src), nocache=True)
+        run("reports.open-workorders-aging[summary]",
+            get("/reports/open-workorders-aging", asOf=as_of, view="summary"), nocache=True)
+        run("reports.open-workorders-aging[items]",
+            get("/reports/open-workorders-aging", asOf=as_of, view="items", limit=100), nocache=True)
+        run("reports.dashboard", get("/reports/dashboard", **period, top=10, asOf=as_of), nocache=True)
+
+        # --- parçalar ---
+        run("parts.below-min", get("/parts/below-min", limit=100))
+        run("parts.reorder-suggestion", get("/parts/reorder-suggestion", limit=100))
+
+        # --- PO listesi ---
+        run("purchase-orders.list", get("/purchase-orders/", limit=50), nocache=True)
+        first = client.get("/purchase-orders/", params={"limit": 50}, headers=h)
+        cursor = first.headers.get("X-Next-Cursor")
+        if cursor:
+            run("purchase-orders.list[cursor]", get("/purchase-orders/", limit=50, cursor=cursor))
+        run("purchase-orders.list[status=Ordered]", get("/purchase-orders/", limit=50, status="Ordered"),
+            nocache=True)
+
+        # --- yazma uçları (IN sonra OUT: stok değişmez) ---
+        def move(kind: str):
+            return lambda i: client.post(f"/warehouse/{kind}", headers=h,
+                                         json={"PartID": part_ids[i % len(part_ids)], "Quantity": 1})
+
+        run("warehouse.in", move("in"))
+        run("warehouse.out", move("out"))
+
+        # receive_po: her tur için ölçüm dışında Ordered PO hazırlanır
+        def new_ordered_po(i: int) -> int:
+            po = client.post("/purchase-orders", headers=h, json={
+                "SupplierID": supplier_id, "PartID": part_ids[i % len(part_ids)], "Qty": 1, "UnitPrice": "1.00",
+            }).json()
+            client.post(f"/purchase-orders/{po['POID']}/place", headers=h)
+            return po["POID"]
+
+        run("purchase-orders.receive", lambda poid: client.post(f"/purchase-orders/{poid}/receive", headers=h),
+            setup=new_ordered_po)
+
+    return {"dialect": engine.dialect.name, "end": end.isoformat(), "cases": results}
+
+
+# =========================
+# Ölçek hazırlığı / koşu (üst süreç)
+# =========================
+def _sqlite_dsn(path: str) -> str:
+    return "sqlite:///" + os.path.abspath(path).replace("\\", "/")
+
+
+def _remove_db(path: str) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _child_env(dsn: str) -> dict:
+    env = {**os.environ, "MSSQL_DSN": dsn, "PYTHONIOENCODING": "utf-8"}
+    env.setdefault("PWD_POOL_WORKERS", "0")  # login ölçülmüyor; süreç havuzu açılmasın
+    return env
+
+
+def _prepare_scale(scale: str, data_dir: str, seed: int, rebuild: bool) -> str:
+    """Şablon veritabanı (yoksa üretilir) -> koşu kopyası; koşu kopyasının yolunu döndürür."""
+    os.makedirs(data_dir, exist_ok=True)
+    template = os.path.join(data_dir, f"bench_{scale}_seed{seed}.db")
+    if rebuild or not os.path.exists(template):
+        _remove_db(template)
+        env = _child_env(_sqlite_dsn(template))
+        print(f"[{scale}] veri üretiliyor: {SCALES[scale]}", file=sys.stderr, flush=True)
+        subprocess.run([sys.executable, "-m", "app.scripts.create_schema"], env=env, check=True)
+        args = [f"--{k}={v}" for k, v in SCALES[scale].items()]
+        subprocess.run([sys.executable, "-m", "app.scripts.generate_data", *args, f"--seed={seed}",
+                        f"--end={BENCH_END.isoformat()}"], env=env, check=True)
+    run_db = os.path.join(data_dir, f"bench_{scale}.run.db")
+    _remove_db(run_db)
+    for suffix in ("", "-wal"):
+        if os.path.exists(template + suffix):
+            shutil.copyfile(template + suffix, run_db + suffix)
+    return run_db
+
+
+def _run_child(dsn: str, iterations: int, warmup: int) -> dict:
+    # Sonuç dosya ile döner: uygulama import sırasında stdout'a yazıyor
+    fd, path = tempfile.mkstemp(prefix="bench-", suffix=".json")
+    os.close(fd)
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "scripts.bench_endpoints", f"--child={path}",
+             f"--iterations={iterations}", f"--warmup={warmup}"],
+            env=_child_env(dsn), check=True, stdout=subprocess.DEVNULL,
+        )
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(path)
+
+
+# =========================
+# Karşılaştırma
+# =========================
+def compare(base: dict, new: dict, *, threshold: float = DEFAULT_THRESHOLD,
+            min_delta_ms: float = DEFAULT_MIN_DELTA_MS, metrics=DEFAULT_METRICS) -> List[dict]:
+    """new ile base'te ortak olan (ölçek, uç, metrik) üçlüleri; regression: yüzde VE mutlak eşik aşıldı."""
+    out = []
+    for scale, res in new.get("results", {}).items():
+        base_cases = base.get("results", {}).get(scale, {}).get("cases", {})
+        for name, cur in res.get("cases", {}).items():
+            old = base_cases.get(name)
+            if not old:
+                continue
+            for metric in metrics:
+                a, b = old.get(metric), cur.get(metric)
+                if not a or b is None or a != a or b != b:  # None / 0 / NaN
+                    continue
+                ratio = b / a - 1.0
+                out.append({
+                    "scale": scale, "case": name, "metric": metric, "base": a, "new": b,
+                    "change": round(ratio, 3),
+                    "regression": ratio > threshold and (b - a) > min_delta_ms,
+                })
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Uç gecikme / satır hızı benchmark'ı (baseline + karşılaştırma)")
+    ap.add_argument("--scales", default="xs,s", help=f"virgüllü: {', '.join(SCALES)}")
+    ap.add_argument("--dsn", default=None, help="mevcut veritabanı (veri üretilmez; --scales yok sayılır)")
+    ap.add_argument("--data-dir", default="bench_data", help="şablon / koşu SQLite dosyaları")
+    ap.add_argument("--rebuild", action="store_true", help="şablon veritabanlarını yeniden üret")
+    ap.add_argument("--seed", type=int, default=BENCH_SEED)
+    ap.add_argument("--iterations", type=int, default=50, help="uç başına ölçülen istek")
+    ap.add_argument("--warmup", type=int, default=3)
+    ap.add_argument("--out", default=None, help="sonuç (baseline) JSON dosyası")
+    ap.add_argument("--compare", default=None, help="karşılaştırılacak baseline JSON")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="gerileme eşiği (0.2 = %%20)")
+    ap.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    ap.add_argument("--metrics", default=",".join(DEFAULT_METRICS), help="karşılaştırılan: p50_ms,p95_ms,p99_ms,mean_ms")
+    ap.add_argument("--child", default=None, help=argparse.SUPPRESS)  # alt süreç: sonuç JSON yolu
+    args = ap.parse_args()
+
+    if args.child:
+        res = _measure(args.iterations, args.warmup)
+        with open(args.child, "w", encoding="utf-8") as f:
+            json.dump(res, f, ensure_ascii=False)
+        return
+
+    results: Dict[str, dict] = {}
+    if args.dsn:
+        print("[dsn] ölçülüyor", file=sys.stderr, flush=True)
+        results["dsn"] = _run_child(args.dsn, args.iterations, args.warmup)
+    else:
+        scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+        unknown = [s for s in scales if s not in SCALES]
+        if unknown:
+            raise SystemExit(f"Bilinmeyen ölçek: {unknown} (izinli: {', '.join(SCALES)})")
+        for scale in scales:
+            run_db = _prepare_scale(scale, args.data_dir, args.seed, args.rebuild)
+            print(f"[{scale}] ölçülüyor", file=sys.stderr, flush=True)
+            results[scale] = {"volumes": SCALES[scale], **_run_child(_sqlite_dsn(run_db), args.iterations,
+                                                                        args.warmup)}
+
+    doc = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(doc, f, ensure_ascii=False, indent=2)
+        print(f"Baseline yazıldı: {args.out}", file=sys.stderr)
+
+    if not args.compare:
+        if not args.out:
+            print(json.dumps(doc, ensure_ascii=False, indent=2))
+        return
+    with open(args.compare, encoding="utf-8") as f:
+        base = json.load(f)
+    rows = compare(base, doc, threshold=args.threshold, min_delta_ms=args.min_delta_ms,
+                   metrics=[m.strip() for m in args.metrics.split(",") if m.strip()])
+    for r in rows:
+        flag = "GERİLEME" if r["regression"] else ""
+        print(f"{r['scale']:<4} {r['case']:<38} {r['metric']:<7} {r['base']:>9} -> {r['new']:>9} "
+              f"({r['change']:+.0%}) {flag}")
+    regressions = [r for r in rows if r["regression"]]
+    print(f"{len(rows)} karşılaştırma, {len(regressions)} gerileme (eşik {args.threshold:.0%}, "
+          f"en az {args.min_delta_ms}ms)")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# backend/scripts/bench_login_storm.py
+"""
+Vardiya değişimi giriş fırtınası benchmark'ı.
+Çalışan bir API'ye (uvicorn) eşzamanlı /auth/login istekleri atarken aynı anda
+senkron bir uca (varsayılan /db-ping) sabit hızda istek atar; iki grubun
+gecikme yüzdeliklerini (p50/p95/p99) ve 503 (geri basınç) sayısını raporlar.
+
+Kullanım (backend klasöründen, API ayakta iken):
+    python scripts/bench_login_storm.py --base http://127.0.0.1:8011 --logins 150 --concurrency 50
+"""
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+
+def _request(url: str, data: bytes | None = None, headers: dict | None = None) -> Tuple[int, float]:
+    req = urllib.request.Request(url, data=data, headers=headers or {})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0
+    return status, (time.perf_counter() - t0) * 1000.0
+
+
+def _pct(values: List[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(p / 100.0 * len(s) + 0.5)) - 1))
+    return s[k]
+
+
+def _summary(name: str, rows: List[Tuple[int, float]]) -> dict:
+    lat = [ms for st, ms in rows if 200 <= st < 300]
+    return {
+        "name": name,
+        "requests": len(rows),
+        "ok": len(lat),
+        "rejected503": sum(1 for st, _ in rows if st == 503),
+        "errors": sum(1 for st, _ in rows if not (200 <= st < 300) and st != 503),
+        "p50_ms": round(_pct(lat, 50), 1),
+        "p95_ms": round(_pct(lat, 95), 1),
+        "p99_ms": round(_pct(lat, 99), 1),
+        "mean_ms": round(statistics.fmean(lat), 1) if lat else None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Login fırtınası altında login / diğer uç gecikmeleri")
+    ap.add_argument("--base", default="http://127.0.0.1:8011")
+    ap.add_argument("--user", default="bench_operator")
+    ap.add_argument("--password", default="bench-secret")
+    ap.add_argument("--logins", type=int, default=150, help="toplam login isteği")
+    ap.add_argument("--concurrency", type=int, default=50, help="eşzamanlı login")
+    ap.add_argument("--probe", default="/db-ping", help="fırtına sırasında ölçülecek uç")
+    ap.add_argument("--probe-rps", type=float, default=20.0)
+    ap.add_argument("--json", action="store_true", help="sonucu JSON yaz")
+    args = ap.parse_args()
+    base = args.base.rstrip("/")
+
+    # Kullanıcı yoksa oluştur (varsa 400 döner; sorun değil)
+    _request(
+        f"{base}/auth/register",
+        data=json.dumps({"username": args.user, "password": args.password, "role": "operator"}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    form = urllib.parse.urlencode({"username": args.user, "password": args.password}).encode()
+    form_headers = {"Content-Type": "application/x-www-form-urlencoded"}
+
+    # Isınma
+    _request(f"{base}/auth/login", data=form, headers=form_headers)
+    _request(f"{base}{args.probe}")
+
+    probe_rows: List[Tuple[int, float]] = []
+    stop = threading.Event()
+
+    def _probe_loop():
+        interval = 1.0 / max(0.1, args.probe_rps)
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            probe_rows.append(_request(f"{base}{args.probe}"))
+            stop.wait(max(0.0, interval - (time.perf_counter() - t0)))
+
+    prober = threading.Thread(target=_probe_loop, daemon=True)
+    prober.start()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as ex:
+        login_rows = list(ex.map(
+            lambda _: _request(f"{base}/auth/login", data=form, headers=form_headers),
+            range(args.logins),
+        ))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    prober.join()
+
+    result = {
+        "elapsedSeconds": round(elapsed, 2),
+        "login": _summary("login", login_rows),
+        "probe": _summary(args.probe, probe_rows),
+    }
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    print(f"Süre: {result['elapsedSeconds']} sn")
+    for key in ("login", "probe"):
+        r = result[key]
+        print(
+            f"{r['name']:<16} n={r['requests']:<5} ok={r['ok']:<5} 503={r['rejected503']:<4} err={r['errors']:<4} "
+            f"p50={r['p50_ms']}ms p95={r['p95_ms']}ms p99={r['p99_ms']}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
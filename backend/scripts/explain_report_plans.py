@@ -0,0 +1,136 @@
+# backend/scripts/explain_report_plans.py
+"""
+Rapor sorgularının yürütme planlarını yazdırır (indeks migration'ı öncesi/sonrası karşılaştırma).
+- Sorgular routers/reports.py yardımcıları gerçekten çalıştırılarak yakalanır (aynı SQL + parametre)
+- MSSQL: SET SHOWPLAN_TEXT ON ile tahmini plan; SQLite: EXPLAIN QUERY PLAN
+
+Kullanım (backend klasöründen):
+    python -m scripts.explain_report_plans --out plans_before.txt
+    alembic upgrade head
+    python -m scripts.explain_report_plans --out plans_after.txt
+"""
+from __future__ import annotations
+import argparse
+import re
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.db import engine
+from app.routers.reports import (
+    _aging_items_sql,
+    _aging_summary_sql,
+    _top_consumed_raw,
+    _top_consumed_rollup,
+    _top_failures_raw,
+    _top_failures_rollup,
+)
+from app.services.warehouse_service import list_txns
+
+_INDEX_RE = re.compile(r"\[((?:IX|UX|PK|NCCI)_[^\]]+)\]|USING (?:COVERING )?INDEX (\w+)")
+
+
+@contextmanager
+def _capture():
+    captured: List[Tuple[str, object]] = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+def _last_select(fn: Callable[[Session], object]) -> Optional[Tuple[str, object]]:
+    with Session(engine) as db:
+        with _capture() as captured:
+            fn(db)
+    selects = [c for c in captured if c[0].lstrip().upper().startswith(("SELECT", "WITH"))]
+    return selects[-1] if selects else None
+
+
+def _plan(statement: str, parameters) -> List[str]:
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        if engine.dialect.name == "mssql":
+            cur.execute("SET SHOWPLAN_TEXT ON")
+            try:
+                cur.execute(statement, parameters)
+                lines: List[str] = []
+                while True:
+                    if cur.description:
+                        lines += [str(r[0]).rstrip() for r in cur.fetchall()]
+                    if not cur.nextset():
+                        break
+            finally:
+                cur.execute("SET SHOWPLAN_TEXT OFF")
+            # İlk satır sorgunun kendisi; planı bırak
+            return [l for l in lines if l.lstrip().startswith("|")] or lines
+        cur.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [str(r[-1]) for r in cur.fetchall()]
+    finally:
+        raw.close()
+
+
+def _verdict(lines: List[str]) -> str:
+    text_ = "\n".join(lines)
+    indexes = sorted({a or b for a, b in _INDEX_RE.findall(text_)})
+    if engine.dialect.name == "mssql":
+        scans = sum(1 for l in lines if "Scan(" in l)
+        seeks = sum(1 for l in lines if "Seek(" in l)
+    else:
+        scans = sum(1 for l in lines if l.startswith("SCAN") and "USING" not in l)
+        seeks = sum(1 for l in lines if l.startswith("SEARCH") or "USING" in l)
+    return f"seek={seeks} scan={scans} indexes={', '.join(indexes) or '-'}"
+
+
+def main():
+    today = datetime.now(timezone.utc).date()
+    ap = argparse.ArgumentParser(description="Rapor sorgusu planları")
+    ap.add_argument("--start", type=date.fromisoformat, default=today - timedelta(days=30))
+    ap.add_argument("--end", type=date.fromisoformat, default=today + timedelta(days=1))
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--part-id", type=int, default=1, help="hareket listesi sorgusu için PartID")
+    ap.add_argument("--out", help="çıktıyı ayrıca dosyaya yaz")
+    args = ap.parse_args()
+
+    as_of = datetime.now(timezone.utc).replace(tzinfo=None)
+    s, e, t = args.start, args.end, args.top
+    queries = [
+        ("top-failure-machines (raw)", lambda db: _top_failures_raw(db, s, e, t)),
+        ("top-failure-machines (rollup)", lambda db: _top_failures_rollup(db, s, e, t)),
+        ("top-consumed-parts (raw)", lambda db: _top_consumed_raw(db, s, e, t)),
+        ("top-consumed-parts (rollup)", lambda db: _top_consumed_rollup(db, s, e, t)),
+        ("open-workorders-aging (summary)", lambda db: _aging_summary_sql(db, as_of)),
+        ("open-workorders-aging (items)", lambda db: _aging_items_sql(db, as_of, before_id=None, limit=100)),
+        ("warehouse/txns?part_id", lambda db: list_txns(db, part_id=args.part_id, limit=100)),
+    ]
+
+    out: List[str] = [f"# dialect={engine.dialect.name} start={s} end={e} top={t}"]
+    for name, fn in queries:
+        captured = _last_select(fn)
+        out.append("")
+        out.append(f"== {name}")
+        if not captured:
+            out.append("   (SELECT yakalanamadı)")
+            continue
+        lines = _plan(*captured)
+        out.append(f"   {_verdict(lines)}")
+        out += [f"   {l}" for l in lines]
+
+    report = "\n".join(out)
+    print(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 ﻿# backend/scripts/seed_demo.py
 from datetime import datetime, timezone
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import text
+from sqlalchemy import select
 from app.core.db import engine
-from app.models import Machine, Part, MaintenanceRequest, WorkOrder, WarehouseTxn
+from app.domain.constants import REASON_PO_RECEIVE
+from app.models import Machine, Part, MaintenanceRequest, Technician, WorkOrder, WarehouseTxn
 
 SessionLocal = sessionmaker(bind=engine)
 
@@ -20,16 +21,17 @@ def get_or_create(session, model, defaults=None, **kwargs):
     return inst, True
 
 def pick_technician_id(session) -> int:
-    """dbo.Technician tablosundan mevcut bir TechnicianID al.
-       KayÄ±t yoksa anlaÅŸÄ±lÄ±r bir hata vererek seed'i durdur."""
+    """Technician tablosundan mevcut bir TechnicianID al.
+       Kayıt yoksa anlaşılır bir hata vererek seed'i durdur.
+       .limit(1): MSSQL'de TOP 1, SQLite/PostgreSQL'de LIMIT 1 olarak derlenir."""
     tech_id = session.execute(
-        text("SELECT TOP 1 TechnicianID FROM dbo.Technician ORDER BY TechnicianID ASC")
+        select(Technician.TechnicianID).order_by(Technician.TechnicianID.asc()).limit(1)
     ).scalar()
     if tech_id is None:
         raise RuntimeError(
-            "Technician tablosunda kayÄ±t bulunamadÄ±. "
-            "LÃ¼tfen Ã¶nce dbo.Technician'a en az bir teknisyen ekleyin (Ã¶r. TechnicianID=1), "
-            "veya seed_demo.py iÃ§inde Technician ekleme mantÄ±ÄŸÄ±nÄ± ÅŸemanÄ±za gÃ¶re geniÅŸletin."
+            "Technician tablosunda kayıt bulunamadı. "
+            "Lütfen önce Technician tablosuna en az bir teknisyen ekleyin (ör. TechnicianID=1), "
+            "veya seed_demo.py içinde Technician ekleme mantığını şemanıza göre genişletin."
         )
     return int(tech_id)
 
@@ -39,14 +41,14 @@ def seed():
         tech_id = pick_technician_id(session)
 
         # === Machines (Code zorunlu) ===
-        m1, _ = get_or_create(session, Machine, defaults={"Name": "Pres HattÄ±"},   Code="PRES")
-        m2, _ = get_or_create(session, Machine, defaults={"Name": "Kesim HattÄ±"},  Code="KESIM")
-        m3, _ = get_or_create(session, Machine, defaults={"Name": "Montaj HattÄ±"}, Code="MONTAJ")
+        m1, _ = get_or_create(session, Machine, defaults={"Name": "Pres Hattı"},   Code="PRES")
+        m2, _ = get_or_create(session, Machine, defaults={"Name": "Kesim Hattı"},  Code="KESIM")
+        m3, _ = get_or_create(session, Machine, defaults={"Name": "Montaj Hattı"}, Code="MONTAJ")
 
         # === Parts (PartCode & Unit ver) ===
         p1, _ = get_or_create(session, Part, PartCode="RUL",   defaults={"PartName": "Rulman", "Unit": "Adet"})
-        p2, _ = get_or_create(session, Part, PartCode="KAYIS", defaults={"PartName": "KayÄ±ÅŸ",  "Unit": "Adet"})
-        p3, _ = get_or_create(session, Part, PartCode="CIV",   defaults={"PartName": "CÄ±vata", "Unit": "Adet"})
+        p2, _ = get_or_create(session, Part, PartCode="KAYIS", defaults={"PartName": "Kayış",  "Unit": "Adet"})
+        p3, _ = get_or_create(session, Part, PartCode="CIV",   defaults={"PartName": "Cıvata", "Unit": "Adet"})
 
         # === Maintenance Requests ===
         mr1 = get_or_create(session, MaintenanceRequest, MachineID=m1.MachineID, OpenedAt=datetime(2025, 2, 10, 9, tzinfo=timezone.utc))[0]
@@ -60,9 +62,9 @@ def seed():
         wo1 = get_or_create(session, WorkOrder, RequestID=mr1.RequestID,
                             defaults={"TechnicianID": tech_id, "OpenedAt": mr1.OpenedAt, "ClosedAt": datetime(2025, 2, 12, 17, tzinfo=timezone.utc)})[0]
         wo2 = get_or_create(session, WorkOrder, RequestID=mr2.RequestID,
-                            defaults={"TechnicianID": tech_id, "OpenedAt": mr2.OpenedAt})[0]  # aÃ§Ä±k
+                            defaults={"TechnicianID": tech_id, "OpenedAt": mr2.OpenedAt})[0]  # açık
         wo3 = get_or_create(session, WorkOrder, RequestID=mr3.RequestID,
-                            defaults={"TechnicianID": tech_id, "OpenedAt": mr3.OpenedAt})[0]  # aÃ§Ä±k
+                            defaults={"TechnicianID": tech_id, "OpenedAt": mr3.OpenedAt})[0]  # açık
         wo4 = get_or_create(session, WorkOrder, RequestID=mr4.RequestID,
                             defaults={"TechnicianID": tech_id, "OpenedAt": mr4.OpenedAt, "ClosedAt": datetime(2025, 3, 16, 16, tzinfo=timezone.utc)})[0]
         wo5 = get_or_create(session, WorkOrder, RequestID=mr5.RequestID,
@@ -84,7 +86,7 @@ def seed():
             get_or_create(session, WarehouseTxn, **t)
 
         session.commit()
-        print("Seed tamamlandÄ±. TechnicianID =", tech_id)
+        print("Seed tamamlandı. TechnicianID =", tech_id)
     except Exception as e:
         session.rollback()
         print("Seed hata:", e)
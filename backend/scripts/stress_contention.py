@@ -0,0 +1,324 @@
+# backend/scripts/stress_contention.py
+"""
+Kilit yarışı (contention) stres testi: create_txn ve receive_po'nun satır kilitleri
+(MSSQL UPDLOCK/ROWLOCK + HOLDLOCK; SQLite BEGIN IMMEDIATE) gerçek eşzamanlılıkta doğru mu?
+
+- Tek "sıcak" parçaya N eşzamanlı OUT (stoktan fazla istek: bir kısmı 409 olmalı)
+- Aynı sıcak parçanın Ordered PO'larına, PO başına K eşzamanlı receive (yalnızca biri geçmeli)
+- İki yük karışık ve aynı anda; P süreç x T thread (her işlem kendi Session'ı ile)
+- Rapor: işlem/sn, p50/p95/p99 gecikme (yeniden denemeler dahil), sonuç dağılımı (ok/409/503),
+  @transactional yeniden denemeleri (deadlock / lock_timeout / serialization; bkz. tx_stats),
+  kilitli okuma süresi (for_update sorgularının bekleme dahil süresi; MSSQL'de ayrıca LCK_M_* bekleme farkı)
+- Sonda doğrulama (başarısızsa çıkış kodu 1):
+  Part.CurrentStock == defter (IN - OUT), stok >= 0, başarılı OUT sayısı == OUT hareketi,
+  her PO tam bir kez Received ve tek POID'li IN hareketi
+
+Kullanılan DSN .env / MSSQL_DSN'dir; testin kendi parça / tedarikçi / PO kayıtları oluşturulur
+(mevcut veriye dokunulmaz, kayıtlar silinmez).
+
+Kullanım (backend klasöründen):
+    MSSQL_DSN=sqlite:///./bench.db python -m app.scripts.create_schema
+    MSSQL_DSN=sqlite:///./bench.db python -m scripts.stress_contention --threads 16 --outs 500 --stock 300
+    python -m scripts.stress_contention --processes 4 --threads 8 --pos 50 --receivers 8 --mode atomic
+"""
+from __future__ import annotations
+import argparse
+import json
+import multiprocessing as mp
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+
+def _pct(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, int(round(p / 100.0 * len(s) + 0.5)) - 1))
+    return round(s[k], 2)
+
+
+# =========================
+# Kilitli okuma süreleri
+# =========================
+class _LockTimer:
+    """for_update() ile işaretli sorguların (kilit bekleme dahil) süresini toplar."""
+
+    def __init__(self, engine):
+        from app.core.dialect import ROW_LOCK_OPTION
+
+        self.samples: List[float] = []
+        self._local = threading.local()
+        self._guard = threading.Lock()
+
+        # before_execute, cursor olaylarından önce gelir: SQLite'taki BEGIN IMMEDIATE
+        # (configure_engine, before_cursor_execute) beklemesi de ölçüme girer
+        @event.listens_for(engine, "before_execute")
+        def _before(conn, clauseelement, multiparams, params, execution_options):
+            opts = getattr(clauseelement, "_execution_options", None) or {}
+            if execution_options.get(ROW_LOCK_OPTION) or opts.get(ROW_LOCK_OPTION):
+                self._local.t0 = time.perf_counter()
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            t0 = getattr(self._local, "t0", None)
+            if t0 is not None:
+                self._local.t0 = None
+                with self._guard:
+                    self.samples.append((time.perf_counter() - t0) * 1000.0)
+
+
+def _mssql_lock_waits(engine) -> Optional[Tuple[int, int]]:
+    """MSSQL LCK_M_* bekleme (adet, ms) — VIEW SERVER STATE gerekir; yoksa / başka lehçede None."""
+    from sqlalchemy import text
+
+    from app.core.dialect import dialect_name
+
+    if dialect_name(engine) != "mssql":
+        return None
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(text(
+                "SELECT SUM(waiting_tasks_count), SUM(wait_time_ms) FROM sys.dm_os_wait_stats "
+                "WHERE wait_type LIKE 'LCK_M_%'"
+            )).one()
+        return int(row[0] or 0), int(row[1] or 0)
+    except Exception:
+        return None
+
+
+# =========================
+# İşçi (her süreçte)
+# =========================
+def _worker(tasks: List[Tuple[str, int]], threads: int, mode: Optional[str], start_at: float) -> dict:
+    from fastapi import HTTPException
+
+    from app.core.db import SessionLocal, engine
+    from app.services.purchase_service import receive_po
+    from app.services.unit_of_work import reset_tx_stats, tx_stats
+    from app.services.warehouse_service import create_txn
+
+    timer = _LockTimer(engine)
+    reset_tx_stats()
+
+    def run(task: Tuple[str, int]) -> Tuple[str, str, float]:
+        kind, target = task
+        db = SessionLocal()
+        t0 = time.perf_counter()
+        try:
+            if kind == "out":
+                create_txn(db, part_id=target, txn_type="OUT", quantity=1, reason="Stress", mode=mode)
+            else:
+                receive_po(db, po_id=target)
+            outcome = "ok"
+        except HTTPException as e:
+            outcome = str(e.status_code)
+        except Exception as e:  # beklenmeyen: raporda görünsün
+            outcome = type(e).__name__
+        finally:
+            db.close()
+        return kind, outcome, (time.perf_counter() - t0) * 1000.0
+
+    time.sleep(max(0.0, start_at - time.time()))  # süreçler aynı anda başlasın
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        results = list(ex.map(run, tasks))
+    return {
+        "results": results,
+        "finishedAt": time.time(),
+        "lockMs": timer.samples,
+        "tx": tx_stats()["units"],
+    }
+
+
+# =========================
+# Hazırlık / doğrulama (ana süreç)
+# =========================
+def _setup(stock: int, n_pos: int, po_qty: int) -> Tuple[int, List[int]]:
+    from app.core.db import SessionLocal
+    from app.models import Part, PurchaseOrder, Supplier
+    from app.services.warehouse_service import create_txn
+
+    tag = time.strftime("%Y%m%d%H%M%S") + f"-{random.randrange(10**4):04d}"
+    db = SessionLocal()
+    try:
+        part = Part(PartCode=f"STRESS-{tag}", PartName="Stres testi parçası", Unit="adet", MinStock=0,
+                    CurrentStock=0)
+        supplier = Supplier(SupplierName=f"Stres Tedarikçi {tag}")
+        db.add_all([part, supplier])
+        db.commit()
+        if stock:
+            # Açılış stoğu defterden: CurrentStock == IN - OUT baştan sağlanır
+            create_txn(db, part_id=part.PartID, txn_type="IN", quantity=stock, reason="Stress opening")
+        pos = [PurchaseOrder(SupplierID=supplier.SupplierID, PartID=part.PartID, Qty=po_qty, UnitPrice=1,
+                             Status_s="Ordered") for _ in range(n_pos)]
+        db.add_all(pos)
+        db.commit()
+        return part.PartID, [po.POID for po in pos]
+    finally:
+        db.close()
+
+
+def _verify(part_id: int, po_ids: List[int], stock: int, outs_ok: int, recv_ok: int, po_qty: int) -> List[str]:
+    from sqlalchemy import case, func, select
+
+    from app.core.db import SessionLocal
+    from app.models import Part, PurchaseOrder, WarehouseTxn
+
+    db = SessionLocal()
+    try:
+        current = db.scalar(select(Part.CurrentStock).where(Part.PartID == part_id))
+        ledger = db.scalar(
+            select(func.coalesce(func.sum(case((WarehouseTxn.TxnType == "IN", WarehouseTxn.Quantity),
+                                               else_=-WarehouseTxn.Quantity)), 0))
+            .where(WarehouseTxn.PartID == part_id)
+        )
+        out_txns = db.scalar(select(func.count()).where(WarehouseTxn.PartID == part_id,
+                                                        WarehouseTxn.TxnType == "OUT"))
+        per_po = dict(db.execute(
+            select(WarehouseTxn.POID, func.count()).where(WarehouseTxn.POID.in_(po_ids))
+            .group_by(WarehouseTxn.POID)
+        ).all()) if po_ids else {}
+        statuses = dict(db.execute(
+            select(PurchaseOrder.POID, PurchaseOrder.Status_s).where(PurchaseOrder.POID.in_(po_ids))
+        ).all()) if po_ids else {}
+    finally:
+        db.close()
+
+    failures = []
+    if current != ledger:
+        failures.append(f"CurrentStock={current} != defter={ledger}")
+    if current < 0:
+        failures.append(f"CurrentStock eksi: {current}")
+    if out_txns != outs_ok:
+        failures.append(f"başarılı OUT={outs_ok} != OUT hareketi={out_txns}")
+    expected = stock + recv_ok * po_qty - outs_ok
+    if current != expected:
+        failures.append(f"CurrentStock={current} != açılış + receive - OUT = {expected}")
+    multi = {poid: n for poid, n in per_po.items() if n != 1}
+    missing = [poid for poid in po_ids if poid not in per_po]
+    if multi:
+        failures.append(f"birden fazla receive hareketi: {multi}")
+    if missing:
+        failures.append(f"receive hareketi olmayan PO: {missing[:10]}")
+    not_received = [poid for poid, st in statuses.items() if st != "Received"]
+    if not_received:
+        failures.append(f"Received olmayan PO: {not_received[:10]}")
+    if recv_ok != len(po_ids):
+        failures.append(f"başarılı receive={recv_ok} != PO sayısı={len(po_ids)}")
+    return failures
+
+
+def _summarize(kind: str, rows: List[Tuple[str, str, float]], wall_s: float) -> dict:
+    lat = [ms for k, _, ms in rows if k == kind]
+    outcomes: Dict[str, int] = {}
+    for k, outcome, _ in rows:
+        if k == kind:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return {
+        "ops": len(lat),
+        "outcomes": outcomes,
+        "opsPerSec": round(len(lat) / wall_s, 1) if wall_s else None,
+        "p50_ms": _pct(lat, 50),
+        "p95_ms": _pct(lat, 95),
+        "p99_ms": _pct(lat, 99),
+        "max_ms": round(max(lat), 2) if lat else None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="create_txn / receive_po kilit yarışı stres testi")
+    ap.add_argument("--processes", type=int, default=1, help="süreç sayısı (her biri kendi bağlantı havuzu)")
+    ap.add_argument("--threads", type=int, default=16, help="süreç başına eşzamanlı thread")
+    ap.add_argument("--outs", type=int, default=500, help="sıcak parçaya toplam OUT (1'er adet; stok + receive'dan fazlası 409)")
+    ap.add_argument("--stock", type=int, default=300, help="sıcak parçanın açılış stoğu")
+    ap.add_argument("--pos", type=int, default=20, help="aynı parçaya Ordered PO sayısı")
+    ap.add_argument("--receivers", type=int, default=8, help="PO başına eşzamanlı receive")
+    ap.add_argument("--po-qty", type=int, default=5)
+    ap.add_argument("--mode", choices=("locking", "atomic"), default=None, help="create_txn modu (varsayılan: WAREHOUSE_TXN_MODE)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", action="store_true", help="sonucu JSON yaz")
+    args = ap.parse_args()
+
+    from app.core.db import engine
+
+    part_id, po_ids = _setup(args.stock, args.pos, args.po_qty)
+    tasks = [("out", part_id)] * args.outs + [("recv", poid) for poid in po_ids for _ in range(args.receivers)]
+    random.Random(args.seed).shuffle(tasks)
+    chunks = [tasks[i::args.processes] for i in range(args.processes)]
+
+    waits_before = _mssql_lock_waits(engine)
+    if args.processes == 1:
+        start_at = time.time()
+        outs = [_worker(chunks[0], args.threads, args.mode, start_at)]
+    else:
+        ctx = mp.get_context("spawn")
+        start_at = time.time() + 3.0  # süreçlerin import süresi
+        with ctx.Pool(args.processes) as pool:
+            outs = pool.starmap(_worker, [(c, args.threads, args.mode, start_at) for c in chunks])
+    wall_s = max(o["finishedAt"] for o in outs) - start_at
+    waits_after = _mssql_lock_waits(engine)
+
+    rows = [r for o in outs for r in o["results"]]
+    lock_ms = [ms for o in outs for ms in o["lockMs"]]
+    tx: Dict[str, Dict[str, int]] = {}
+    for o in outs:
+        for unit, counters in o["tx"].items():
+            agg = tx.setdefault(unit, {})
+            for k, v in counters.items():
+                agg[k] = agg.get(k, 0) + v
+
+    outs_ok = sum(1 for k, o, _ in rows if k == "out" and o == "ok")
+    recv_ok = sum(1 for k, o, _ in rows if k == "recv" and o == "ok")
+    failures = _verify(part_id, po_ids, args.stock, outs_ok, recv_ok, args.po_qty)
+
+    result = {
+        "dialect": engine.dialect.name,
+        "partId": part_id,
+        "processes": args.processes,
+        "threads": args.threads,
+        "mode": args.mode or "default",
+        "elapsedSeconds": round(wall_s, 2),
+        "opsPerSec": round(len(rows) / wall_s, 1) if wall_s else None,
+        "out": _summarize("out", rows, wall_s),
+        "receive": _summarize("recv", rows, wall_s),
+        "lockedReads": {
+            "count": len(lock_ms),
+            "totalMs": round(sum(lock_ms), 1),
+            "p50_ms": _pct(lock_ms, 50),
+            "p99_ms": _pct(lock_ms, 99),
+        },
+        "mssqlLockWaits": (
+            {"count": waits_after[0] - waits_before[0], "ms": waits_after[1] - waits_before[1]}
+            if waits_before and waits_after else None
+        ),
+        "retries": tx,
+        "failures": failures,
+    }
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(f"{result['dialect']}: {args.processes} süreç x {args.threads} thread, {len(rows)} işlem, "
+              f"{result['elapsedSeconds']} sn, {result['opsPerSec']} işlem/sn")
+        for key in ("out", "receive"):
+            r = result[key]
+            print(f"  {key:<8} n={r['ops']:<5} {r['outcomes']} {r['opsPerSec']}/sn "
+                  f"p50={r['p50_ms']}ms p95={r['p95_ms']}ms p99={r['p99_ms']}ms max={r['max_ms']}ms")
+        lr = result["lockedReads"]
+        print(f"  kilitli okuma: n={lr['count']} toplam={lr['totalMs']}ms p50={lr['p50_ms']}ms p99={lr['p99_ms']}ms"
+              + (f" | LCK_M_* bekleme: {result['mssqlLockWaits']}" if result["mssqlLockWaits"] else ""))
+        for unit, c in sorted(tx.items()):
+            print(f"  {unit:<14} calls={c.get('calls', 0)} retries={c.get('retries', 0)} "
+                  f"deadlock={c.get('deadlock', 0)} lock_timeout={c.get('lock_timeout', 0)} "
+                  f"serialization={c.get('serialization', 0)} exhausted={c.get('exhausted', 0)}")
+        print("Doğrulama: " + ("OK" if not failures else "HATA\n  - " + "\n  - ".join(failures)))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# backend/tests/conftest.py
+"""
+Testler geçici, dosya tabanlı bir SQLite veritabanında çalışır (SQL Server gerekmez).
+Başka bir veritabanı için: TEST_DATABASE_URL=... (tablolar her testte silinip yeniden kurulur!)
+DSN, uygulama import edilmeden önce ayarlanmalı; .env'deki MSSQL_DSN'in üzerine yazılır.
+"""
+import os
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="toram-tests-")
+os.environ["MSSQL_DSN"] = os.getenv("TEST_DATABASE_URL") or "sqlite:///" + os.path.join(_TMP_DIR, "test.db")
+os.environ.setdefault("PWD_POOL_WORKERS", "0")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.cache import count_cache, report_cache
+from app.core.db import Base, SessionLocal, engine
+from app.core.security import create_access_token, principal_cache
+from app.main import app
+from app.models import AppUser
+
+
+@pytest.fixture(autouse=True)
+def _schema():
+    """Her test boş şema ile başlar; süreç içi önbellekler de temizlenir."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    for c in (report_cache, count_cache, principal_cache):
+        c.clear()
+    yield
+
+
+@pytest.fixture
+def db():
+    s = SessionLocal()
+    try:
+        yield s
+    finally:
+        s.close()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def auth_headers(db):
+    """auth_headers("store") -> Authorization başlığı (kullanıcı yoksa oluşturulur)."""
+    def _make(role: str = "admin") -> dict:
+        username = f"test-{role}"
+        if not db.query(AppUser).filter(AppUser.Username == username).first():
+            db.add(AppUser(Username=username, HashedPassword="-", Role=role))
+            db.commit()
+        return {"Authorization": f"Bearer {create_access_token(username, role)}"}
+    return _make
@@ -0,0 +1,184 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core.db import SessionLocal
+from app.models import Machine, Part, Supplier, Technician, WarehouseTxn
+from app.services.warehouse_service import create_txn
+
+
+def _seed(db, *, stock=10, min_stock=0):
+    db.add(Supplier(SupplierName="Tedarikçi"))
+    db.add(Part(PartCode="RUL", PartName="Rulman", Unit="Adet", MinStock=min_stock, CurrentStock=stock))
+    db.commit()
+
+
+def test_warehouse_in_out_updates_stock(client, db, auth_headers):
+    _seed(db, stock=5)
+    h = auth_headers("store")
+
+    r = client.post("/warehouse/in", json={"PartID": 1, "Quantity": 3}, headers=h)
+    assert r.status_code == 200 and r.json()["ok"] is True
+    r = client.post("/warehouse/out", json={"PartID": 1, "Quantity": 6}, headers=h)
+    assert r.status_code == 200
+
+    r = client.post("/warehouse/out", json={"PartID": 1, "Quantity": 3}, headers=h)
+    assert r.status_code == 409
+
+    db.expire_all()
+    assert db.get(Part, 1).CurrentStock == 2
+    # TxnDate server/uygulama default'u SQLite'ta da dolu
+    assert all(t.TxnDate is not None for t in db.query(WarehouseTxn).all())
+
+
+def test_purchase_order_lifecycle(client, db, auth_headers):
+    _seed(db, stock=0)
+    h = auth_headers("store")
+
+    r = client.post("/purchase-orders", json={"SupplierID": 1, "PartID": 1, "Qty": 4, "UnitPrice": "2.50"}, headers=h)
+    assert r.status_code == 201
+    po = r.json()
+    assert po["PODate"]  # utctoday() server default
+
+    assert client.post(f"/purchase-orders/{po['POID']}/place", headers=h).json()["Status_s"] == "Ordered"
+    assert client.post(f"/purchase-orders/{po['POID']}/receive", headers=h).json()["Status_s"] == "Received"
+    assert client.post(f"/purchase-orders/{po['POID']}/receive", headers=h).status_code == 409
+
+    db.expire_all()
+    assert db.get(Part, 1).CurrentStock == 4
+
+
+def test_purchase_orders_require_role(client, db, auth_headers):
+    _seed(db)
+    body = {"SupplierID": 1, "PartID": 1, "Qty": 1, "UnitPrice": 1}
+    assert client.post("/purchase-orders", json=body).status_code == 401
+    assert client.post("/purchase-orders", json=body, headers=auth_headers("viewer")).status_code == 403
+
+
+def test_purchase_order_list_cursor(client, db, auth_headers):
+    _seed(db)
+    h = auth_headers("store")
+    for _ in range(5):
+        client.post("/purchase-orders", json={"SupplierID": 1, "PartID": 1, "Qty": 1, "UnitPrice": 1}, headers=h)
+
+    seen, cursor = [], None
+    while True:
+        r = client.get("/purchase-orders/", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert r.headers["X-Total-Count"] == "5"
+        seen += [po["POID"] for po in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [5, 4, 3, 2, 1]
+
+
+def test_reorder_suggestion_nets_open_orders(client, db, auth_headers):
+    _seed(db, stock=2, min_stock=10)
+    h = auth_headers("store")
+
+    r = client.get("/parts/reorder-suggestion", headers=h).json()
+    assert r["value"][0]["SuggestQty"] == 8
+
+    r = client.post("/purchase-orders/from-suggestions:bulk", json={"SupplierID": 1, "UnitPrice": 1}, headers=h)
+    assert r.status_code == 201
+    assert r.json()["Count"] == 1
+
+    r = client.get("/parts/reorder-suggestion", headers=h).json()
+    assert r["Count"] == 0
+
+
+
+def test_concurrent_bulk_from_suggestions_creates_no_duplicate_pos(db):
+    from app.models import PurchaseOrder
+    from app.services.purchase_service import create_pos_from_suggestions
+
+    _seed(db, stock=2, min_stock=10)
+
+    def run(i):
+        s = SessionLocal()
+        try:
+            items = [{"PartID": 1}] if i % 2 else None
+            return create_pos_from_suggestions(s, supplier_id=1, unit_price=1, items=items)["Count"]
+        finally:
+            s.close()
+
+    with ThreadPoolExecutor(6) as ex:
+        created = sum(ex.map(run, range(12)))
+
+    assert created == 1
+    assert [po.Qty for po in db.query(PurchaseOrder)] == [8]
+
+def test_reservation_blocks_issue_and_is_consumed_on_close(client, db, auth_headers):
+    _seed(db, stock=5)
+    db.add(Machine(Code="PRES", Name="Pres"))
+    db.add(Technician(Name="Teknisyen"))
+    db.commit()
+    h = auth_headers("tech")
+
+    req = client.post("/requests", json={"MachineID": 1}).json()
+    wo = client.post("/workorders", json={"RequestID": req["RequestID"], "TechnicianID": 1}).json()
+    r = client.post(f"/workorders/{wo['WorkOrderID']}/reservations", json={"PartID": 1, "Qty": 4}, headers=h)
+    assert r.status_code == 201
+
+    # Kullanılabilir stok 1: rezerve edilmiş parça başka yere çıkamaz
+    r = client.post("/warehouse/out", json={"PartID": 1, "Quantity": 2}, headers=auth_headers("store"))
+    assert r.status_code == 409
+
+    assert client.post(f"/workorders/{wo['WorkOrderID']}/close").status_code == 200
+    db.expire_all()
+    part = db.get(Part, 1)
+    assert (part.CurrentStock, part.ReservedQty) == (1, 0)
+
+
+def test_concurrent_issues_do_not_lose_updates(db):
+    # SQLite'ta for_update() -> BEGIN IMMEDIATE; eşzamanlı OUT'lar aynı stoğu okuyamaz
+    _seed(db, stock=20)
+
+    def issue(_):
+        s = SessionLocal()
+        done = 0
+        try:
+            for _ in range(5):
+                try:
+                    create_txn(s, part_id=1, txn_type="OUT", quantity=1, mode="locking")
+                    done += 1
+                except HTTPException as e:
+                    assert e.status_code == 409
+        finally:
+            s.close()
+        return done
+
+    with ThreadPoolExecutor(6) as ex:
+        issued = sum(ex.map(issue, range(6)))
+
+    db.expire_all()
+    assert issued == 20
+    assert db.get(Part, 1).CurrentStock == 0
+    assert db.query(WarehouseTxn).count() == 20
+
+
+def test_pwd_pool_stats_require_admin(client, db, auth_headers):
+    assert client.get("/__pwd-pool").status_code == 401
+    assert client.get("/__pwd-pool", headers=auth_headers("store")).status_code == 403
+    r = client.get("/__pwd-pool", headers=auth_headers("admin"))
+    assert r.status_code == 200 and "workers" in r.json()
+
+
+def test_tx_stats_require_admin(client, db, auth_headers):
+    assert client.get("/__tx-stats").status_code == 401
+    assert client.get("/__tx-stats", headers=auth_headers("store")).status_code == 403
+    assert client.get("/__tx-stats", headers=auth_headers("admin")).status_code == 200
+
+
+def test_purchase_order_total_count_cache_dropped_on_create(client, db, auth_headers):
+    _seed(db)
+    h = auth_headers("store")
+    body = {"SupplierID": 1, "PartID": 1, "Qty": 1, "UnitPrice": 1}
+    for _ in range(3):
+        client.post("/purchase-orders", json=body, headers=h)
+
+    cursor = client.get("/purchase-orders/", params={"limit": 2}).headers["X-Next-Cursor"]
+    assert client.get("/purchase-orders/", params={"limit": 2, "cursor": cursor}).headers["X-Total-Count"] == "3"
+    client.post("/purchase-orders", json=body, headers=h)
+    # İmleçli sayfada toplam önbellekten gelir; yeni PO önbelleği düşürmüş olmalı
+    assert client.get("/purchase-orders/", params={"limit": 2, "cursor": cursor}).headers["X-Total-Count"] == "4"
@@ -0,0 +1,104 @@
+import random
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from app.models import Part, WarehouseTxn, WarehouseTxnArchive, WarehouseTxnMonthly
+from app.services.archive_service import archive_cutoff, archive_txns
+from app.services.reconcile_service import reconcile_stock
+from app.services.stock_history_service import stock_at
+
+CUTOFF = datetime(2025, 4, 1)
+
+
+def _seed(db, *, parts=3, txns=250, seed=11):
+    rnd = random.Random(seed)
+    db.add_all([
+        Part(PartCode=f"P{i}", PartName=f"Parça {i}", Unit="Adet", MinStock=0, CurrentStock=0)
+        for i in range(1, parts + 1)
+    ])
+    db.flush()
+    stock = Counter()
+    for _ in range(txns):
+        part_id = rnd.randint(1, parts)
+        txn_type = rnd.choice(("IN", "IN", "OUT"))
+        qty = rnd.randint(1, 20)
+        when = datetime(2025, 1, 1) + timedelta(minutes=rnd.randrange(0, 180 * 24 * 60))
+        db.add(WarehouseTxn(PartID=part_id, TxnType=txn_type, Quantity=qty, TxnDate=when))
+        stock[part_id] += qty if txn_type == "IN" else -qty
+    for part_id, qty in stock.items():
+        db.get(Part, part_id).CurrentStock = qty
+    db.commit()
+
+
+def _monthly_totals(rows):
+    """(PartID, ay başı) -> (QtyIn, QtyOut, adet)"""
+    out = {}
+    for part_id, txn_type, qty, when in rows:
+        key = (part_id, date(when.year, when.month, 1))
+        q_in, q_out, n = out.get(key, (0, 0, 0))
+        out[key] = (q_in + (qty if txn_type == "IN" else 0), q_out + (qty if txn_type == "OUT" else 0), n + 1)
+    return out
+
+
+def test_archive_rows_and_monthly_summary_preserve_totals(db):
+    _seed(db)
+    cols = (WarehouseTxn.PartID, WarehouseTxn.TxnType, WarehouseTxn.Quantity, WarehouseTxn.TxnDate)
+    before = db.query(*cols).all()
+    old = [r for r in before if r.TxnDate < CUTOFF]
+    stock_before = {r["PartID"]: r["StockAt"] for r in stock_at(db, datetime(2026, 1, 1))}
+
+    res = archive_txns(db, cutoff=CUTOFF, chunk_size=17)  # birden çok chunk
+    assert res["moved"] == len(old) and res["chunks"] > 1
+    assert res["months"] == ["2025-01-01", "2025-02-01", "2025-03-01"]
+
+    # Sıcak + arşiv = arşiv öncesi; arşivdekiler tam olarak ufuk öncesi satırlar
+    hot = db.query(*cols).all()
+    archived = db.query(WarehouseTxnArchive.PartID, WarehouseTxnArchive.TxnType,
+                        WarehouseTxnArchive.Quantity, WarehouseTxnArchive.TxnDate).all()
+    assert all(r.TxnDate >= CUTOFF for r in hot)
+    assert sorted(map(tuple, hot + archived)) == sorted(map(tuple, before))
+
+    monthly = {
+        (m.PartID, m.Month): (m.QtyIn, m.QtyOut, m.TxnCount) for m in db.query(WarehouseTxnMonthly)
+    }
+    assert monthly == _monthly_totals(old)
+
+    # Okuma yolları arşiv sonrası aynı sonucu verir
+    assert {r["PartID"]: r["StockAt"] for r in stock_at(db, datetime(2026, 1, 1))} == stock_before
+    diffs = reconcile_stock(db)
+    assert diffs["done"] and diffs["items"] == []
+
+    # Tekrar çalıştırma: taşınacak satır kalmadı, özet iki kez sayılmaz
+    assert archive_txns(db, cutoff=CUTOFF)["moved"] == 0
+    assert {(m.PartID, m.Month): (m.QtyIn, m.QtyOut, m.TxnCount) for m in db.query(WarehouseTxnMonthly)} == monthly
+
+
+def test_archive_cutoff_aligns_to_month_start():
+    assert archive_cutoff(24, today=date(2026, 10, 18)) == datetime(2024, 10, 1)
+    assert archive_cutoff(0, today=date(2026, 1, 31)) == datetime(2026, 1, 1)
+
+
+def test_archive_dry_run_writes_nothing(db):
+    _seed(db, txns=40)
+    n = db.query(WarehouseTxn).filter(WarehouseTxn.TxnDate < CUTOFF).count()
+    res = archive_txns(db, cutoff=CUTOFF, dry_run=True)
+    assert res["dryRun"] and res["eligible"] == n
+    assert db.query(WarehouseTxnArchive).count() == 0
+
+
+def test_columnstore_hint_only_on_wide_ranges(db, monkeypatch):
+    from sqlalchemy.dialects import mssql
+
+    from app.core import columnstore
+    from app.services.archive_service import ledger_union
+
+    monkeypatch.setattr(columnstore, "columnstore_available", lambda db: True)
+
+    def _sql(span_days):
+        ledger = ledger_union(lambda m: [m.TxnType == "OUT"], ("PartID", "Quantity"),
+                              analytics_db=db, span_days=span_days)
+        return str(ledger.select().compile(dialect=mssql.dialect()))
+
+    assert columnstore.NCCI_NAME in _sql(columnstore.COLUMNSTORE_MIN_DAYS)
+    assert columnstore.NCCI_NAME not in _sql(7)
+    assert columnstore.NCCI_NAME not in _sql(None)
@@ -0,0 +1,55 @@
+from app.core import hashing
+from app.core.security import principal_cache
+
+
+def test_principal_cache_hit_and_invalidation_on_role_change(client, db, auth_headers):
+    store = auth_headers("store")
+    admin = auth_headers("admin")
+
+    assert client.get("/warehouse/_ping", headers=store).status_code == 200
+    hits = principal_cache.stats()["hits"]
+    assert client.get("/warehouse/_ping", headers=store).status_code == 200
+    assert principal_cache.stats()["hits"] == hits + 1  # ikinci istek DB'ye gitmez
+
+    # Rol düşürülünce önbellekteki yetki hemen düşer (TTL beklenmez)
+    r = client.patch("/auth/users/test-store", json={"role": "viewer"}, headers=admin)
+    assert r.status_code == 200
+    assert client.get("/warehouse/_ping", headers=store).status_code == 403
+
+    r = client.patch("/auth/users/test-store", json={"role": "store", "is_active": False}, headers=admin)
+    assert r.status_code == 200
+    assert client.get("/warehouse/_ping", headers=store).status_code == 401
+
+
+def test_register_and_login_through_password_pool(client):
+    r = client.post("/auth/register", json={"username": "ayse", "password": "Gizli-123", "role": "store"})
+    assert r.status_code == 201
+    r = client.post("/auth/login", data={"username": "ayse", "password": "Gizli-123"})
+    assert r.status_code == 200 and r.json()["access_token"]
+    assert client.post("/auth/login", data={"username": "ayse", "password": "yanlis"}).status_code == 401
+    assert hashing.pool_stats()["pending"] == 0
+
+
+def test_password_pool_uses_non_fork_workers_and_closes_on_shutdown(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    monkeypatch.setattr(hashing, "PWD_POOL_WORKERS", 1)
+    with TestClient(app) as c:
+        r = c.post("/auth/register", json={"username": "ali", "password": "Gizli-123", "role": "store"})
+        assert r.status_code == 201
+        assert c.post("/auth/login", data={"username": "ali", "password": "Gizli-123"}).status_code == 200
+        assert hashing._pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    assert hashing._pool is None  # lifespan kapanışı havuzu kapattı
+
+
+def test_password_pool_back_pressure_is_503(client, monkeypatch):
+    monkeypatch.setattr(hashing, "PWD_POOL_MAX_PENDING", 0)
+    rejected = hashing.pool_stats()["rejected"]
+    r = client.post("/auth/login", data={"username": "kimse", "password": "x"})
+    # Kullanıcı yok: hash doğrulamasına gidilmez, kuyruk dolu olsa da 401
+    assert r.status_code == 401
+    r = client.post("/auth/register", json={"username": "ali", "password": "Gizli-123"})
+    assert r.status_code == 503 and r.headers["Retry-After"] == str(hashing.PWD_RETRY_AFTER_SECONDS)
+    assert hashing.pool_stats()["rejected"] == rejected + 1
@@ -0,0 +1,28 @@
+from datetime import date
+
+from sqlalchemy import func, select
+
+from app.models import MaintenanceRequest, Part, PurchaseOrder, WarehouseTxn, WorkOrder
+from app.scripts.generate_data import generate
+from app.services.reconcile_service import reconcile_stock
+
+
+def test_generated_data_is_consistent(db):
+    res = generate(machines=10, technicians=3, suppliers=4, parts=50, requests=300, txns=3000,
+                   days=60, end=date(2026, 1, 1), seed=7, chunk_size=500)
+
+    assert db.scalar(select(func.count()).select_from(MaintenanceRequest)) == 300
+    assert res["WarehouseTxn"] == db.scalar(select(func.count()).select_from(WarehouseTxn))
+    assert db.scalar(select(func.min(WarehouseTxn.TxnDate))).date() == date(2025, 11, 2)
+    assert db.scalar(select(func.max(WarehouseTxn.TxnDate))).date() < date(2026, 1, 1)
+
+    # CurrentStock = IN - OUT; her Received PO'nun tek girişi var
+    assert reconcile_stock(db, max_items=100)["mismatched"] == 0
+    received = db.scalar(select(func.count()).where(PurchaseOrder.Status_s == "Received"))
+    assert received == db.scalar(select(func.count()).where(WarehouseTxn.POID.is_not(None)))
+    assert db.scalar(select(func.min(Part.CurrentStock))) >= 0
+    # Kapanmış iş emrinin talebi de kapalı
+    assert not db.scalar(
+        select(func.count()).select_from(WorkOrder).join(MaintenanceRequest)
+        .where(WorkOrder.Status_s == "Closed", MaintenanceRequest.Status_s != "Closed")
+    )
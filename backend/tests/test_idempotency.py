@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import IdempotencyKey, Part, WarehouseTxn
+from app.services import idempotency_service
+
+
+def _seed(db, *, stock=10):
+    db.add(Part(PartCode="RUL", PartName="Rulman", Unit="Adet", MinStock=0, CurrentStock=stock))
+    db.commit()
+
+
+def _stock(db) -> int:
+    db.expire_all()
+    return db.get(Part, 1).CurrentStock
+
+
+def test_replay_returns_stored_response_without_posting_again(client, db, auth_headers):
+    _seed(db)
+    h = {**auth_headers("store"), "Idempotency-Key": "k-1"}
+    body = {"PartID": 1, "Quantity": 3}
+
+    first = client.post("/warehouse/out", json=body, headers=h)
+    again = client.post("/warehouse/out", json=body, headers=h)
+    assert first.status_code == again.status_code == 200
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.json() == first.json()
+    assert _stock(db) == 7
+    assert db.query(WarehouseTxn).count() == 1
+
+    # Saklanan yanıt mutasyonla aynı transaction'da yazıldı
+    row = db.query(IdempotencyKey).one()
+    assert row.StatusCode == 200 and row.Scope.startswith("warehouse.out:")
+
+
+def test_same_key_different_body_is_422(client, db, auth_headers):
+    _seed(db)
+    h = {**auth_headers("store"), "Idempotency-Key": "k-1"}
+    assert client.post("/warehouse/out", json={"PartID": 1, "Quantity": 1}, headers=h).status_code == 200
+    assert client.post("/warehouse/out", json={"PartID": 1, "Quantity": 2}, headers=h).status_code == 422
+    assert _stock(db) == 9
+
+
+def test_keys_are_scoped_per_user(client, db, auth_headers):
+    _seed(db)
+    body = {"PartID": 1, "Quantity": 1}
+    r1 = client.post("/warehouse/out", json=body, headers={**auth_headers("store"), "Idempotency-Key": "k-1"})
+    r2 = client.post("/warehouse/out", json=body, headers={**auth_headers("admin"), "Idempotency-Key": "k-1"})
+    assert "Idempotent-Replayed" not in r2.headers
+    assert r1.json()["data"]["TxnID"] != r2.json()["data"]["TxnID"]
+    assert _stock(db) == 8
+
+
+
+def test_in_progress_claim_is_409_until_lease_expires(client, db, auth_headers):
+    _seed(db)
+    h = {**auth_headers("store"), "Idempotency-Key": "k-1"}
+    body = {"PartID": 1, "Quantity": 2, "Reason": None, "WorkOrderID": None}  # _IOPayload.model_dump()
+    now = datetime.utcnow()
+    db.add(IdempotencyKey(
+        Scope="warehouse.out:1", Key="k-1", RequestHash=idempotency_service.request_hash(body),
+        CreatedAt=now, ClaimedAt=now, ClaimToken="x" * 32, ExpiresAt=now + timedelta(hours=1),
+    ))
+    db.commit()
+
+    r = client.post("/warehouse/out", json=body, headers=h)
+    assert r.status_code == 409 and "Retry-After" in r.headers
+    assert _stock(db) == 10
+
+    # Yarıda kalmış istek: lease dolunca claim devralınır ve hareket bir kez işlenir
+    stale = now - timedelta(seconds=idempotency_service.IDEMPOTENCY_LEASE_SECONDS + 1)
+    db.query(IdempotencyKey).update({IdempotencyKey.ClaimedAt: stale})
+    db.commit()
+    assert client.post("/warehouse/out", json=body, headers=h).status_code == 200
+    assert client.post("/warehouse/out", json=body, headers=h).headers["Idempotent-Replayed"] == "true"
+    assert _stock(db) == 8
+
+
+def test_failure_storing_response_rolls_back_mutation(client, db, auth_headers, monkeypatch):
+    _seed(db)
+    h = {**auth_headers("store"), "Idempotency-Key": "k-1"}
+
+    def _boom(*a, **kw):
+        raise RuntimeError("yanıt yazılamadı")
+
+    monkeypatch.setattr(idempotency_service, "complete", _boom)
+    with pytest.raises(RuntimeError):
+        client.post("/warehouse/out", json={"PartID": 1, "Quantity": 4}, headers=h)
+    assert _stock(db) == 10
+    assert db.query(WarehouseTxn).count() == 0
+    assert db.query(IdempotencyKey).count() == 0  # claim bırakıldı; aynı anahtarla yeniden denenebilir
+
+
+def test_purchase_order_create_replay(client, db, auth_headers):
+    from app.models import PurchaseOrder, Supplier
+    db.add(Supplier(SupplierName="Tedarikçi"))
+    _seed(db)
+    h = {**auth_headers("store"), "Idempotency-Key": "po-1"}
+    body = {"SupplierID": 1, "PartID": 1, "Qty": 4, "UnitPrice": "2.50"}
+
+    first = client.post("/purchase-orders", json=body, headers=h)
+    again = client.post("/purchase-orders", json=body, headers=h)
+    assert first.status_code == again.status_code == 201
+    assert again.json()["POID"] == first.json()["POID"]
+    assert db.query(PurchaseOrder).count() == 1
+
+
+def test_lock_error_at_commit_is_retried_with_the_whole_unit(client, db, auth_headers, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    from app.services import unit_of_work
+
+    _seed(db)
+    monkeypatch.setattr(unit_of_work, "_backoff_seconds", lambda attempt: 0)
+    real_complete, calls = idempotency_service.complete, []
+
+    def _deadlock_once(db, **kw):
+        calls.append(1)
+        if len(calls) == 1:
+            raise OperationalError("UPDATE IdempotencyKey ...", {}, Exception("database is locked"))
+        return real_complete(db, **kw)
+
+    monkeypatch.setattr(idempotency_service, "complete", _deadlock_once)
+    h = {**auth_headers("store"), "Idempotency-Key": "k-1"}
+    r = client.post("/warehouse/out", json={"PartID": 1, "Quantity": 4}, headers=h)
+    assert r.status_code == 200 and len(calls) == 2
+    assert _stock(db) == 6
+    assert db.query(WarehouseTxn).count() == 1
+
+
+def test_report_cache_is_dropped_only_after_the_real_commit(client, db, auth_headers, monkeypatch):
+    from app.core.cache import TAG_CONSUMPTION, report_cache
+
+    _seed(db)
+    report_cache.set("rapor", "eski", tags=(TAG_CONSUMPTION,))
+
+    def _boom(*a, **kw):
+        raise RuntimeError("yanıt yazılamadı")
+
+    monkeypatch.setattr(idempotency_service, "complete", _boom)
+    h = {**auth_headers("store"), "Idempotency-Key": "k-1"}
+    with pytest.raises(RuntimeError):
+        client.post("/warehouse/out", json={"PartID": 1, "Quantity": 4}, headers=h)
+    assert report_cache.get("rapor") == "eski"  # commit olmadı: önbellek düşürülmedi
+
+    monkeypatch.undo()
+    assert client.post("/warehouse/out", json={"PartID": 1, "Quantity": 4}, headers=h).status_code == 200
+    assert report_cache.get("rapor") is None
@@ -0,0 +1,54 @@
+from app.models import Part
+from app.services.reconcile_service import reconcile_stock
+
+
+def _seed(client, db, auth_headers, parts=7):
+    db.add_all([
+        Part(PartCode=f"P{i}", PartName=f"Parça {i}", Unit="Adet", MinStock=0, CurrentStock=0)
+        for i in range(1, parts + 1)
+    ])
+    db.commit()
+    h = auth_headers("store")
+    for part_id in range(1, parts + 1):
+        client.post("/warehouse/in", json={"PartID": part_id, "Quantity": 10 + part_id}, headers=h)
+        client.post("/warehouse/out", json={"PartID": part_id, "Quantity": part_id}, headers=h)
+
+
+def test_reconcile_reports_only_drifted_parts(client, db, auth_headers):
+    _seed(client, db, auth_headers)
+    assert reconcile_stock(db)["mismatched"] == 0
+
+    # Defter dışı değişiklikler (ör. elle UPDATE)
+    db.get(Part, 3).CurrentStock += 5
+    db.get(Part, 6).CurrentStock = 0
+    db.commit()
+
+    res = reconcile_stock(db, chunk_size=2)
+    assert (res["done"], res["scanned"], res["chunks"], res["mismatched"]) == (True, 7, 4, 2)
+    assert [(i["PartID"], i["LedgerStock"], i["Diff"]) for i in res["items"]] == [(3, 10, 5), (6, 10, -10)]
+
+    truncated = reconcile_stock(db, max_items=1)
+    assert truncated["mismatched"] == 2 and truncated["itemsTruncated"] and len(truncated["items"]) == 1
+
+
+def test_reconcile_cursor_resumes_after_budget(client, db, auth_headers):
+    _seed(client, db, auth_headers)
+    db.get(Part, 7).CurrentStock = 99
+    db.commit()
+
+    seen, after, rounds = [], 0, 0
+    while True:
+        res = reconcile_stock(db, after_id=after, chunk_size=3, time_budget_s=0)  # her turda tek chunk
+        rounds += 1
+        seen += [i["PartID"] for i in res["items"]]
+        if res["done"]:
+            break
+        after = res["nextCursor"]
+    assert rounds == 3 and seen == [7]
+
+
+def test_reconcile_endpoint_requires_admin(client, db, auth_headers):
+    _seed(client, db, auth_headers, parts=2)
+    assert client.get("/parts/reconcile", headers=auth_headers("store")).status_code == 403
+    body = client.get("/parts/reconcile", headers=auth_headers("admin")).json()
+    assert body["done"] and body["Count"] == 0 and body["scanned"] == 2
@@ -0,0 +1,183 @@
+from datetime import date, datetime, timedelta
+
+from app.core.cache import TTLCache, report_cache
+from app.models import (
+    Machine, MaintenanceRequest, Part, PartConsumptionDaily, Technician, WarehouseTxn, WorkOrder,
+)
+from app.routers import reports
+from app.services.rollup_service import rebuild_rollups
+
+
+def _seed(client, db, auth_headers):
+    db.add_all([Machine(Code="PRES", Name="Pres"), Machine(Code="TORNA", Name="Torna"), Technician(Name="Teknisyen")])
+    db.add(Part(PartCode="RUL", PartName="Rulman", Unit="Adet", MinStock=0, CurrentStock=50))
+    db.commit()
+    reqs = [client.post("/requests", json={"MachineID": m}).json() for m in (1, 1, 2)]
+    client.post("/workorders", json={"RequestID": reqs[0]["RequestID"], "TechnicianID": 1})
+    h = auth_headers("store")
+    for qty in (3, 4):
+        assert client.post("/warehouse/out", json={"PartID": 1, "Quantity": qty}, headers=h).status_code == 200
+
+
+def _period() -> dict:
+    today = datetime.utcnow().date()
+    return {"start": today.isoformat(), "end": (today + timedelta(days=1)).isoformat()}
+
+
+def test_dashboard_sections_match_single_reports(client, db, auth_headers):
+    _seed(client, db, auth_headers)
+    p = _period()
+    r = client.get("/reports/dashboard", params=p)
+    assert r.status_code == 200
+    d, meta = r.json()["data"], r.json()["meta"]
+
+    failures = client.get("/reports/top-failure-machines", params=p).json()["data"]
+    parts = client.get("/reports/top-consumed-parts", params=p).json()["data"]
+    aging = client.get("/reports/open-workorders-aging").json()["data"]
+    assert [{k: v for k, v in f.items() if k != "cumPct"} for f in d["failures"]] == failures
+    assert [f["cumPct"] for f in d["failures"]] == [66.7, 100.0]
+    assert [{k: v for k, v in x.items() if k != "cumPct"} for x in d["consumedParts"]] == parts
+    assert d["aging"] == aging["summary"]
+    assert meta["openWOCount"] == 1
+
+
+def test_dashboard_section_error_is_500(client, db, auth_headers, monkeypatch):
+    def _boom(db, *args, **kwargs):
+        raise RuntimeError("bağlantı koptu")
+
+    monkeypatch.setattr(reports, "_consumed_result", _boom)
+    r = client.get("/reports/dashboard", params=_period())
+    assert r.status_code == 500
+    assert "consumedParts" in r.json()["error"]
+
+
+# ---- Rapor önbelleği: yazmalar ilgili raporu düşürür ----
+def test_report_cache_is_invalidated_by_writes(client, db, auth_headers):
+    _seed(client, db, auth_headers)
+    p = _period()
+    h = auth_headers("store")
+
+    parts = client.get("/reports/top-consumed-parts", params=p).json()["data"]
+    hits = report_cache.stats()["hits"]
+    assert client.get("/reports/top-consumed-parts", params=p).json()["data"] == parts
+    assert report_cache.stats()["hits"] == hits + 1
+
+    client.post("/warehouse/out", json={"PartID": 1, "Quantity": 2}, headers=h)
+    assert client.get("/reports/top-consumed-parts", params=p).json()["data"][0]["qtyOut"] == 9
+
+    failures = client.get("/reports/top-failure-machines", params=p).json()["data"]
+    client.post("/requests", json={"MachineID": 2})
+    again = client.get("/reports/top-failure-machines", params=p).json()["data"]
+    assert [f["failureCount"] for f in failures] == [2, 1]
+    assert sorted(f["failureCount"] for f in again) == [2, 2]
+
+    assert client.get("/reports/open-workorders-aging").json()["meta"]["openWOCount"] == 1
+    client.post("/workorders", json={"RequestID": 2, "TechnicianID": 1})
+    assert client.get("/reports/open-workorders-aging").json()["meta"]["openWOCount"] == 2
+
+
+def test_ttl_cache_tags_lru_and_expiry():
+    c = TTLCache(maxsize=2, ttl=60, name="t")
+    c.set("a", 1, tags=("x",))
+    c.set("b", 2, tags=("y",))
+    c.get("a")
+    c.set("c", 3)  # en az yakın zamanda kullanılan "b" düşer
+    assert (c.get("a"), c.get("b"), c.get("c")) == (1, None, 3)
+
+    c.invalidate_tags("x")
+    assert c.get("a") is None and c.get("c") == 3
+
+    c.set("d", 4, ttl=0)
+    assert c.get("d", "yok") == "yok"
+    s = c.stats()
+    assert (s["evictions"], s["invalidations"]) == (1, 1)
+
+
+# ---- Açık iş emri yaşları: SQL kovaları (summary / items) = Python kovaları (full) ----
+AS_OF = datetime(2025, 6, 15, 12, 0)
+
+
+def _seed_workorders(db):
+    db.add_all([Machine(Code="PRES", Name="Pres"), Technician(Name="Teknisyen")])
+    # Kova sınırları: tam gün sayısı (kesir aşağı yuvarlanır)
+    ages = [timedelta(hours=1), timedelta(days=2, hours=23), timedelta(days=3), timedelta(days=5, hours=1),
+            timedelta(days=6), timedelta(days=10, hours=23), timedelta(days=11), timedelta(days=400)]
+    for i, age in enumerate(ages + [timedelta(days=30)]):
+        db.add(MaintenanceRequest(MachineID=1, OpenedAt=AS_OF - age))
+        db.flush()
+        db.add(WorkOrder(RequestID=i + 1, TechnicianID=1, OpenedAt=AS_OF - age,
+                         ClosedAt=AS_OF if i == len(ages) else None))  # sonuncusu kapalı
+    db.commit()
+
+
+def test_aging_buckets_sql_matches_python(client, db):
+    _seed_workorders(db)
+    params = {"asOf": AS_OF.isoformat() + "Z"}
+    full = client.get("/reports/open-workorders-aging", params=params).json()
+    summary = client.get("/reports/open-workorders-aging", params={**params, "view": "summary"}).json()
+
+    expected = [{"ageBucket": b, "openWOCount": n} for b, n in (("0-2", 2), ("3-5", 2), ("6-10", 2), (">10", 2))]
+    assert full["data"]["summary"] == expected
+    assert summary["data"]["summary"] == expected
+    assert summary["meta"]["openWOCount"] == full["meta"]["openWOCount"] == 8
+
+    # items: keyset sayfaları, full listesiyle aynı yaş/kova
+    items, cursor = [], {}
+    while True:
+        r = client.get("/reports/open-workorders-aging", params={**params, "view": "items", "limit": 3, **cursor}).json()
+        items += r["data"]["items"]
+        if "next_before_id" not in r["meta"]:
+            break
+        cursor = {"before_id": r["meta"]["next_before_id"]}
+    key = lambda it: (it["workOrderId"], it["ageDays"], it["ageBucket"])  # noqa: E731
+    assert [key(it) for it in items] == [key(it) for it in full["data"]["items"]]
+    assert [it["ageDays"] for it in items] == [400, 11, 10, 6, 5, 3, 2, 0]
+
+
+# ---- Rollup tabloları: source=rollup = source=raw ----
+def _report_pair(client, path, params):
+    rollup = client.get(path, params={**params, "source": "rollup"}).json()["data"]
+    raw = client.get(path, params={**params, "source": "raw"}).json()["data"]
+    return rollup, raw
+
+
+def test_rollups_follow_writes_and_rebuild_matches_raw(client, db, auth_headers):
+    _seed(client, db, auth_headers)  # API yazmaları rollup'ları artımlı günceller
+    p = _period()
+    for path in ("/reports/top-failure-machines", "/reports/top-consumed-parts"):
+        rollup, raw = _report_pair(client, path, p)
+        assert rollup == raw and rollup
+
+    # Doğrudan (rollup'sız) eklenmiş geçmiş veri + bozulmuş bir rollup satırı: rebuild onarır
+    day = datetime(2025, 3, 10, 8, 0)
+    db.add_all([MaintenanceRequest(MachineID=2, OpenedAt=day + timedelta(hours=h)) for h in range(3)])
+    db.add(WarehouseTxn(PartID=1, TxnType="OUT", Quantity=5, TxnDate=day))
+    db.add(WarehouseTxn(PartID=1, TxnType="IN", Quantity=9, TxnDate=day))
+    db.query(PartConsumptionDaily).update({PartConsumptionDaily.QtyOut: 999})
+    db.commit()
+
+    rebuild_rollups(db)
+    report_cache.clear()
+    for params in (p, {"start": "2025-03-01", "end": "2025-04-01"}):
+        for path in ("/reports/top-failure-machines", "/reports/top-consumed-parts"):
+            rollup, raw = _report_pair(client, path, params)
+            assert rollup == raw and rollup
+
+
+def test_rebuild_rollups_range_leaves_other_days(db, client, auth_headers):
+    _seed(client, db, auth_headers)
+    before = sorted((r.PartID, r.Day, r.QtyOut) for r in db.query(PartConsumptionDaily))
+    db.add(WarehouseTxn(PartID=1, TxnType="OUT", Quantity=4, TxnDate=datetime(2025, 3, 10)))
+    db.commit()
+
+    rebuild_rollups(db, start=date(2025, 3, 1), end=date(2025, 4, 1))
+    db.expire_all()
+    after = sorted((r.PartID, r.Day, r.QtyOut) for r in db.query(PartConsumptionDaily))
+    assert after == sorted(before + [(1, date(2025, 3, 10), 4)])
+
+
+def test_report_cache_stats_requires_admin(client, auth_headers):
+    assert client.get("/reports/_cache").status_code == 401
+    assert client.get("/reports/_cache", headers=auth_headers("store")).status_code == 403
+    r = client.get("/reports/_cache", headers=auth_headers("admin"))
+    assert r.status_code == 200 and "hits" in r.json()["data"]
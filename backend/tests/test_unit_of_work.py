@@ -0,0 +1,125 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.db import engine as app_engine
+from app.core.dialect import SQLITE_BUSY_TIMEOUT_MS, configure_engine
+from app.models import Part
+from app.services import unit_of_work
+from app.services.unit_of_work import classify_retryable
+from app.services.warehouse_service import create_txn
+
+
+@pytest.mark.skipif(app_engine.dialect.name != "sqlite", reason="PRAGMA busy_timeout ile doğrulanır")
+def test_lock_timeout_is_reset_when_connection_returns_to_pool(db, monkeypatch):
+    db.add(Part(PartCode="RUL", PartName="Rulman", Unit="Adet", MinStock=0, CurrentStock=5))
+    db.commit()
+    monkeypatch.setattr(unit_of_work, "TX_LOCK_TIMEOUT_MS", 1234)
+
+    # Tek bağlantılı havuz: birimin kullandığı bağlantı bir sonraki kullanıcıya verilen bağlantıdır
+    eng = create_engine(app_engine.url, pool_size=1, max_overflow=0)
+    configure_engine(eng)
+    try:
+        with Session(eng) as s:
+            create_txn(s, part_id=1, txn_type="OUT", quantity=1)
+        with eng.connect() as conn:
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == SQLITE_BUSY_TIMEOUT_MS
+    finally:
+        eng.dispose()
+
+
+# ---- classify_retryable: sürücü hataları (sahte sınıflar; modül adı sürücüyle aynı) ----
+def _driver_error(module: str, msg: str, **attrs) -> Exception:
+    cls = type("Error", (Exception,), {"__module__": module})
+    e = cls(msg)
+    for k, v in attrs.items():
+        setattr(e, k, v)
+    return e
+
+
+PYODBC_DEADLOCK = _driver_error(
+    "pyodbc",
+    "('40001', '[40001] [Microsoft][ODBC Driver 18 for SQL Server][SQL Server]Transaction (Process ID 57) "
+    "was deadlocked on lock resources with another process and has been chosen as the deadlock victim. "
+    "Rerun the transaction. (1205) (SQLExecDirectW)')",
+)
+PYMSSQL_LOCK_TIMEOUT = _driver_error(
+    "pymssql",
+    "(1222, b'Lock request time out period exceeded.DB-Lib error message 20018, severity 16')",
+)
+PYMSSQL_SNAPSHOT = _driver_error(
+    "pymssql",
+    "(3960, b'Snapshot isolation transaction aborted due to update conflict.')",
+)
+SQLITE_LOCKED = _driver_error("sqlite3", "database is locked")
+PG_SERIALIZATION = _driver_error("psycopg2", "could not serialize access", pgcode="40001")
+
+
+def _wrapped(orig: Exception) -> HTTPException:
+    """Servislerdeki kalıp: DBAPIError -> except Exception -> HTTPException(500) from e."""
+    try:
+        try:
+            raise OperationalError("UPDATE Part ...", {}, orig)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Beklenmeyen hata: {e}") from e
+    except HTTPException as http:
+        return http
+
+
+@pytest.mark.parametrize("orig, kind", [
+    (PYODBC_DEADLOCK, "deadlock"),
+    (PYMSSQL_LOCK_TIMEOUT, "lock_timeout"),
+    (PYMSSQL_SNAPSHOT, "serialization"),
+    (SQLITE_LOCKED, "lock_timeout"),
+    (PG_SERIALIZATION, "serialization"),
+])
+def test_classify_retryable_wrapped_driver_errors(orig, kind):
+    assert classify_retryable(OperationalError("SELECT 1", {}, orig)) == kind
+    assert classify_retryable(_wrapped(orig)) == kind
+
+
+def test_classify_retryable_ignores_other_errors():
+    assert classify_retryable(HTTPException(status_code=409, detail="Stok yetersiz (1205)")) is None
+    assert classify_retryable(ValueError("(1205)")) is None
+    fk = _driver_error("pyodbc", "('23000', '... FOREIGN KEY constraint ... (547) (SQLExecDirectW)')")
+    assert classify_retryable(_wrapped(fk)) is None
+
+
+def test_transactional_retries_then_gives_up_with_503(db, monkeypatch):
+    monkeypatch.setattr(unit_of_work, "_backoff_seconds", lambda attempt: 0)
+    unit_of_work.reset_tx_stats()
+    calls = []
+
+    @unit_of_work.transactional(max_attempts=3, name="test-unit")
+    def flaky(db, *, fail_times):
+        calls.append(1)
+        if len(calls) <= fail_times:
+            raise _wrapped(PYODBC_DEADLOCK)
+        return "ok"
+
+    assert flaky(db, fail_times=2) == "ok"
+    assert len(calls) == 3
+
+    calls.clear()
+    with pytest.raises(HTTPException) as ei:
+        flaky(db, fail_times=5)
+    assert ei.value.status_code == 503 and "Retry-After" in ei.value.headers
+    assert len(calls) == 3
+
+    s = unit_of_work.tx_stats()["units"]["test-unit"]
+    assert (s["calls"], s["retries"], s["deadlock"], s["exhausted"]) == (2, 4, 5, 1)
+
+
+def test_transactional_does_not_retry_business_errors(db):
+    calls = []
+
+    @unit_of_work.transactional
+    def out_of_stock(db):
+        calls.append(1)
+        raise HTTPException(status_code=409, detail="Stok yetersiz.")
+
+    with pytest.raises(HTTPException) as ei:
+        out_of_stock(db)
+    assert ei.value.status_code == 409 and len(calls) == 1
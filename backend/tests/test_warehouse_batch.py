@@ -0,0 +1,131 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event
+
+from app.core.db import SessionLocal, engine
+from app.core.dialect import ROW_LOCK_OPTION
+from app.models import Part, WarehouseTxn
+from app.services.warehouse_service import create_txns_bulk
+
+
+def _seed(db):
+    db.add_all([
+        Part(PartCode="RUL", PartName="Rulman", Unit="Adet", MinStock=0, CurrentStock=5),
+        Part(PartCode="KAY", PartName="Kayış", Unit="Adet", MinStock=0, CurrentStock=2),
+    ])
+    db.commit()
+
+
+def _stocks(db):
+    db.expire_all()
+    return [p.CurrentStock for p in db.query(Part).order_by(Part.PartID)]
+
+
+def _move(part_id, txn_type, qty):
+    return {"PartID": part_id, "TxnType": txn_type, "Quantity": qty}
+
+
+def test_batch_all_posted_is_201_with_running_balance(client, db, auth_headers):
+    _seed(db)
+    # Parçalar ters sırada gelse de (kilit PartID sırasıyla) satırlar verilen sırayla doğrulanır
+    moves = [_move(2, "IN", 3), _move(1, "OUT", 5), _move(2, "OUT", 5)]
+    r = client.post("/warehouse/txns:batch", json={"Moves": moves}, headers=auth_headers("store"))
+    assert r.status_code == 201
+    body = r.json()
+    assert [row["CurrentStock"] for row in body["data"]] == [5, 0, 0]
+    assert body["meta"] == {"count": 3, "posted": 3, "failed": 0}
+    assert _stocks(db) == [0, 0]
+    assert db.query(WarehouseTxn).count() == 3
+
+
+def test_batch_partial_is_207(client, db, auth_headers):
+    _seed(db)
+    moves = [_move(1, "OUT", 2), _move(2, "OUT", 9), _move(99, "IN", 1)]
+    r = client.post("/warehouse/txns:batch", json={"Moves": moves}, headers=auth_headers("store"))
+    assert r.status_code == 207
+    data = r.json()["data"]
+    assert [row["ok"] for row in data] == [True, False, False]
+    assert [row.get("status") for row in data[1:]] == [409, 404]
+    assert _stocks(db) == [3, 2]
+
+
+def test_batch_nothing_posted_is_error(client, db, auth_headers):
+    _seed(db)
+    h = auth_headers("store")
+    r = client.post("/warehouse/txns:batch", json={"Moves": [_move(1, "OUT", 9), _move(2, "OUT", 9)]}, headers=h)
+    assert r.status_code == 409
+    assert r.json()["ok"] is False and len(r.json()["meta"]["errors"]) == 2
+
+    r = client.post("/warehouse/txns:batch", json={"Moves": [_move(1, "OUT", 9), _move(99, "IN", 1)]}, headers=h)
+    assert r.status_code == 422
+    assert db.query(WarehouseTxn).count() == 0
+
+
+def test_batch_atomic_writes_nothing_on_error(client, db, auth_headers):
+    _seed(db)
+    moves = [_move(1, "OUT", 2), _move(2, "OUT", 9)]
+    r = client.post("/warehouse/txns:batch", json={"Moves": moves, "Atomic": True}, headers=auth_headers("store"))
+    assert r.status_code == 409 and "Satır 1" in r.json()["error"]
+    assert _stocks(db) == [5, 2]
+
+
+def test_batch_idempotency_key(client, db, auth_headers):
+    _seed(db)
+    h = {**auth_headers("store"), "Idempotency-Key": "vardiya-1"}
+    body = {"Moves": [_move(1, "OUT", 1), _move(2, "IN", 1)]}
+    first = client.post("/warehouse/txns:batch", json=body, headers=h)
+    again = client.post("/warehouse/txns:batch", json=body, headers=h)
+    assert first.status_code == again.status_code == 201
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.json() == first.json()
+    assert _stocks(db) == [4, 3]
+
+    # İşlenmeyen (hata) yanıtı saklanmaz: stok gelince aynı anahtarla yeniden denenebilir
+    h2 = {**h, "Idempotency-Key": "vardiya-2"}
+    body2 = {"Moves": [_move(2, "OUT", 5)]}
+    assert client.post("/warehouse/txns:batch", json=body2, headers=h2).status_code == 409
+    client.post("/warehouse/in", json={"PartID": 2, "Quantity": 2}, headers=auth_headers("store"))
+    assert client.post("/warehouse/txns:batch", json=body2, headers=h2).status_code == 201
+    assert _stocks(db) == [4, 0]
+
+
+def test_batch_locks_parts_once_in_part_id_order(db):
+    _seed(db)
+    locks = []
+
+    def _capture(conn, clauseelement, multiparams, params, execution_options):
+        if execution_options.get(ROW_LOCK_OPTION) or clauseelement._execution_options.get(ROW_LOCK_OPTION):
+            locks.append(str(clauseelement.compile(dialect=conn.dialect)))
+
+    event.listen(engine, "before_execute", _capture)
+    try:
+        moves = [{"part_id": 2, "txn_type": "IN", "quantity": 1}, {"part_id": 1, "txn_type": "IN", "quantity": 1},
+                 {"part_id": 2, "txn_type": "OUT", "quantity": 1}]
+        create_txns_bulk(db, moves=moves)
+    finally:
+        event.remove(engine, "before_execute", _capture)
+
+    assert len(locks) == 1
+    assert re.search(r"ORDER BY \W?Part\W?\.\W?PartID", locks[0])
+
+
+def test_concurrent_batches_in_opposite_order_keep_stock_consistent(db):
+    _seed(db)  # stok: [5, 2]
+
+    def run(i):
+        s = SessionLocal()
+        try:
+            order = (1, 2) if i % 2 else (2, 1)
+            moves = [{"part_id": p, "txn_type": "IN", "quantity": 1} for p in order]
+            moves += [{"part_id": p, "txn_type": "OUT", "quantity": 1} for p in reversed(order)]
+            return sum(r["ok"] for r in create_txns_bulk(s, moves=moves))
+        finally:
+            s.close()
+
+    with ThreadPoolExecutor(6) as ex:
+        posted = sum(ex.map(run, range(24)))
+
+    assert posted == 24 * 4
+    assert _stocks(db) == [5, 2]
+    assert db.query(WarehouseTxn).count() == 24 * 4
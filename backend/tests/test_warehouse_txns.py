@@ -0,0 +1,67 @@
+import json
+from datetime import datetime, timedelta
+
+from app.models import Part, WarehouseTxn
+from app.services.archive_service import archive_txns
+
+
+def _seed(db, n=25):
+    db.add_all([
+        Part(PartCode="RUL", PartName="Rulman", Unit="Adet", MinStock=0, CurrentStock=0),
+        Part(PartCode="KAY", PartName="Kayış", Unit="Adet", MinStock=0, CurrentStock=0),
+    ])
+    t0 = datetime(2025, 1, 1)
+    for i in range(n):
+        db.add(WarehouseTxn(
+            PartID=1 + i % 2, TxnType="IN" if i % 3 else "OUT", Quantity=i + 1,
+            TxnDate=t0 + timedelta(days=i), Reason="Sayım" if i % 5 == 0 else None,
+        ))
+    db.commit()
+
+
+def _pages(client, h, params):
+    ids, cursor = [], {}
+    while True:
+        body = client.get("/warehouse/txns", params={**params, **cursor}, headers=h).json()
+        ids += [t["TxnID"] for t in body["data"]]
+        nxt = body.get("meta", {})
+        if "next_before_id" in nxt:
+            cursor = {"before_id": nxt["next_before_id"]}
+        elif "next_after_id" in nxt:
+            cursor = {"after_id": nxt["next_after_id"]}
+        else:
+            return ids
+
+
+def test_txns_keyset_pages_cover_all_rows_once(client, db, auth_headers):
+    _seed(db)
+    h = auth_headers("store")
+    assert _pages(client, h, {"limit": 7}) == list(range(25, 0, -1))
+    assert _pages(client, h, {"limit": 7, "sort": "TxnID"}) == list(range(1, 26))
+    # Filtreler imleçle birlikte
+    assert _pages(client, h, {"limit": 4, "part_id": 2, "txn_type": "IN"}) == [
+        i + 1 for i in range(24, -1, -1) if i % 2 == 1 and i % 3
+    ]
+    assert _pages(client, h, {"limit": 2, "q": "Sayım"}) == [21, 16, 11, 6, 1]
+
+
+def test_txns_date_range_and_archive(client, db, auth_headers):
+    _seed(db)
+    h = auth_headers("store")
+    p = {"date_from": "2025-01-10T00:00:00", "date_to": "2025-01-20T00:00:00", "limit": 100}
+    assert _pages(client, h, p) == list(range(19, 9, -1))
+
+    archive_txns(db, cutoff=datetime(2025, 1, 15))
+    assert _pages(client, h, p) == list(range(19, 14, -1))
+    rows = client.get("/warehouse/txns", params={**p, "include_archive": True}, headers=h).json()["data"]
+    assert [r["TxnID"] for r in rows] == list(range(19, 9, -1))
+    assert [r["Archived"] for r in rows].count(True) == 5
+
+
+def test_txns_ndjson_streams_all_matching_rows(client, db, auth_headers):
+    _seed(db)
+    r = client.get("/warehouse/txns", params={"format": "ndjson", "part_id": 1, "limit": 1},
+                   headers=auth_headers("store"))
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [t["TxnID"] for t in rows] == list(range(25, 0, -2))  # limit uygulanmaz
@@ -143,20 +143,16 @@ def ensure_array(x):
 
 @st.cache_data(ttl=30)
 def load_reports(api_base: str, hdrs: dict, s_iso: str, e_iso_inclusive: str, t: int):
-    urls = {
-        "fail": f"{api_base}/reports/top-failure-machines-list?start={s_iso}&end={e_iso_inclusive}&top={t}",
-        "parts": f"{api_base}/reports/top-consumed-parts-list?start={s_iso}&end={e_iso_inclusive}&top={t}",
-        "aging": f"{api_base}/reports/open-workorders-aging",
-    }
-    fail = ensure_array(get_json(urls["fail"], hdrs))
-    parts = ensure_array(get_json(urls["parts"], hdrs))
-
-    aging_raw = get_json(urls["aging"], hdrs)
-    if isinstance(aging_raw, dict) and isinstance(aging_raw.get("data"), dict):
-        aging = aging_raw["data"].get("summary", [])
-    else:
-        aging = aging_raw if isinstance(aging_raw, list) else aging_raw.get("summary", [])
-
+    # Tek istek: arıza (Pareto cumPct hazır), tüketim ve yaş özeti aynı zarfta
+    url = f"{api_base}/reports/dashboard?start={s_iso}&end={e_iso_inclusive}&top={t}"
+    raw = get_json(url, hdrs)
+    data = raw.get("data", raw) if isinstance(raw, dict) else {}
+    if not isinstance(data, dict):
+        data = {}
+
+    fail = ensure_array(data.get("failures", []))
+    parts = ensure_array(data.get("consumedParts", []))
+    aging = ensure_array(data.get("aging", []))
     return fail, parts, aging
 
 def _empty_fig(height=320, text="Veri yok"):
@@ -193,10 +189,12 @@ try:
 
         df_f = pd.DataFrame(fail_raw)
         if not df_f.empty:
-            df_f = df_f.rename(columns={"machineName":"Makine", "failureCount":"Arıza"})
+            df_f = df_f.rename(columns={"machineName":"Makine", "failureCount":"Arıza", "cumPct":"Kümülatif %"})
             df_f["Arıza"] = pd.to_numeric(df_f["Arıza"], errors="coerce").fillna(0)
-            total = float(df_f["Arıza"].sum() or 1)
-            df_f["Kümülatif %"] = (df_f["Arıza"].cumsum()/total*100).round(0)
+            if "Kümülatif %" not in df_f.columns:
+                total = float(df_f["Arıza"].sum() or 1)
+                df_f["Kümülatif %"] = df_f["Arıza"].cumsum()/total*100
+            df_f["Kümülatif %"] = pd.to_numeric(df_f["Kümülatif %"], errors="coerce").fillna(0).round(0)
 
         if not df_f.empty:
             fig = make_subplots(specs=[[{"secondary_y": True}]])
@@ -248,7 +246,7 @@ try:
 
         df_p = pd.DataFrame(parts_raw)
         if not df_p.empty:
-            df_p = df_p.rename(columns={"partName":"Parça", "qtyOut":"Tüketim"})
+            df_p = df_p.rename(columns={"partName":"Parça", "qtyOut":"Tüketim", "cumPct":"Kümülatif %"})
             df_p["Tüketim"] = pd.to_numeric(df_p["Tüketim"], errors="coerce").fillna(0)
 
         if not df_p.empty:
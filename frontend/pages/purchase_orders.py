@@ -121,16 +121,33 @@ if b_auto:
 st.subheader("📋 PO Listesi")
 colL, colR = st.columns([3,2])
 with colL:
+    # Keyset sayfalama: X-Next-Cursor bir sonraki sayfanın imleci, X-Total-Count toplam
+    cursors = st.session_state.setdefault("po_cursors", [None])
     try:
-        lst = get_json(f"{API_BASE}/purchase-orders/", HDRS)
+        params = {"limit": 100}
+        if cursors[-1]:
+            params["cursor"] = cursors[-1]
+        r = requests.get(f"{API_BASE}/purchase-orders/", headers=HDRS, params=params, timeout=20)
+        r.raise_for_status()
+        lst = r.json()
         rows = lst if isinstance(lst, list) else lst.get("items", lst.get("data", lst))
         df_po = pd.DataFrame(rows)
+        total = r.headers.get("X-Total-Count")
+        next_cursor = r.headers.get("X-Next-Cursor")
         if not df_po.empty:
-            df_po = df_po.sort_values("POID")
             st.dataframe(df_po, use_container_width=True, height=300)
         else:
             st.info("PO listesi boş.")
+        p1, p2, p3 = st.columns([1,1,2])
+        p3.caption(f"Sayfa {len(cursors)} — toplam {total or '?'} PO")
+        if p1.button("◀ Önceki", disabled=len(cursors) <= 1):
+            cursors.pop()
+            st.rerun()
+        if p2.button("Sonraki ▶", disabled=not next_cursor):
+            cursors.append(next_cursor)
+            st.rerun()
     except requests.RequestException as e:
+        st.session_state["po_cursors"] = [None]
         st.error(f"PO listesi alınamadı: {e}")
 
 with colR:
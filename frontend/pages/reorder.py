@@ -85,6 +85,8 @@ else:
         "PartCode": "Kod",
         "PartName": "Ad",
         "CurrentStock": "Mevcut",
+        "ReservedQty": "Rezerve",
+        "AvailableStock": "Kullanılabilir",
         "MinStock": "Min",
         # Muhtemel öneri miktarı alanları:
         "SuggestedQty": "Öneri",
@@ -95,56 +97,58 @@ else:
     df_disp = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
     st.dataframe(df_disp, use_container_width=True, height=320)
 
-    # Seçim ve toplu PO oluşturma
-    st.markdown("**Seçilen satırlar için PO oluştur**")
+    # Seçim ve toplu PO oluşturma (tek istek: /purchase-orders/from-suggestions:bulk)
+    st.markdown("**Seçilen satırlar (ya da tüm öneriler) için PO oluştur**")
     idx_sel = st.multiselect("Satır seç", options=list(df.index), help="CTRL/SHIFT ile birden fazla seçebilirsin.")
-    c1, c2, c3 = st.columns([1,1,2])
+    c1, c2, c3, c4 = st.columns([1,1,2,2])
     supplier_id = c1.number_input("SupplierID", min_value=1, step=1, value=1)
     default_price = c2.number_input("Birim Fiyat (varsayılan)", min_value=0.01, step=0.01, value=1.00, format="%.2f")
     create_clicked = c3.button("Seçili satırlar için PO oluştur", type="primary", use_container_width=True)
-
-    def _pick_qty(row: dict) -> int:
-        for key in ("SuggestedQty", "ReorderQty", "NeedQty", "Qty"):
-            if key in row and row[key] is not None:
-                try:
-                    q = int(row[key])
-                    if q > 0: return q
-                except Exception:
-                    pass
-        return 1
+    create_all_clicked = c4.button("Tüm öneriler için PO oluştur", use_container_width=True)
+
+    def _bulk_create(items):
+        payload = {"SupplierID": int(supplier_id), "UnitPrice": float(default_price)}
+        if items is not None:
+            payload["Items"] = items
+        try:
+            res = post_json(f"{API_BASE}/purchase-orders/from-suggestions:bulk", HDRS, payload)
+        except requests.HTTPError as e:
+            st.error(f"Toplu PO HTTP hatası: {e.response.status_code} — {e.response.text[:240]}")
+            return
+        except requests.RequestException as e:
+            st.error(f"Ağ hatası: {e}")
+            return
+        created = res.get("POIDs") or []
+        skipped = res.get("Skipped") or []
+        if created:
+            toast(f"PO oluşturuldu: #{', #'.join(map(str, created))}")
+        else:
+            st.info("Oluşturulacak PO yok (açık kalmamış).")
+        if skipped:
+            st.warning(f"Açığı kalmadığı için atlanan parçalar: {', '.join(map(str, skipped))}")
 
     if create_clicked:
         if not idx_sel:
             st.warning("Satır seçmedin.")
         else:
-            created = []
-            errors = []
+            items, errors = [], []
             for i in idx_sel:
                 row = df.loc[i].to_dict()
                 part_id = int(row.get("PartID") or row.get("partId") or 0)
                 if part_id <= 0:
                     errors.append(f"Satır {i}: PartID yok/0")
                     continue
-                qty = _pick_qty(row)
-                price = float(row.get("UnitPrice") or default_price)
-
-                payload = {
-                    "SupplierID": int(supplier_id),
-                    "PartID": part_id,
-                    "Qty": int(qty),
-                    "UnitPrice": price,
-                }
-                try:
-                    res = post_json(f"{API_BASE}/purchase-orders", HDRS, payload)
-                    # Cevap düz objeyse POID direkt olabilir; yoksa data.POID dene
-                    poid = res.get("POID") or (res.get("data", {}) if isinstance(res.get("data"), dict) else {}).get("POID")
-                    created.append(poid or "?")
-                except requests.RequestException as e:
-                    errors.append(f"Satır {i}: {e}")
-            if created:
-                toast(f"PO oluşturuldu: #{', #'.join(map(str, created))}")
+                item = {"PartID": part_id}
+                if row.get("UnitPrice"):
+                    item["UnitPrice"] = float(row["UnitPrice"])
+                items.append(item)
             if errors:
-                st.error("Bazı satırlar hata verdi:\n- " + "\n- ".join(map(str, errors)))
+                st.error("Bazı satırlar atlandı:\n- " + "\n- ".join(map(str, errors)))
+            if items:
+                _bulk_create(items)
+
+    if create_all_clicked:
+        _bulk_create(None)
 
 # ---- 2) Hızlı PO İşlemleri ----
 st.subheader("⚙️ PO Hızlı İşlemler")
@@ -52,6 +52,8 @@ try:
             "PartCode": "Kod",
             "PartName": "Ad",
             "CurrentStock": "Mevcut",
+            "ReservedQty": "Rezerve",
+            "AvailableStock": "Kullanılabilir",
             "MinStock": "Min",
         }
         df = df.rename(columns={k: v for k, v in cols_map.items() if k in df.columns})